@@ -0,0 +1,166 @@
+"""
+Latency benchmark for the ranked feeds, the paper repository queries and DTO serialization.
+
+For every feed filter combination and ranking backend, this runs the same calls the API
+handlers make and reports p50/p95/p99 latency and rows/sec, split into the ranking query
+and PaperDTO serialization. The feed cache is bypassed so every iteration hits the database.
+
+Seed a local database first (see benchmarks/synthetic_corpus.py), then run from `backend`:
+    python -m benchmarks.bench_feeds --iterations 50 --backends precomputed,live
+    python -m benchmarks.bench_feeds --json bench_output.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, asdict
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List
+
+from model.database import SessionMaker
+from model.paper_repository import paper_repository
+from controller.paper_controller import PaperDTO
+from services.config import LOGGING_CONFIG
+from services.ranking_service import RankingService, RANKING_BACKENDS
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+PAGE_SIZE = 50
+DEEP_OFFSET = 1000
+
+# (name, ranking method, keyword arguments)
+FEED_SCENARIOS = [
+    ("arxiv: no filter", "get_ranked_arxiv_papers", {}),
+    ("arxiv: popular tag", "get_ranked_arxiv_papers", {"tags": ["cs.ai"]}),
+    ("arxiv: two tags", "get_ranked_arxiv_papers", {"tags": ["cs.ai", "cs.lg"]}),
+    ("arxiv: user tag", "get_ranked_arxiv_papers", {"tags": ["llm"]}),
+    ("arxiv: deep page", "get_ranked_arxiv_papers", {"offset": DEEP_OFFSET}),
+    ("openreview: no filter", "get_ranked_openreview_papers", {}),
+    ("openreview: popular keyword", "get_ranked_openreview_papers", {"tags": ["topic-0000"]}),
+    ("openreview: ICLR", "get_ranked_openreview_papers", {"venue": "ICLR"}),
+    ("openreview: ICLR this year", "get_ranked_openreview_papers", {"venue": "ICLR", "year": date.today().year}),
+    ("openreview: orals", "get_ranked_openreview_papers", {"category": "Oral"}),
+    ("openreview: deep page", "get_ranked_openreview_papers", {"offset": DEEP_OFFSET}),
+]
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    stage: str
+    iterations: int
+    rows: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rows_per_sec: float
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(name: str, stage: str, durations: List[float], rows: int) -> BenchmarkResult:
+    ordered = sorted(durations)
+    total = sum(durations)
+    return BenchmarkResult(
+        name=name, stage=stage, iterations=len(durations), rows=rows,
+        p50_ms=percentile(ordered, 0.50) * 1000,
+        p95_ms=percentile(ordered, 0.95) * 1000,
+        p99_ms=percentile(ordered, 0.99) * 1000,
+        rows_per_sec=(rows * len(durations)) / total if total else 0.0,
+    )
+
+async def time_call(call: Callable[[], Awaitable[Any]], iterations: int, warmup: int) -> tuple[List[float], Any]:
+    result = None
+    for _ in range(warmup):
+        result = await call()
+    durations = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = await call()
+        durations.append(time.perf_counter() - started)
+    return durations, result
+
+async def bench_feed_scenarios(backend: str, iterations: int, warmup: int) -> List[BenchmarkResult]:
+    service = RankingService(backend=backend, use_cache=False)
+    results = []
+    for name, method_name, kwargs in FEED_SCENARIOS:
+        method = getattr(service, method_name)
+
+        async def rank():
+            async with SessionMaker() as session:
+                return await method(session, limit=PAGE_SIZE, **kwargs)
+
+        durations, ranked_papers = await time_call(rank, iterations, warmup)
+        results.append(summarize(f"[{backend}] {name}", "rank", durations, len(ranked_papers)))
+
+        serialize_durations = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            [PaperDTO.from_ranked_paper(rp) for rp in ranked_papers]
+            serialize_durations.append(time.perf_counter() - started)
+        results.append(summarize(f"[{backend}] {name}", "serialize", serialize_durations, len(ranked_papers)))
+    return results
+
+async def bench_repository(iterations: int, warmup: int) -> List[BenchmarkResult]:
+    async with SessionMaker() as session:
+        sample = await paper_repository.get_arxiv_papers(session, limit=1)
+    sample_id = sample[0].id if sample else 1
+
+    scenarios: Dict[str, Callable[[Any], Awaitable[Any]]] = {
+        "repository: get_paper_by_id": lambda session: paper_repository.get_paper_by_id(session, sample_id),
+        "repository: get_arxiv_papers": lambda session: paper_repository.get_arxiv_papers(session, limit=PAGE_SIZE),
+        "repository: get_arxiv_papers (tag)": lambda session: paper_repository.get_arxiv_papers(session, limit=PAGE_SIZE, tags=["cs.ai"]),
+        "repository: get_recent_openreview_papers": lambda session: paper_repository.get_recent_openreview_papers(session, limit=PAGE_SIZE),
+        "repository: get_recent_openreview_papers (ICLR this year)": lambda session: paper_repository.get_recent_openreview_papers(
+            session, limit=PAGE_SIZE, venue="ICLR", year=date.today().year
+        ),
+    }
+    results = []
+    for name, query in scenarios.items():
+        async def run():
+            async with SessionMaker() as session:
+                return await query(session)
+
+        durations, rows = await time_call(run, iterations, warmup)
+        row_count = len(rows) if isinstance(rows, list) else int(rows is not None)
+        results.append(summarize(name, "query", durations, row_count))
+    return results
+
+def print_report(results: List[BenchmarkResult]):
+    header = f"{'scenario':<58} {'stage':<10} {'rows':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rows/sec':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r.name:<58} {r.stage:<10} {r.rows:>5} {r.p50_ms:>9.2f} {r.p95_ms:>9.2f} {r.p99_ms:>9.2f} {r.rows_per_sec:>12,.0f}")
+
+async def main(backends: List[str], iterations: int, warmup: int, json_path: str | None):
+    results: List[BenchmarkResult] = []
+    for backend in backends:
+        logging.info(f"Benchmarking feeds with the '{backend}' ranking backend...")
+        results.extend(await bench_feed_scenarios(backend, iterations, warmup))
+    logging.info("Benchmarking repository queries...")
+    results.extend(await bench_repository(iterations, warmup))
+
+    print_report(results)
+    if json_path:
+        with open(json_path, 'w') as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+        logging.info(f"Wrote {len(results)} results to {json_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ranked feeds, repository queries and serialization.")
+    parser.add_argument("--backends", default="precomputed,live", help=f"Comma-separated subset of {','.join(RANKING_BACKENDS)}.")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", help="Also write the results as JSON to this path.")
+    args = parser.parse_args()
+
+    selected = [b.strip() for b in args.backends.split(',') if b.strip()]
+    unknown = set(selected) - set(RANKING_BACKENDS)
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(sorted(unknown))}")
+    asyncio.run(main(selected, args.iterations, args.warmup, args.json_path))
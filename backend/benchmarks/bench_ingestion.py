@@ -0,0 +1,117 @@
+"""
+Offline ingestion benchmark for the arXiv fetcher.
+
+Record a run once, with network access, against a scratch database:
+    python -m benchmarks.bench_ingestion --mode record --reset
+That saves every arXiv and Semantic Scholar response under the recordings directory
+(see services/http_replay.py), plus the date the run was pinned to. Afterwards the same
+run can be replayed anywhere, with no network, as often as needed:
+    python -m benchmarks.bench_ingestion --reset --latency-ms 150 --json ingestion.json
+and reports the throughput of each pipeline stage (fetch/parse, enrich, commit).
+
+--reset deletes all arXiv papers and the fetcher's high-water mark and checkpoint first,
+so every run starts from an empty feed and sends exactly the recorded requests. Only use
+it on a database you can throw away. Exits with status 1 if a replayed request had no
+recording, i.e. the fetcher's requests changed since the recording was made.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from dataclasses import asdict
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import delete
+
+from model.database import SessionMaker
+from model.job_tracker import JobTracker
+from model.paper import Paper
+from services import http_replay
+from services.arxiv_fetcher import ArxivFetcher, CHECKPOINT_JOB_SUFFIX
+from services.config import ARXIV_FETCHER_JOB_NAME, HTTP_RECORDINGS_DIR, LOGGING_CONFIG
+from services.ranking_store import ranking_store
+from services.tag_stats import tag_stats_store
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+MANIFEST_FILE_NAME = "manifest.json"
+
+async def reset_arxiv_state():
+    async with SessionMaker() as session:
+        arxiv_papers = Paper.source == 'arxiv'
+        await tag_stats_store.remove_papers(session, arxiv_papers)
+        await session.execute(delete(Paper).where(arxiv_papers))
+        await session.execute(delete(JobTracker).where(
+            JobTracker.job_name.in_([ARXIV_FETCHER_JOB_NAME, ARXIV_FETCHER_JOB_NAME + CHECKPOINT_JOB_SUFFIX])
+        ))
+        await ranking_store.refresh_source(session, 'arxiv')
+        await session.commit()
+    logging.info("Cleared arXiv papers and the fetcher's progress.")
+
+def _pinned_date(directory: str, mode: str) -> date:
+    """The date a recording was made on; the fetcher's cutoff (and so its queries) depend on it."""
+    manifest = Path(directory) / MANIFEST_FILE_NAME
+    if mode == "record":
+        manifest.parent.mkdir(parents=True, exist_ok=True)
+        manifest.write_text(json.dumps({"as_of": date.today().isoformat()}), encoding="utf-8")
+        return date.today()
+    if not manifest.exists():
+        raise SystemExit(f"No recording found in '{directory}'. Run with --mode record first.")
+    return date.fromisoformat(json.loads(manifest.read_text(encoding="utf-8"))["as_of"])
+
+async def run_benchmark(mode: str, directory: str, latency_ms: float, reset: bool) -> dict:
+    http_replay.configure(mode=mode, directory=directory, latency_ms=latency_ms)
+    as_of = _pinned_date(directory, mode)
+    if reset:
+        await reset_arxiv_state()
+
+    fetcher = ArxivFetcher()
+    started = time.perf_counter()
+    await fetcher.run(as_of=as_of)
+    elapsed = time.perf_counter() - started
+
+    stats = fetcher.stats
+    stages = {
+        name: {**asdict(stage), "items_per_sec": stage.items_per_sec}
+        for name, stage in (("fetch", stats.fetch), ("enrich", stats.enrich), ("commit", stats.commit))
+    }
+    return {
+        "as_of": as_of.isoformat(),
+        "run_seconds": elapsed,
+        "pages": stats.pages,
+        "bytes_received": stats.bytes_received,
+        "pipeline_seconds": stats.wall_seconds,
+        "papers_per_sec": stats.commit.items / stats.wall_seconds if stats.wall_seconds else 0.0,
+        "stages": stages,
+        "http": http_replay.replay_stats(),
+    }
+
+def print_report(report: dict):
+    http = report["http"]
+    print(f"\nArXiv ingestion ({http['mode']}, {http['latency_ms']:.0f} ms latency, as of {report['as_of']}):")
+    print(f"  {report['pages']} pages, {report['bytes_received'] / 1024:.0f} KiB, pipeline {report['pipeline_seconds']:.2f}s "
+          f"(run {report['run_seconds']:.2f}s), {report['papers_per_sec']:.1f} papers/sec end to end")
+    print(f"  {'stage':<8}{'items':>8}{'dropped':>9}{'busy s':>9}{'items/s':>10}")
+    for name, stage in report["stages"].items():
+        print(f"  {name:<8}{stage['items']:>8}{stage['dropped']:>9}{stage['busy_seconds']:>9.2f}{stage['items_per_sec']:>10.1f}")
+    print(f"  HTTP: {http['replayed']} replayed, {http['recorded']} recorded, {http['live']} live, {http['misses']} missing")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the arXiv ingestion pipeline against recorded API responses.")
+    parser.add_argument("--mode", choices=("record", "replay"), default="replay")
+    parser.add_argument("--dir", default=HTTP_RECORDINGS_DIR, help="Recordings directory.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated latency of each replayed response.")
+    parser.add_argument("--reset", action="store_true", help="Delete arXiv papers and fetcher progress first (scratch databases only).")
+    parser.add_argument("--json", help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.mode, args.dir, args.latency_ms, args.reset))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["http"]["misses"]:
+        raise SystemExit(1)
@@ -0,0 +1,127 @@
+"""
+Micro-benchmark for encoding feed pages and comment threads to JSON.
+
+Builds in-memory papers shaped like the real feed (no database needed) and measures, per
+page size, the time to turn ranked rows into DTOs and encode them with Litestar's JSON
+encoder, which is exactly what the feed handlers do. For comparison it also runs the
+previous dataclass DTOs, whose tags were built as one dict per tag.
+
+Usage (from the `backend` directory):
+    python -m benchmarks.bench_serialization --iterations 200
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from litestar.serialization import encode_json
+
+from benchmarks.bench_feeds import BenchmarkResult, summarize, print_report
+from controller.comment_controller import CommentReadDTO
+from controller.paper_controller import PaperDTO
+from model.comment import Comment
+from model.paper import Paper
+from services.ranking_service import RankedPaper
+
+PAGE_SIZES = (50, 200, 1000)
+
+@dataclass
+class LegacyPaperDTO:
+    """The dataclass DTO the feeds used before switching to msgspec Structs."""
+    id: int
+    source: str
+    source_id: str
+    title: str
+    authors: list[str]
+    abstract: str | None
+    paper_url: str
+    pdf_url: str | None
+    venue_or_category: str
+    year_or_date: str | None
+    upvotes: int
+    downvotes: int
+    tags: List[Dict[str, Any]] = field(default_factory=list)
+    category: str | None = None
+    replies_data: dict | None = None
+    bleeding_edge_score: float | None = None
+    recency_component: float | None = None
+    reputation_component: float | None = None
+    popularity_component: float | None = None
+
+    @classmethod
+    def from_ranked_paper(cls, ranked_paper: RankedPaper) -> "LegacyPaperDTO":
+        paper = ranked_paper.paper
+        tags = [{"name": tag, "isRemovable": False} for tag in (paper.keywords or [])]
+        tags += [{"name": tag, "isRemovable": True} for tag in (paper.user_tags or [])]
+        return cls(
+            id=paper.id, source=paper.source, source_id=paper.source_id, title=paper.title,
+            authors=[author.get('name', 'Unknown Author') for author in (paper.authors or [])],
+            abstract=paper.abstract, paper_url=paper.paper_url, pdf_url=paper.pdf_url,
+            venue_or_category=paper.venue_or_category,
+            year_or_date=paper.year_or_date.isoformat() if paper.year_or_date else None,
+            upvotes=paper.upvotes, downvotes=paper.downvotes, tags=tags, category=paper.category,
+            replies_data=paper.replies_data, bleeding_edge_score=ranked_paper.bleeding_edge_score,
+            recency_component=ranked_paper.recency_component,
+            reputation_component=ranked_paper.reputation_component,
+            popularity_component=ranked_paper.popularity_component,
+        )
+
+def make_ranked_papers(count: int, seed: int = 7) -> List[RankedPaper]:
+    rng = random.Random(seed)
+    ranked = []
+    for i in range(count):
+        source_id = f"2501.{i:05d}"
+        paper = Paper(
+            id=i + 1, source='arxiv', source_id=source_id, title=f"A synthetic paper title number {i} about models",
+            authors=[{'name': f"Author {rng.randint(1, 10_000)}"} for _ in range(rng.randint(1, 8))],
+            abstract="Lorem ipsum dolor sit amet. " * rng.randint(20, 60),
+            paper_url=f"http://arxiv.org/abs/{source_id}", pdf_url=f"http://arxiv.org/pdf/{source_id}",
+            venue_or_category='cs.lg', year_or_date=date.today() - timedelta(days=rng.randint(0, 90)),
+            category='cs.lg', keywords=rng.sample(['cs.lg', 'cs.ai', 'cs.cl', 'cs.cv', 'stat.ml'], rng.randint(1, 4)),
+            user_tags=rng.sample(['llm', 'agents', 'must-read'], rng.randint(0, 2)), replies_data=None,
+            upvotes=rng.randint(0, 50), downvotes=rng.randint(0, 10), comment_count=rng.randint(0, 5),
+        )
+        ranked.append(RankedPaper(paper, rng.random(), rng.random(), rng.random(), rng.random()))
+    return ranked
+
+def make_comments(count: int) -> List[Comment]:
+    now = datetime.now()
+    return [
+        Comment(id=i + 1, paper_id=1, body="A thoughtful comment about the paper. " * 4, created_at=now - timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+def time_encode(build: Callable[[], List[Any]], iterations: int, warmup: int) -> tuple[List[float], int]:
+    for _ in range(warmup):
+        encode_json(build())
+    durations, size = [], 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        size = len(encode_json(build()))
+        durations.append(time.perf_counter() - started)
+    return durations, size
+
+def run(iterations: int, warmup: int) -> List[BenchmarkResult]:
+    results = []
+    for page_size in PAGE_SIZES:
+        ranked_papers = make_ranked_papers(page_size)
+        comments = make_comments(page_size)
+        scenarios = {
+            "papers: PaperDTO (msgspec)": lambda: [PaperDTO.from_ranked_paper(rp) for rp in ranked_papers],
+            "papers: legacy dataclass DTO": lambda: [LegacyPaperDTO.from_ranked_paper(rp) for rp in ranked_papers],
+            "comments: CommentReadDTO (msgspec)": lambda: [CommentReadDTO.from_model(c) for c in comments],
+        }
+        for name, build in scenarios.items():
+            durations, size = time_encode(build, iterations, warmup)
+            results.append(summarize(f"{name} x{page_size} ({size / 1024:.0f} KiB)", "encode", durations, page_size))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DTO construction + JSON encoding per feed page.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    args = parser.parse_args()
+    print_report(run(args.iterations, args.warmup))
@@ -0,0 +1,131 @@
+"""
+Plan regression check for the filtered feed and repository queries.
+
+Runs the filtered benchmark scenarios against a seeded database, captures every SELECT
+they send, and EXPLAINs it. A scenario fails when any plan node reads `papers` or
+`paper_rankings` with a sequential scan; the venue/year filters are expected to go
+through the composite indexes (ix_papers_source_venue_category, ix_papers_source_date_id).
+
+The planner only prefers indexes on realistically sized tables with fresh statistics, so
+seed a local database first (see benchmarks/synthetic_corpus.py, e.g. --size 100000),
+then run from `backend`:
+    python -m benchmarks.check_query_plans --analyze
+Exits with status 1 if any scenario regressed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from datetime import date
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, text
+
+from model.database import SessionMaker, engine
+from model.paper_repository import paper_repository
+from services.config import LOGGING_CONFIG
+from services.ranking_service import RankingService, RANKING_BACKENDS
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+PAGE_SIZE = 50
+CHECKED_TABLES = ('papers', 'paper_rankings')
+SEQUENTIAL_SCAN_NODES = ('Seq Scan', 'Parallel Seq Scan')
+
+def _plan_scenarios(service: RankingService) -> Dict[str, Callable[[Any], Awaitable[Any]]]:
+    this_year = date.today().year
+    return {
+        "openreview: ICLR": lambda session: service.get_ranked_openreview_papers(session, limit=PAGE_SIZE, venue="ICLR"),
+        "openreview: this year": lambda session: service.get_ranked_openreview_papers(session, limit=PAGE_SIZE, year=this_year),
+        "openreview: ICLR this year": lambda session: service.get_ranked_openreview_papers(
+            session, limit=PAGE_SIZE, venue="ICLR", year=this_year
+        ),
+        "openreview: ICLR orals": lambda session: service.get_ranked_openreview_papers(
+            session, limit=PAGE_SIZE, venue="ICLR", category="Oral"
+        ),
+    }
+
+def _repository_scenarios() -> Dict[str, Callable[[Any], Awaitable[Any]]]:
+    return {
+        "repository: get_recent_openreview_papers (ICLR this year)": lambda session: paper_repository.get_recent_openreview_papers(
+            session, limit=PAGE_SIZE, venue="ICLR", year=date.today().year
+        ),
+    }
+
+def sequential_scans(plan: Dict[str, Any]) -> List[str]:
+    """Names of the checked tables read by a sequential scan anywhere in the plan tree."""
+    found = []
+    if plan.get("Node Type") in SEQUENTIAL_SCAN_NODES and plan.get("Relation Name") in CHECKED_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(sequential_scans(child))
+    return found
+
+async def capture_selects(query: Callable[[Any], Awaitable[Any]]) -> List[Tuple[str, Any]]:
+    """Runs a scenario once and returns the (statement, parameters) of every SELECT it sent."""
+    captured: List[Tuple[str, Any]] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        async with SessionMaker() as session:
+            await query(session)
+            await session.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    return captured
+
+async def explain(statement: str, parameters: Any) -> Dict[str, Any]:
+    async with engine.connect() as conn:
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        raw = result.scalar_one()
+    plans = json.loads(raw) if isinstance(raw, str) else raw
+    return plans[0]["Plan"]
+
+async def check(backends: List[str], analyze: bool, verbose: bool) -> bool:
+    if analyze:
+        async with engine.begin() as conn:
+            for table in CHECKED_TABLES:
+                await conn.execute(text(f"ANALYZE {table}"))
+
+    scenarios: Dict[str, Callable[[Any], Awaitable[Any]]] = {}
+    for backend in backends:
+        service = RankingService(backend=backend, use_cache=False)
+        scenarios.update({f"[{backend}] {name}": query for name, query in _plan_scenarios(service).items()})
+    scenarios.update(_repository_scenarios())
+
+    all_passed = True
+    for name, query in scenarios.items():
+        regressions = []
+        for statement, parameters in await capture_selects(query):
+            plan = await explain(statement, parameters)
+            scans = sequential_scans(plan)
+            if scans:
+                regressions.append((statement, scans, plan))
+        status = "FAIL" if regressions else "ok"
+        print(f"{status:<5} {name}")
+        for statement, scans, plan in regressions:
+            print(f"      sequential scan on {', '.join(sorted(set(scans)))} in: {' '.join(statement.split())[:160]}...")
+            if verbose:
+                print(json.dumps(plan, indent=2))
+        all_passed &= not regressions
+    return all_passed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Assert that the filtered feed queries plan as index scans.")
+    # The vectorized backend filters in memory, so only the SQL backends have plans worth checking.
+    parser.add_argument("--backends", default="precomputed,live", help=f"Comma-separated subset of {','.join(RANKING_BACKENDS)}.")
+    parser.add_argument("--analyze", action="store_true", help="Refresh planner statistics before checking.")
+    parser.add_argument("--verbose", action="store_true", help="Print the full plan of every failing statement.")
+    args = parser.parse_args()
+
+    selected = [b.strip() for b in args.backends.split(',') if b.strip()]
+    unknown = set(selected) - set(RANKING_BACKENDS)
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(sorted(unknown))}")
+    sys.exit(0 if asyncio.run(check(selected, args.analyze, args.verbose)) else 1)
@@ -0,0 +1,172 @@
+"""
+Seeds a local PostgreSQL database with a synthetic, reproducible corpus of papers for benchmarking.
+
+The distributions are shaped after the real data:
+- arXiv papers carry 1-4 categories drawn with a Zipf skew over ARXIV_CATEGORIES, dates
+  spread over the shelf life with more papers in recent weeks, and heavy-tailed
+  reputation scores (most authors have no top-tier publications).
+- OpenReview papers belong to the configured venues and years, with 3-6 keywords from a
+  long-tailed vocabulary and Oral/Spotlight/Poster categories.
+- Votes follow a power law: most papers get none, a few popular ones get hundreds.
+- A small share of papers carries 1-3 user tags.
+
+WARNING: this inserts directly into the database configured in .env, and with --reset it
+deletes every paper first. Point .env at a dedicated local benchmark database.
+
+Usage (from the `backend` directory):
+    python -m benchmarks.synthetic_corpus --size 100000 --reset
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+from sqlalchemy import delete, insert
+
+from model.database import SessionMaker, HOST
+from model.paper import Paper
+from model.comment import Comment
+from services.config import ARXIV_CATEGORIES, BASE_VENUE_CONFIGS, LOGGING_CONFIG, PAPER_SHELF_LIFE_MONTHS
+from services.ranking_store import rebuild_all_sources
+from services.tag_stats import rebuild_tag_stats
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+CORPUS_SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+OPENREVIEW_SHARE = 0.3
+USER_TAGGED_SHARE = 0.08
+INSERT_BATCH_SIZE = 5_000
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+KEYWORD_VOCABULARY_SIZE = 5_000
+USER_TAG_VOCABULARY = [
+    "must-read", "reproducible", "llm", "agents", "rlhf", "diffusion", "benchmark",
+    "theory", "efficient", "multimodal", "robotics", "survey", "interpretability",
+]
+OPENREVIEW_CATEGORIES = ["Oral", "Spotlight", "Poster", None]
+OPENREVIEW_CATEGORY_WEIGHTS = [0.05, 0.15, 0.7, 0.1]
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    return [1.0 / (rank ** exponent) for rank in range(1, count + 1)]
+
+class SyntheticCorpus:
+    def __init__(self, size: int, seed: int = 42):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.today = date.today()
+        self.arxiv_categories = [cat.lower() for cat in ARXIV_CATEGORIES]
+        self.arxiv_category_weights = _zipf_weights(len(self.arxiv_categories))
+        self.keyword_vocabulary = [f"topic-{i:04d}" for i in range(KEYWORD_VOCABULARY_SIZE)]
+        self.keyword_weights = _zipf_weights(KEYWORD_VOCABULARY_SIZE)
+        self.venues = [
+            (config['display_name'], year)
+            for config in BASE_VENUE_CONFIGS
+            for year in range(config.get('start_year', self.today.year - 1), self.today.year + 1)
+        ]
+
+    def _votes(self) -> tuple[int, int]:
+        # Pareto-distributed engagement: the median paper gets no votes at all.
+        engagement = int(self.rng.paretovariate(1.3)) - 1
+        if engagement <= 0:
+            return 0, 0
+        upvote_ratio = self.rng.betavariate(5, 2)
+        upvotes = int(round(engagement * upvote_ratio))
+        return upvotes, engagement - upvotes
+
+    def _reputation(self) -> float:
+        return float(min(int(self.rng.expovariate(0.15)) if self.rng.random() < 0.6 else 0, 200))
+
+    def _user_tags(self) -> List[str]:
+        if self.rng.random() >= USER_TAGGED_SHARE:
+            return []
+        return self.rng.sample(USER_TAG_VOCABULARY, self.rng.randint(1, 3))
+
+    def _authors(self) -> List[Dict[str, str]]:
+        return [{'name': f"Author {self.rng.randint(1, self.size)}"} for _ in range(self.rng.randint(1, 8))]
+
+    def _arxiv_row(self, index: int) -> dict:
+        shelf_days = PAPER_SHELF_LIFE_MONTHS * 30
+        # Exponential age distribution: recent weeks are densest, like the real submission stream.
+        age_days = min(int(self.rng.expovariate(1 / (shelf_days / 4))), shelf_days)
+        categories = list(dict.fromkeys(self.rng.choices(self.arxiv_categories, self.arxiv_category_weights, k=self.rng.randint(1, 4))))
+        upvotes, downvotes = self._votes()
+        source_id = f"synth.{index:07d}"
+        return dict(
+            source='arxiv', source_id=source_id, title=f"Synthetic arXiv paper {index}",
+            authors=self._authors(), abstract="Lorem ipsum dolor sit amet. " * self.rng.randint(20, 60),
+            paper_url=f"http://arxiv.org/abs/{source_id}", pdf_url=f"http://arxiv.org/pdf/{source_id}",
+            venue_or_category=categories[0], year_or_date=self.today - timedelta(days=age_days),
+            category=categories[0], keywords=categories, replies_data=None, user_tags=self._user_tags(),
+            reputation_score=self._reputation(), upvotes=upvotes, downvotes=downvotes,
+        )
+
+    def _openreview_row(self, index: int) -> dict:
+        venue, year = self.rng.choice(self.venues)
+        keywords = list(dict.fromkeys(self.rng.choices(self.keyword_vocabulary, self.keyword_weights, k=self.rng.randint(3, 6))))
+        source_id = f"synthOR{index:07d}"
+        publication_date = date(year, 1, 1) + timedelta(days=self.rng.randint(0, 300))
+        return dict(
+            source='openreview', source_id=source_id, title=f"Synthetic OpenReview paper {index}",
+            authors=self._authors(), abstract="Lorem ipsum dolor sit amet. " * self.rng.randint(20, 60),
+            paper_url=f"https://openreview.net/forum?id={source_id}", pdf_url=None,
+            venue_or_category=f"{venue} {year}", year_or_date=min(publication_date, self.today),
+            category=self.rng.choices(OPENREVIEW_CATEGORIES, OPENREVIEW_CATEGORY_WEIGHTS)[0],
+            keywords=keywords, replies_data=None, user_tags=self._user_tags(),
+            reputation_score=0.0, upvotes=0, downvotes=0,
+        )
+
+    def rows(self) -> Iterator[dict]:
+        for index in range(self.size):
+            if self.rng.random() < OPENREVIEW_SHARE:
+                yield self._openreview_row(index)
+            else:
+                yield self._arxiv_row(index)
+
+async def seed_corpus(size: int, seed: int = 42, reset: bool = False):
+    corpus = SyntheticCorpus(size, seed)
+    started = time.perf_counter()
+    async with SessionMaker() as session:
+        if reset:
+            logging.info("Deleting all existing papers and comments...")
+            await session.execute(delete(Comment))
+            await session.execute(delete(Paper))
+            await session.commit()
+
+        batch: List[dict] = []
+        inserted = 0
+        for row in corpus.rows():
+            batch.append(row)
+            if len(batch) >= INSERT_BATCH_SIZE:
+                await session.execute(insert(Paper), batch)
+                await session.commit()
+                inserted += len(batch)
+                batch = []
+                logging.info(f"Inserted {inserted}/{size} synthetic papers...")
+        if batch:
+            await session.execute(insert(Paper), batch)
+            await session.commit()
+            inserted += len(batch)
+
+    elapsed = time.perf_counter() - started
+    logging.info(f"✅ Seeded {inserted} papers in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/sec).")
+    await rebuild_all_sources()
+    await rebuild_tag_stats()
+
+def parse_size(value: str) -> int:
+    return CORPUS_SIZES.get(value.lower()) or int(value)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a local database with a synthetic paper corpus.")
+    parser.add_argument("--size", type=parse_size, default=CORPUS_SIZES["10k"], help="Number of papers, or one of 10k/100k/1m.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible corpora.")
+    parser.add_argument("--reset", action="store_true", help="Delete all existing papers before seeding.")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow seeding a non-local database host.")
+    args = parser.parse_args()
+
+    if HOST not in LOCAL_HOSTS and not args.allow_remote:
+        parser.error(f"Refusing to seed non-local database host '{HOST}'. Pass --allow-remote to override.")
+    asyncio.run(seed_corpus(args.size, args.seed, args.reset))
@@ -1,20 +1,21 @@
 # File: backend/controller/comment_controller.py
 
-from litestar import Controller, get, post
+from litestar import Controller, Response, get, post, status_codes
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from dataclasses import dataclass
 from datetime import datetime
+import msgspec
 
 from model.comment import Comment
-from model.comment_repository import comment_repository
+from model.comment_repository import comment_repository, CommentCursor
+from services.cursor import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
 
-@dataclass
-class CommentCreateDTO:
+MAX_COMMENTS_PAGE_SIZE = 200
+
+class CommentCreateDTO(msgspec.Struct):
     body: str
 
-@dataclass
-class CommentReadDTO:
+class CommentReadDTO(msgspec.Struct):
     id: int
     body: str
     created_at: datetime
@@ -24,15 +25,34 @@ class CommentReadDTO:
     def from_model(cls, model: Comment) -> "CommentReadDTO":
         return cls(id=model.id, body=model.body, created_at=model.created_at)
 
+def _parse_comment_cursor(after: str | None) -> CommentCursor | None:
+    return decode_cursor(after, datetime.fromisoformat, int) if after else None
+
 class CommentController(Controller):
     path = "/api" # Base path
 
+    # Newest first, `limit` at a time. The X-Next-Cursor header of a full page is passed back as `after`.
     @get("/papers/{paper_id:int}/comments")
-    async def list_comments_for_paper(self, session: AsyncSession, paper_id: int) -> List[CommentReadDTO]:
-        db_comments = await comment_repository.get_comments_for_paper(session, paper_id)
-        return [CommentReadDTO.from_model(comment) for comment in db_comments]
+    async def list_comments_for_paper(
+        self, session: AsyncSession, paper_id: int, limit: int = 50, after: str | None = None
+    ) -> Response[List[CommentReadDTO]]:
+        try:
+            cursor = _parse_comment_cursor(after)
+        except ValueError:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": "Invalid cursor"})
+        limit = max(1, min(limit, MAX_COMMENTS_PAGE_SIZE))
+        db_comments = await comment_repository.get_comments_for_paper(session, paper_id, limit=limit, after=cursor)
+        headers = {}
+        if len(db_comments) >= limit:
+            last = db_comments[-1]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at.isoformat(), last.id)
+        return Response(content=[CommentReadDTO.from_model(comment) for comment in db_comments], headers=headers)
 
     @post("/papers/{paper_id:int}/comments", status_code=201)
-    async def create_comment_for_paper(self, session: AsyncSession, paper_id: int, data: CommentCreateDTO) -> CommentReadDTO:
+    async def create_comment_for_paper(
+        self, session: AsyncSession, paper_id: int, data: CommentCreateDTO
+    ) -> Response[CommentReadDTO] | CommentReadDTO:
         new_comment = await comment_repository.create_comment(session, paper_id, data.body)
-        return CommentReadDTO.from_model(new_comment)
\ No newline at end of file
+        if new_comment is None:
+            return Response(status_code=status_codes.HTTP_404_NOT_FOUND, content={"error": "Paper not found"})
+        return CommentReadDTO.from_model(new_comment)
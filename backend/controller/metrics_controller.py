@@ -0,0 +1,32 @@
+# File: backend/controller/metrics_controller.py
+
+from litestar import Controller, get
+from typing import Dict, Any
+
+from model.database import pool_stats
+from services.feed_cache import feed_cache
+from services.session_routing import session_router
+from services.vote_buffer import vote_buffer
+
+class MetricsController(Controller):
+    path = "/api/metrics"
+
+    @get("/feed-cache")
+    async def get_feed_cache_metrics(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the ranked-feed cache, for sizing it."""
+        return feed_cache.stats()
+
+    @get("/vote-buffer")
+    async def get_vote_buffer_metrics(self) -> Dict[str, Any]:
+        """Buffer depth and flush latency of the write-behind vote buffer."""
+        return vote_buffer.stats()
+
+    @get("/db-pool")
+    async def get_db_pool_metrics(self) -> Dict[str, Any]:
+        """Connection checkouts, waits and timeouts of the engine's pool, plus its current occupancy."""
+        return pool_stats()
+
+    @get("/db-routing")
+    async def get_db_routing_metrics(self) -> Dict[str, Any]:
+        """How many sessions went to the primary vs the replica, and how many reads the read-your-writes window pinned."""
+        return session_router.stats()
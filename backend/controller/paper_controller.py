@@ -1,20 +1,33 @@
-from litestar import Controller, get, post, delete, Response, status_codes
+from litestar import Controller, Request, get, post, delete, Response, status_codes
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict, Any
-from dataclasses import dataclass, field
+from dataclasses import dataclass
+import msgspec
 
 from model.paper import Paper
 from model.paper_repository import paper_repository
-from services.ranking_service import ranking_service, RankedPaper
+from services.ranking_service import ranking_service, RankedPaper, FeedCursor, FeedProjection
+from services.cursor import encode_cursor, decode_cursor, NEXT_CURSOR_HEADER
+from services.etag import make_etag, etag_matches
+from services.ranking_store import ranking_store
+from datetime import date
+from services.config import FEED_ABSTRACT_PREVIEW_CHARS
+from services.vote_buffer import vote_buffer
+from services.search_service import search_service, SEARCH_SORTS
 
-# DTOs are unchanged
+# Request bodies
 @dataclass
 class VoteDTO: direction: str
 @dataclass
 class TagDTO: tag: str
 
-@dataclass
-class PaperDTO:
+# Response DTOs are msgspec Structs: Litestar encodes them natively in one pass, without
+# walking dataclass fields or building intermediate dicts.
+class TagItemDTO(msgspec.Struct):
+    name: str
+    isRemovable: bool
+
+class PaperDTO(msgspec.Struct):
     id: int
     source: str
     source_id: str
@@ -27,7 +40,8 @@ class PaperDTO:
     year_or_date: str | None
     upvotes: int
     downvotes: int
-    tags: List[Dict[str, Any]] = field(default_factory=list)
+    comment_count: int = 0
+    tags: List[TagItemDTO] = msgspec.field(default_factory=list)
     category: str | None = None
     replies_data: dict | None = None
     bleeding_edge_score: float | None = None
@@ -36,70 +50,254 @@ class PaperDTO:
     popularity_component: float | None = None
     
     @classmethod
-    def _build_unified_tags(cls, paper: Paper) -> List[Dict[str, Any]]:
-        unified_tags = []
-        for tag in (paper.keywords or []):
-            unified_tags.append({"name": tag, "isRemovable": False})
-        for tag in (paper.user_tags or []):
-            unified_tags.append({"name": tag, "isRemovable": True})
-        return unified_tags
+    def _build_unified_tags(cls, paper: Paper) -> List[TagItemDTO]:
+        return [TagItemDTO(tag, False) for tag in (paper.keywords or [])] + [TagItemDTO(tag, True) for tag in (paper.user_tags or [])]
 
     @classmethod
     def from_ranked_paper(cls, ranked_paper: RankedPaper) -> "PaperDTO":
-        paper = ranked_paper.paper
-        year_or_date_str = paper.year_or_date.isoformat() if paper.year_or_date else None
-        return cls(
-            id=paper.id,
-            source=paper.source,
-            source_id=paper.source_id,
-            title=paper.title,
-            authors=[author.get('name', 'Unknown Author') for author in (paper.authors or [])],
-            abstract=paper.abstract,
-            paper_url=paper.paper_url,
-            pdf_url=paper.pdf_url,
-            venue_or_category=paper.venue_or_category,
-            year_or_date=year_or_date_str,
-            upvotes=paper.upvotes,
-            downvotes=paper.downvotes,
-            tags=cls._build_unified_tags(paper),
-            category=paper.category,
-            replies_data=paper.replies_data,
+        return cls._from_paper(
+            ranked_paper.paper,
             bleeding_edge_score=ranked_paper.bleeding_edge_score,
             recency_component=ranked_paper.recency_component,
             reputation_component=ranked_paper.reputation_component,
-            popularity_component=ranked_paper.popularity_component
+            popularity_component=ranked_paper.popularity_component,
         )
 
     @classmethod
     def from_model(cls, model: Paper) -> "PaperDTO":
-        year_or_date_str = model.year_or_date.isoformat() if model.year_or_date else None
-        return cls(
-            id=model.id,
-            source=model.source,
-            source_id=model.source_id,
-            title=model.title,
-            authors=[author.get('name', 'Unknown Author') for author in (model.authors or [])],
-            abstract=model.abstract,
-            paper_url=model.paper_url,
-            pdf_url=model.pdf_url,
-            venue_or_category=model.venue_or_category,
-            year_or_date=year_or_date_str,
-            upvotes=model.upvotes,
-            downvotes=model.downvotes,
-            tags=cls._build_unified_tags(model),
-            category=model.category,
-            replies_data=model.replies_data
-        )
+        return cls._from_paper(model)
+
+    @classmethod
+    def _from_paper(cls, paper: Paper, **scores: float | None) -> "PaperDTO":
+        # Loaded column values are read straight from the instance dict, skipping the ORM's
+        # per-attribute descriptors (the bulk of the per-row cost on large pages); anything
+        # not loaded falls back to a normal attribute access.
+        loaded = paper.__dict__
+        values = {name: loaded[name] if name in loaded else getattr(paper, name) for name in _DTO_MODEL_COLUMNS}
+        values['authors'] = [author.get('name', 'Unknown Author') for author in (values['authors'] or [])]
+        values['year_or_date'] = values['year_or_date'].isoformat() if values['year_or_date'] else None
+        return cls(**values, tags=cls._build_unified_tags(paper), **scores)
+
+# PaperDTO fields copied unchanged from the model, plus `authors` and `year_or_date`, which are converted.
+_DTO_MODEL_COLUMNS = (
+    'id', 'source', 'source_id', 'title', 'authors', 'abstract', 'paper_url', 'pdf_url', 'venue_or_category',
+    'year_or_date', 'upvotes', 'downvotes', 'comment_count', 'category', 'replies_data',
+)
+
+class PaperLookupDTO(msgspec.Struct):
+    """One entry of a batch lookup, in request order; `paper` is None when the id doesn't exist."""
+    id: int
+    found: bool
+    paper: PaperDTO | None = None
+
+class SearchResultDTO(msgspec.Struct):
+    """A search hit: the paper plus its text relevance and HTML snippets with matches wrapped in <mark>."""
+    paper: PaperDTO
+    relevance: float
+    title_snippet: str
+    abstract_snippet: str | None = None
+
+SEARCH_SOURCES = ('arxiv', 'openreview')
+SEARCH_MAX_LIMIT = 100
+
+MAX_BATCH_IDS = 100
+
+def _parse_ids(ids: str) -> List[int]:
+    """Parses `ids=1,2,3`. Raises ValueError for non-integers or more than MAX_BATCH_IDS ids."""
+    try:
+        parsed = [int(part) for part in ids.split(',') if part.strip()]
+    except ValueError:
+        raise ValueError("ids must be comma-separated integers")
+    if not parsed:
+        raise ValueError("No ids given")
+    if len(parsed) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids per request")
+    return parsed
+
+# --- Sparse fieldsets for the feed endpoints ---
+# Maps each PaperDTO field to the `papers` columns it is built from (score fields come from the ranking).
+FIELD_COLUMNS: Dict[str, tuple] = {
+    'id': ('id',), 'source': ('source',), 'source_id': ('source_id',), 'title': ('title',),
+    'authors': ('authors',), 'abstract': ('abstract',), 'paper_url': ('paper_url',), 'pdf_url': ('pdf_url',),
+    'venue_or_category': ('venue_or_category',), 'year_or_date': ('year_or_date',),
+    'upvotes': ('upvotes',), 'downvotes': ('downvotes',), 'comment_count': ('comment_count',), 'tags': ('keywords', 'user_tags'),
+    'category': ('category',), 'replies_data': ('replies_data',),
+    'bleeding_edge_score': (), 'recency_component': (), 'reputation_component': (), 'popularity_component': (),
+}
+COMPACT_VIEW_FIELDS = (
+    'id', 'source', 'title', 'authors', 'abstract', 'paper_url', 'venue_or_category',
+    'year_or_date', 'upvotes', 'downvotes', 'comment_count', 'tags', 'category', 'bleeding_edge_score',
+)
+FEED_VIEWS = ('full', 'compact')
+
+# Fields whose JSON value isn't just the column value.
+FIELD_SERIALIZERS = {
+    'authors': lambda rp: [author.get('name', 'Unknown Author') for author in (rp.paper.authors or [])],
+    'year_or_date': lambda rp: rp.paper.year_or_date.isoformat() if rp.paper.year_or_date else None,
+    'tags': lambda rp: PaperDTO._build_unified_tags(rp.paper),
+    'bleeding_edge_score': lambda rp: rp.bleeding_edge_score,
+    'recency_component': lambda rp: rp.recency_component,
+    'reputation_component': lambda rp: rp.reputation_component,
+    'popularity_component': lambda rp: rp.popularity_component,
+}
+
+def _parse_projection(view: str, fields: str | None) -> tuple[FeedProjection, tuple] | None:
+    """
+    Returns the SQL projection and the response fields for a sparse request,
+    or None for the default full view. Raises ValueError for unknown views/fields.
+    """
+    if view not in FEED_VIEWS:
+        raise ValueError(f"Unknown view '{view}'")
+    if fields:
+        requested = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+        unknown = [f for f in requested if f not in FIELD_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    elif view == 'compact':
+        requested = COMPACT_VIEW_FIELDS
+    else:
+        return None
+    columns = tuple(dict.fromkeys(column for f in requested for column in FIELD_COLUMNS[f]))
+    abstract_chars = FEED_ABSTRACT_PREVIEW_CHARS if view == 'compact' else None
+    return FeedProjection(columns, abstract_chars), requested
+
+def _project_ranked_paper(ranked_paper: RankedPaper, fields: tuple) -> Dict[str, Any]:
+    return {
+        name: FIELD_SERIALIZERS[name](ranked_paper) if name in FIELD_SERIALIZERS else getattr(ranked_paper.paper, name)
+        for name in fields
+    }
+
+class StaleCursorError(ValueError):
+    """A feed cursor issued for an earlier ranking version, whose scores may since have shifted."""
+
+async def _feed_version(session: AsyncSession, source: str) -> int | None:
+    """
+    The ranking version feed pages are served at (bumped by votes, ingestion, tag and comment changes).
+    None when no stable version exists: a rebuild is pending, or the 'live' backend scores against now().
+    """
+    if ranking_service.backend == 'live':
+        return None
+    return await ranking_store.get_version(session, source)
+
+def _parse_feed_cursor(after: str | None, version: int | None) -> FeedCursor | None:
+    """
+    Cursors carry the version they were issued at, since keyset paging is only exact while scores
+    don't move. Raises StaleCursorError once the version has changed, ValueError if malformed.
+    """
+    if not after:
+        return None
+    if ranking_service.backend == 'live':
+        raise ValueError("Cursor paging is not available with live ranking; page with offset")
+    cursor_version, score, paper_id = decode_cursor(after, int, float, int)
+    if cursor_version != version:
+        raise StaleCursorError("The feed has changed since this cursor was issued; continue with offset")
+    return score, paper_id
+
+def _feed_etag(request: Request, source: str, version: int | None) -> str | None:
+    """
+    A strong ETag for a feed page: the source's ranking version, the recency day, the backend
+    and the normalized query parameters. None when there is no stable version.
+    """
+    if version is None:
+        return None
+    query = sorted(request.query_params.multi_items())
+    return make_etag(source, version, date.today().isoformat(), ranking_service.backend, query)
+
+def _not_modified(etag: str) -> Response[None]:
+    return Response(content=None, status_code=status_codes.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def _feed_response(
+    ranked_papers: List[RankedPaper], limit: int, fields: tuple | None = None, version: int | None = None,
+    etag: str | None = None,
+) -> Response[List[PaperDTO] | List[Dict[str, Any]]]:
+    """Serializes a feed page and, when the page is full and versioned, advertises the cursor for the next one."""
+    headers = {}
+    if etag is not None:
+        headers.update({"ETag": etag, "Cache-Control": "no-cache"})
+    if version is not None and ranked_papers and len(ranked_papers) >= limit:
+        last = ranked_papers[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(version, last.bleeding_edge_score, last.paper.id)
+    if fields is not None:
+        return Response(content=[_project_ranked_paper(rp, fields) for rp in ranked_papers], headers=headers)
+    return Response(content=[PaperDTO.from_ranked_paper(rp) for rp in ranked_papers], headers=headers)
 
 class PaperController(Controller):
     path = "/api/papers"
 
+    @get("/")
+    async def get_papers(self, session: AsyncSession, ids: str) -> Response[List[PaperLookupDTO]]:
+        """Batch lookup: `?ids=1,2,3` in a single query, answered in the requested order."""
+        try:
+            paper_ids = _parse_ids(ids)
+        except ValueError as e:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": str(e)})
+        papers = await paper_repository.get_papers_by_ids(session, paper_ids)
+        return Response(content=[
+            PaperLookupDTO(paper_id, True, PaperDTO.from_model(papers[paper_id])) if paper_id in papers
+            else PaperLookupDTO(paper_id, False)
+            for paper_id in paper_ids
+        ])
+
+    @get("/search")
+    async def search_papers(
+        self,
+        session: AsyncSession,
+        q: str,
+        source: str,
+        tags: str | None = None,
+        venue: str | None = None,
+        year: int | None = None,
+        category: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = 'relevance',
+    ) -> Response[List[SearchResultDTO]]:
+        """
+        Full-text search over titles and abstracts (web-search syntax: "phrases", or, -term),
+        combinable with the feed filters. `sort=relevance` orders by text rank (title matches
+        first); `sort=ranking` orders the matches by the bleeding-edge score instead.
+        """
+        if not q.strip():
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": "Empty search query"})
+        if source not in SEARCH_SOURCES:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": f"Unknown source '{source}'"})
+        if sort not in SEARCH_SORTS:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": f"Unknown sort '{sort}'"})
+        hits = await search_service.search(
+            session,
+            q.strip(),
+            source,
+            tags=tags.split(',') if tags else None,
+            venue=venue,
+            year=year,
+            category=category,
+            limit=max(1, min(limit, SEARCH_MAX_LIMIT)),
+            offset=max(0, offset),
+            sort=sort,
+        )
+        return Response(content=[
+            SearchResultDTO(
+                paper=PaperDTO.from_ranked_paper(hit.ranked) if hit.ranked else PaperDTO.from_model(hit.paper),
+                relevance=hit.relevance,
+                title_snippet=hit.title_snippet,
+                abstract_snippet=hit.abstract_snippet,
+            )
+            for hit in hits
+        ])
+
     @get("/{paper_id:int}")
-    async def get_paper(self, session: AsyncSession, paper_id: int) -> Response[PaperDTO] | PaperDTO:
+    async def get_paper(self, session: AsyncSession, request: Request, paper_id: int) -> Response[PaperDTO]:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Revalidation only needs the version counter, not the row.
+            version = await paper_repository.get_paper_version(session, paper_id)
+            if version is not None and etag_matches(if_none_match, make_etag('paper', paper_id, version)):
+                return _not_modified(make_etag('paper', paper_id, version))
         paper = await paper_repository.get_paper_by_id(session, paper_id)
         if not paper:
             return Response(status_code=status_codes.HTTP_404_NOT_FOUND, content={"error": "Paper not found"})
-        return PaperDTO.from_model(paper)
+        etag = make_etag('paper', paper.id, paper.version)
+        return Response(content=PaperDTO.from_model(paper), headers={"ETag": etag, "Cache-Control": "no-cache"})
     
     @post("/{paper_id:int}/tags")
     async def add_tag(self, session: AsyncSession, paper_id: int, data: TagDTO) -> Response[None]:
@@ -107,6 +305,7 @@ class PaperController(Controller):
         if result == 'NOT_FOUND': return Response(status_code=status_codes.HTTP_404_NOT_FOUND, content={"error": "Paper not found"})
         if result == 'FULL': return Response(status_code=status_codes.HTTP_409_CONFLICT, content={"error": "Tag limit reached"})
         if result == 'EXISTS': return Response(status_code=status_codes.HTTP_409_CONFLICT, content={"error": "Tag already exists"})
+        if result == 'CONFLICT': return Response(status_code=status_codes.HTTP_409_CONFLICT, content={"error": "The paper's tags changed concurrently; please retry"})
         return Response(status_code=status_codes.HTTP_201_CREATED)
 
     @delete("/{paper_id:int}/tags")
@@ -115,36 +314,85 @@ class PaperController(Controller):
         if result == 'NOT_FOUND' or result == 'TAG_NOT_FOUND': return Response(status_code=status_codes.HTTP_404_NOT_FOUND, content={"error": "Resource not found"})
         return Response(status_code=status_codes.HTTP_204_NO_CONTENT)
 
-    # --- THIS IS THE FIX ---
-    # The `status_code=204` has been removed from the decorator.
-    # Litestar will now correctly use 204 for the `return None` success case,
-    # and 400/404 for the `Response` error cases.
+    # No status_code on the decorator: `return None` answers 204, and the error cases return their own Response.
     @post("/{paper_id:int}/vote")
     async def vote_on_paper(self, session: AsyncSession, paper_id: int, data: VoteDTO) -> Response[None] | None:
         if data.direction not in ['up', 'down']:
             return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": "Invalid vote direction"})
+        if vote_buffer.enabled:
+            # Write-behind: acknowledge without touching the database; the next batched flush applies
+            # the vote, and its UPDATE ... FROM (VALUES ...) simply skips ids that don't exist.
+            if not vote_buffer.add(paper_id, data.direction):
+                # Flushes have been failing long enough to fill the buffer; refuse rather than grow it.
+                return Response(
+                    status_code=status_codes.HTTP_503_SERVICE_UNAVAILABLE, content={"error": "Votes are temporarily unavailable"}
+                )
+            return None
         success = await paper_repository.vote_on_paper(session, paper_id, data.direction)
         if not success:
             return Response(status_code=status_codes.HTTP_404_NOT_FOUND, content={"error": "Paper not found"})
         return None
 
+    # Both feeds support two paging modes: the legacy `offset`, and keyset paging via `after`,
+    # which takes the opaque token from the previous page's X-Next-Cursor header (offset is then ignored).
+    # Cursors are only issued by the versioned backends and expire (410) when the version changes,
+    # after which the client continues with `offset`.
+    # `view=compact` and/or `fields=a,b,c` select a slim projection instead of full PaperDTOs.
+    # Both also send an ETag; polling with If-None-Match gets a 304 until the source changes.
     @get("/arxiv")
-    async def list_arxiv_papers(self, session: AsyncSession, limit: int = 50, offset: int = 0, tags: str | None = None) -> List[PaperDTO]:
+    async def list_arxiv_papers(
+        self, session: AsyncSession, request: Request, limit: int = 50, offset: int = 0, tags: str | None = None,
+        after: str | None = None, view: str = 'full', fields: str | None = None
+    ) -> Response[List[PaperDTO] | List[Dict[str, Any]]]:
+        try:
+            projection, response_fields = _parse_projection(view, fields) or (None, None)
+        except ValueError as e:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": str(e)})
+        version = await _feed_version(session, 'arxiv')
+        try:
+            cursor = _parse_feed_cursor(after, version)
+        except StaleCursorError as e:
+            return Response(status_code=status_codes.HTTP_410_GONE, content={"error": str(e)})
+        except ValueError as e:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": str(e)})
+        etag = _feed_etag(request, 'arxiv', version)
+        if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+            return _not_modified(etag)
         tags_list = tags.split(',') if tags else None
-        ranked_papers = await ranking_service.get_ranked_arxiv_papers(session, limit=limit, offset=offset, tags=tags_list)
-        return [PaperDTO.from_ranked_paper(rp) for rp in ranked_papers]
+        ranked_papers = await ranking_service.get_ranked_arxiv_papers(
+            session, limit=limit, offset=offset, tags=tags_list, after=cursor, projection=projection
+        )
+        return _feed_response(ranked_papers, limit, response_fields, version, etag)
 
     @get("/openreview")
     async def list_openreview_papers(
         self,
         session: AsyncSession,
+        request: Request,
         limit: int = 50,
         offset: int = 0,
         tags: str | None = None,
         venue: str | None = None,
         year: int | None = None,
         category: str | None = None,
-    ) -> List[PaperDTO]:
+        after: str | None = None,
+        view: str = 'full',
+        fields: str | None = None,
+    ) -> Response[List[PaperDTO] | List[Dict[str, Any]]]:
+        try:
+            projection, response_fields = _parse_projection(view, fields) or (None, None)
+        except ValueError as e:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": str(e)})
+        version = await _feed_version(session, 'openreview')
+        try:
+            cursor = _parse_feed_cursor(after, version)
+        except StaleCursorError as e:
+            return Response(status_code=status_codes.HTTP_410_GONE, content={"error": str(e)})
+        except ValueError as e:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": str(e)})
+        etag = _feed_etag(request, 'openreview', version)
+        if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+            return _not_modified(etag)
         tags_list = tags.split(',') if tags else None
         ranked_papers = await ranking_service.get_ranked_openreview_papers(
             session,
@@ -154,5 +402,7 @@ class PaperController(Controller):
             venue=venue,
             year=year,
             category=category,
+            after=cursor,
+            projection=projection,
         )
-        return [PaperDTO.from_ranked_paper(rp) for rp in ranked_papers]
\ No newline at end of file
+        return _feed_response(ranked_papers, limit, response_fields, version, etag)
\ No newline at end of file
@@ -1,19 +1,79 @@
 # File: backend/controller/tag_controller.py
 
-from litestar import Controller, get
-from typing import List
+from email.utils import parsedate_to_datetime
+from dataclasses import dataclass
+from litestar import Controller, Request, Response, get, status_codes
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List
 
 # We will import the new tag service we are about to create
-from services.tag_service import tag_service
+from services.tag_service import tag_service, TagListSnapshot
+from services.tag_stats import tag_stats_store
+from services.etag import etag_matches
+
+SUGGEST_MAX_LIMIT = 50
+FACETS_MAX_LIMIT = 500
+FACET_SOURCES = ('arxiv', 'openreview')
+
+@dataclass
+class TagSuggestionDTO:
+    name: str
+    count: int
+
+def _is_not_modified(request: Request, snapshot: TagListSnapshot) -> bool:
+    """Evaluates the conditional request headers; If-None-Match takes precedence over If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, snapshot.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return snapshot.last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
 
 class TagController(Controller):
     path = "/api/tags"
 
     @get("/all")
-    async def get_all_tags(self) -> List[str]:
+    async def get_all_tags(self, request: Request) -> Response[List[str]]:
         """
         Returns a de-duplicated, alphabetized list of all tags in the system.
-        This result is cached for performance.
+        This result is cached for performance, and carries ETag/Last-Modified
+        validators so clients can revalidate with a 304 instead of re-downloading it.
+        """
+        snapshot = await tag_service.get_snapshot()
+        headers = {
+            "ETag": snapshot.etag,
+            "Last-Modified": snapshot.last_modified_http,
+            "Cache-Control": "no-cache",
+        }
+        if _is_not_modified(request, snapshot):
+            return Response(content=None, status_code=status_codes.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=snapshot.tags, headers=headers)
+
+    @get("/suggest")
+    async def suggest_tags(self, prefix: str = "", limit: int = 10) -> List[TagSuggestionDTO]:
+        """
+        Typeahead suggestions: the most popular tags starting with `prefix` (case-insensitive),
+        served from an in-memory prefix index instead of shipping the whole tag list to the client.
+        """
+        limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+        suggestions = await tag_service.suggest(prefix, limit)
+        return [TagSuggestionDTO(name=s.name, count=s.count) for s in suggestions]
+
+    @get("/facets")
+    async def get_tag_facets(
+        self, session: AsyncSession, source: str, tags: str | None = None, limit: int = 100
+    ) -> Response[Dict[str, Any]]:
+        """
+        Paper counts for a source filter: the source's total and, per tag, how many of its papers
+        carry it. With `tags=a,b` only those tags are counted; otherwise the `limit` most used.
+        Served from the `tag_stats` table, so the cost is proportional to the tags, not the papers.
         """
-        all_tags = await tag_service.get_all_tags()
-        return all_tags
\ No newline at end of file
+        if source not in FACET_SOURCES:
+            return Response(status_code=status_codes.HTTP_400_BAD_REQUEST, content={"error": f"Unknown source '{source}'"})
+        tags_list = [t.strip() for t in tags.split(',') if t.strip()] if tags else None
+        limit = max(1, min(limit, FACETS_MAX_LIMIT))
+        return Response(content=await tag_stats_store.get_facets(session, source, tags_list, limit))
@@ -5,6 +5,8 @@ from model.database import Base, engine
 from model.paper import Paper
 from model.job_tracker import JobTracker
 from model.comment import Comment
+from model.paper_ranking import PaperRanking, RankingState
+from model.tag_stat import TagStat
 
 async def create_all_tables():
     """
@@ -1,24 +1,48 @@
 # File: backend/main.py
 
 from litestar.config.cors import CORSConfig
-from litestar import Litestar
+from litestar.config.compression import CompressionConfig
+from litestar import Litestar, Request
 from litestar.di import Provide
-from model.database import SessionMaker
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import AsyncGenerator
 
 from controller.paper_controller import PaperController
 from controller.comment_controller import CommentController # <-- IMPORT
 from controller.tag_controller import TagController
+from controller.metrics_controller import MetricsController
+from services.cursor import NEXT_CURSOR_HEADER
+from services.vote_buffer import vote_buffer
+from services.tag_service import tag_service
+from services.session_routing import session_router
+from services.ranking_store import ranking_store
+from services.config import COMPRESSION_MINIMUM_SIZE_BYTES
 
-cors_config = CORSConfig(allow_origins=["http://localhost:5173"])
+# Credentials are allowed so the read-your-writes cookie travels with cross-origin API calls.
+cors_config = CORSConfig(allow_origins=["http://localhost:5173"], allow_credentials=True, expose_headers=[NEXT_CURSOR_HEADER])
 
-async def provide_db_session() -> AsyncGenerator[AsyncSession, None]:
-    async with SessionMaker() as session:
+# Brotli needs the optional `brotli` package (litestar[brotli]); gzip is always available.
+try:
+    import brotli  # noqa: F401
+    compression_backend = "brotli"
+except ImportError:
+    compression_backend = "gzip"
+compression_config = CompressionConfig(
+    backend=compression_backend, minimum_size=COMPRESSION_MINIMUM_SIZE_BYTES, brotli_gzip_fallback=True
+)
+
+async def provide_db_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    # Read-only requests go to the replica (when configured), writes to the primary.
+    async with session_router.session_maker_for(request)() as session:
         yield session
 
 app = Litestar(
-    route_handlers=[PaperController, CommentController, TagController], # <-- REGISTER
+    route_handlers=[PaperController, CommentController, TagController, MetricsController], # <-- REGISTER
     dependencies={"session": Provide(provide_db_session)},
-    cors_config=cors_config
+    cors_config=cors_config,
+    compression_config=compression_config,
+    before_send=[session_router.mark_write],
+    on_startup=[vote_buffer.start, tag_service.warm, ranking_store.start],
+    # Votes are flushed before the final ranking sync picks them up.
+    on_shutdown=[vote_buffer.stop, ranking_store.stop],
 )
\ No newline at end of file
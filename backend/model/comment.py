@@ -1,6 +1,6 @@
 # File: backend/model/comment.py
 
-from sqlalchemy import Integer, Text, ForeignKey, DateTime, func
+from sqlalchemy import Integer, Text, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column
 from .database import Base
 from datetime import datetime
@@ -11,11 +11,15 @@ class Comment(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     
-    # The paper this comment belongs to. Indexed for fast lookups.
-    paper_id: Mapped[int] = mapped_column(ForeignKey("papers.id"), index=True)
+    # The paper this comment belongs to. Looked up through the thread index below.
+    paper_id: Mapped[int] = mapped_column(ForeignKey("papers.id"))
     
     # The content of the comment.
     body: Mapped[str] = mapped_column(Text, nullable=False)
     
     # Timestamp for chronological sorting.
-    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+# A paper's thread, newest first: serves both the first page and every keyset page
+# (`(created_at, id) < cursor`) as a single index range scan.
+Index('ix_comments_paper_thread', Comment.paper_id, Comment.created_at.desc(), Comment.id.desc())
@@ -1,28 +1,80 @@
 # File: backend/model/comment_repository.py
 
+import logging
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, update, func, tuple_
+from datetime import datetime
+from typing import List, Tuple
 
 from .comment import Comment
+from .paper import Paper
+from services.feed_cache import feed_cache
+from services.ranking_store import ranking_store
+from .database import SessionMaker
+
+# (created_at, id) of the last comment a client has seen
+CommentCursor = Tuple[datetime, int]
 
 class CommentRepository:
-    async def create_comment(self, session: AsyncSession, paper_id: int, body: str) -> Comment:
-        """Creates and saves a new anonymous comment for a paper."""
+    async def create_comment(self, session: AsyncSession, paper_id: int, body: str) -> Comment | None:
+        """
+        Creates and saves a new anonymous comment for a paper, bumping the paper's comment_count
+        in the same transaction. Returns None if the paper doesn't exist.
+        """
+        stmt = (
+            update(Paper)
+            .where(Paper.id == paper_id)
+            .values(comment_count=Paper.comment_count + 1, version=Paper.version + 1)
+            .returning(Paper.source)
+            .execution_options(synchronize_session=False)
+        )
+        source = (await session.execute(stmt)).scalar_one_or_none()
+        if source is None:
+            return None
         new_comment = Comment(paper_id=paper_id, body=body)
         session.add(new_comment)
         await session.commit()
+        # Feeds display comment counts, so their ETags must change too (at the next ranking sync).
+        ranking_store.mark_changed(source)
         await session.refresh(new_comment)
+        # Cached feed pages showing this paper carry its old comment count.
+        feed_cache.invalidate_paper(paper_id)
         return new_comment
 
-    async def get_comments_for_paper(self, session: AsyncSession, paper_id: int) -> List[Comment]:
-        """Retrieves all comments for a given paper, sorted chronologically (newest first)."""
-        stmt = (
-            select(Comment)
-            .where(Comment.paper_id == paper_id)
-            .order_by(Comment.created_at.desc())
-        )
+    async def get_comments_for_paper(
+        self, session: AsyncSession, paper_id: int, limit: int = 50, after: CommentCursor | None = None
+    ) -> List[Comment]:
+        """
+        Retrieves one page of comments for a given paper, sorted chronologically (newest first).
+        `after` is the (created_at, id) of the last comment of the previous page.
+        """
+        stmt = select(Comment).where(Comment.paper_id == paper_id)
+        if after is not None:
+            stmt = stmt.where(tuple_(Comment.created_at, Comment.id) < tuple_(*after))
+        stmt = stmt.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit)
         result = await session.execute(stmt)
         return result.scalars().all()
 
-comment_repository = CommentRepository()
\ No newline at end of file
+    async def recount_comments(self, session: AsyncSession) -> int:
+        """Sets every paper's comment_count from the comments table. Returns the rows corrected. Does not commit."""
+        counts = select(Comment.paper_id, func.count().label('n')).group_by(Comment.paper_id).subquery('comment_counts')
+        stmt = (
+            update(Paper)
+            .where(Paper.id == counts.c.paper_id, Paper.comment_count != counts.c.n)
+            .values(comment_count=counts.c.n)
+            .execution_options(synchronize_session=False)
+        )
+        return (await session.execute(stmt)).rowcount
+
+comment_repository = CommentRepository()
+
+async def backfill_comment_counts():
+    """One-off for databases created before comment_count existed (the column defaults to 0)."""
+    async with SessionMaker() as session:
+        corrected = await comment_repository.recount_comments(session)
+        await session.commit()
+    logging.info(f"✅ Backfilled comment_count on {corrected} papers.")
+
+if __name__ == "__main__":
+    import asyncio
+    asyncio.run(backfill_comment_counts())
@@ -1,9 +1,13 @@
 # in model/database.py
 import os
+import uuid
+from typing import Any, Dict
 from dotenv import load_dotenv
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine
 from sqlalchemy.orm import DeclarativeBase
 
+from .pool_metrics import InstrumentedAsyncQueuePool
+
 class Base(DeclarativeBase):
     pass
 
@@ -15,9 +19,82 @@ HOST = os.getenv("host")
 PORT = os.getenv("port")
 DBNAME = os.getenv("dbname")
 
-# Standard asyncpg driver, no extra arguments
 DATABASE_URL = f"postgresql+asyncpg://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}"
 
-engine = create_async_engine(DATABASE_URL)
+# --- Engine profiles ---
+# DB_PROFILE picks a baseline; any DB_* variable below overrides a single setting.
+#   default:   a single API worker or a fetcher run against a direct Postgres connection.
+#   api:       larger pool for API workers serving concurrent feed reads and writes.
+#   pgbouncer: behind a transaction-mode pooler (e.g. Supabase's on port 6543). A server
+#              connection can change between statements, so prepared statements are
+#              disabled: asyncpg's statement cache is off and the dialect's prepared
+#              statements get unique names, so they never collide on a shared connection.
+ENGINE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True, "statement_cache_size": 100, "pgbouncer": False},
+    "api": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 10, "pool_recycle": 1800, "pool_pre_ping": True, "statement_cache_size": 500, "pgbouncer": False},
+    "pgbouncer": {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 300, "pool_pre_ping": True, "statement_cache_size": 0, "pgbouncer": True},
+}
+
+def _env_override(name: str, default: Any) -> Any:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    if isinstance(default, bool):
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    return type(default)(raw)
+
+def engine_settings(profile: str | None = None) -> Dict[str, Any]:
+    """The selected profile with per-setting environment overrides applied."""
+    profile = profile or os.getenv("DB_PROFILE", "default")
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{profile}'. Expected one of {tuple(ENGINE_PROFILES)}.")
+    settings = {
+        name: _env_override(f"DB_{name.upper()}", default)
+        for name, default in ENGINE_PROFILES[profile].items()
+    }
+    settings["profile"] = profile
+    return settings
+
+def make_engine(url: str, settings: Dict[str, Any]) -> AsyncEngine:
+    connect_args: Dict[str, Any] = {"prepared_statement_cache_size": settings["statement_cache_size"]}
+    if settings["pgbouncer"]:
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__",
+        )
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        pool_recycle=settings["pool_recycle"],
+        pool_pre_ping=settings["pool_pre_ping"],
+        connect_args=connect_args,
+    )
+
+def _asyncpg_url(dsn: str) -> str:
+    """Accepts a plain Postgres DSN (as hosting dashboards print them) and selects the asyncpg driver."""
+    for prefix in ("postgresql+asyncpg://", "postgresql://", "postgres://"):
+        if dsn.startswith(prefix):
+            return "postgresql+asyncpg://" + dsn[len(prefix):]
+    raise ValueError("REPLICA_DATABASE_URL must be a postgres:// or postgresql:// DSN.")
+
+ENGINE_SETTINGS = engine_settings()
+engine = make_engine(DATABASE_URL, ENGINE_SETTINGS)
+
+SessionMaker = async_sessionmaker(engine, expire_on_commit=False)
+
+# Optional read replica. Without one, read-only sessions simply use the primary.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL") or None
+replica_engine = make_engine(_asyncpg_url(REPLICA_DATABASE_URL), ENGINE_SETTINGS) if REPLICA_DATABASE_URL else None
+
+ReplicaSessionMaker = async_sessionmaker(replica_engine, expire_on_commit=False) if replica_engine else SessionMaker
 
-SessionMaker = async_sessionmaker(engine, expire_on_commit=False)
\ No newline at end of file
+def pool_stats() -> Dict[str, Any]:
+    """Checkout/wait counters and current occupancy of the engine's connection pool(s)."""
+    stats = {"profile": ENGINE_SETTINGS["profile"], "pgbouncer": ENGINE_SETTINGS["pgbouncer"], **engine.pool.stats()}
+    if replica_engine is not None:
+        stats["replica"] = replica_engine.pool.stats()
+    return stats
@@ -1,11 +1,23 @@
 # File: backend/model/paper.py
 
-from sqlalchemy import String, Integer, Text, Float, Date, Index, CheckConstraint
+from sqlalchemy import String, Integer, Text, Float, Date, Index, CheckConstraint, Computed, func
 from sqlalchemy.orm import Mapped, mapped_column, validates
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from .database import Base
 from datetime import date, datetime
 
+USER_TAGS_MAX = 3
+SEARCH_TEXT_CONFIG = 'english'  # Postgres text search configuration for the search_vector column and queries
+ARXIV_VERSION_SUFFIX_PATTERN = 'v[0-9]+$'  # Stripped from arXiv source ids to match any version of a paper
+
+def venue_key(venue: str) -> str:
+    """The venue's first word, lowercased ('ICLR 2024' -> 'iclr'); the Python twin of the `venue_key` column."""
+    return venue.split(' ', 1)[0].lower()
+
+def year_range(year: int) -> tuple[date, date]:
+    """[Jan 1 of `year`, Jan 1 of the next year), so year filters are index-friendly range tests on year_or_date."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
 class Paper(Base):
     # ... all other columns are unchanged ...
     __tablename__ = "papers"
@@ -19,18 +31,56 @@ class Paper(Base):
     pdf_url: Mapped[str | None]
     venue_or_category: Mapped[str] = mapped_column(String(200))
     year_or_date: Mapped[date] = mapped_column(Date) # Stays as Date type
+    # Normalized venue for equality filters: OpenReview venues are stored as '<display name> <year>'
+    # and filtered by display name, which a b-tree can't serve as a case-insensitive substring match.
+    venue_key: Mapped[str] = mapped_column(
+        String(200), Computed("lower(split_part(venue_or_category, ' ', 1))", persisted=True), deferred=True
+    )
     category: Mapped[str | None] = mapped_column(String(100))
     replies_data: Mapped[list | None] = mapped_column(JSONB)
     keywords: Mapped[list | None] = mapped_column(JSONB)
     user_tags: Mapped[list[str] | None] = mapped_column(JSONB, server_default='[]')
+    # Keywords and user tags in one array, maintained by Postgres, so every tag filter is a
+    # single `all_tags @> [...]` containment test on one GIN index. Read-only from the ORM;
+    # PaperDTO keeps building its tags from the two source columns to know which are removable.
+    all_tags: Mapped[list[str]] = mapped_column(
+        JSONB,
+        Computed("coalesce(keywords, '[]'::jsonb) || coalesce(user_tags, '[]'::jsonb)", persisted=True),
+        deferred=True,
+    )
+    # Full-text search document: title (weight A) ranks above abstract (weight B). Stored and
+    # maintained by Postgres on every insert/update, whichever fetcher wrote the row.
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce(abstract, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
     reputation_score: Mapped[float] = mapped_column(Float, default=0.0, index=True)
     upvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     downvotes: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Maintained by CommentRepository.create_comment, so list views can show counts without joining comments.
+    comment_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    # Bumped by every write to the paper after ingestion (votes, user tags, comments); the
+    # detail endpoint's ETag is derived from it.
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
 
     __table_args__ = (
-        Index('ix_papers_keywords_gin', keywords, postgresql_using='gin'),
-        Index('ix_papers_user_tags_gin', user_tags, postgresql_using='gin'),
-        CheckConstraint("jsonb_array_length(user_tags) <= 3", name="user_tags_max_3"),
+        # jsonb_path_ops only supports containment, which is all the tag filters use, and is much smaller.
+        Index('ix_papers_all_tags_gin', all_tags, postgresql_using='gin', postgresql_ops={'all_tags': 'jsonb_path_ops'}),
+        Index('ix_papers_search_vector_gin', search_vector, postgresql_using='gin'),
+        # Year filters (date ranges) and newest-first listings within a source.
+        Index('ix_papers_source_date_id', source, year_or_date, id),
+        Index('ix_papers_source_venue_category', source, venue_key, category),
+        # arXiv ids without their version suffix, for matching a paper whichever version was stored.
+        Index(
+            'ix_papers_arxiv_base_id', func.regexp_replace(source_id, ARXIV_VERSION_SUFFIX_PATTERN, ''),
+            postgresql_where=(source == 'arxiv'),
+        ),
+        CheckConstraint(f"jsonb_array_length(user_tags) <= {USER_TAGS_MAX}", name="user_tags_max_3"),
     )
 
     # --- THIS IS THE ROBUST SOLUTION ---
@@ -0,0 +1,62 @@
+# File: backend/model/paper_ranking.py
+
+from sqlalchemy import String, Integer, Float, Date, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+from .database import Base
+from datetime import date, datetime
+
+class PaperRanking(Base):
+    """
+    Persisted bleeding-edge ranking for a single paper.
+    Raw components are stored alongside their per-source normalized values so that
+    a single vote or a new paper only touches its own row unless the source bounds move.
+    """
+    __tablename__ = "paper_rankings"
+
+    paper_id: Mapped[int] = mapped_column(ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True)
+    source: Mapped[str] = mapped_column(String(50))
+
+    # Raw (un-normalized) components
+    recency_score: Mapped[float] = mapped_column(Float, nullable=False)
+    popularity_score: Mapped[float] = mapped_column(Float, nullable=False)
+    log_reputation: Mapped[float] = mapped_column(Float, nullable=False)
+
+    # Min-max normalized components (within the paper's source) and the final score
+    norm_recency: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    norm_popularity: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    norm_log_reputation: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    bleeding_edge_score: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        # Min/max lookups for the normalization bounds resolve to index endpoints.
+        Index('ix_paper_rankings_source_recency', 'source', 'recency_score'),
+        Index('ix_paper_rankings_source_popularity', 'source', 'popularity_score'),
+        Index('ix_paper_rankings_source_reputation', 'source', 'log_reputation'),
+    )
+
+# The feed read path: an index-ordered top-N scan by score within a source.
+Index(
+    'ix_paper_rankings_source_score',
+    PaperRanking.source, PaperRanking.bleeding_edge_score.desc(), PaperRanking.paper_id.desc(),
+)
+
+class RankingState(Base):
+    """
+    Per-source bookkeeping for the ranking store: the normalization bounds currently
+    baked into `paper_rankings`, the recency epoch they were computed for, and a
+    version counter that is bumped every time the source's rankings change.
+    """
+    __tablename__ = "ranking_state"
+
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    epoch: Mapped[date] = mapped_column(Date)
+    version: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+    min_recency: Mapped[float] = mapped_column(Float, default=0.0)
+    max_recency: Mapped[float] = mapped_column(Float, default=0.0)
+    min_popularity: Mapped[float] = mapped_column(Float, default=0.0)
+    max_popularity: Mapped[float] = mapped_column(Float, default=0.0)
+    min_log_reputation: Mapped[float] = mapped_column(Float, default=0.0)
+    max_log_reputation: Mapped[float] = mapped_column(Float, default=0.0)
+
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
@@ -1,11 +1,21 @@
 # File: backend/model/paper_repository.py
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, func
-from sqlalchemy.dialects.postgresql import array # --- ADDED ---
-from typing import List
+from sqlalchemy import select, update, func, values, column, Integer
+from sqlalchemy.dialects.postgresql import array, JSONB # --- ADDED ---
+from typing import Dict, List, NamedTuple, Tuple
 
-from .paper import Paper
+from .paper import Paper, USER_TAGS_MAX, venue_key, year_range
+from services.ranking_store import ranking_store
+from services.feed_cache import feed_cache
+from services.tag_service import tag_service
+from services.tag_stats import tag_stats_store
+
+class _TagUpdateOutcome(NamedTuple):
+    updated: bool
+    source: str
+    previous_tags: List[str]
+    is_keyword: bool  # The paper already counts towards the tag through its keywords
 
 class PaperRepository:
     # --- ADDED: A new method to get a single paper by its primary key ---
@@ -15,59 +25,152 @@ class PaperRepository:
         result = await session.execute(stmt)
         return result.scalars().first()
     
-    # --- ADDED: Method to add a user tag atomically ---
+    async def get_papers_by_ids(self, session: AsyncSession, paper_ids: List[int]) -> Dict[int, Paper]:
+        """Retrieves several papers in one IN query, keyed by id. Missing ids are simply absent."""
+        if not paper_ids:
+            return {}
+        stmt = select(Paper).where(Paper.id.in_(set(paper_ids)))
+        result = await session.execute(stmt)
+        return {paper.id: paper for paper in result.scalars().all()}
+
+    # --- Tag changes are single conditional UPDATEs; no row is loaded or locked in Python ---
     async def add_user_tag(self, session: AsyncSession, paper_id: int, tag: str) -> str:
         """
         Adds a tag to a paper's user_tags list.
-        Returns 'SUCCESS', 'FULL', 'EXISTS', or 'NOT_FOUND'.
-        Uses row-level locking to prevent race conditions.
+        Returns 'SUCCESS', 'FULL', 'EXISTS', 'NOT_FOUND', or 'CONFLICT' when concurrent changes to
+        the paper's tags kept winning the race. The append only happens if the tag is absent and
+        fewer than USER_TAGS_MAX tags are set.
         """
-        # Lock the row for the duration of the transaction to ensure atomicity
-        stmt = select(Paper).where(Paper.id == paper_id).with_for_update()
-        result = await session.execute(stmt)
-        paper = result.scalars().first()
+        current_tags = func.coalesce(Paper.user_tags, func.jsonb_build_array(type_=JSONB))
+        tag_array = func.jsonb_build_array(tag, type_=JSONB)
+        append = (
+            update(Paper)
+            .where(Paper.id == paper_id, ~current_tags.contains(tag_array), func.jsonb_array_length(current_tags) < USER_TAGS_MAX)
+            .values(user_tags=current_tags.op('||')(tag_array), version=Paper.version + 1)
+            .returning(Paper.id)
+        )
+        for _ in range(2):
+            outcome = await self._run_tag_update(session, paper_id, tag, append)
+            if outcome is None:
+                return 'NOT_FOUND'
+            if outcome.updated:
+                # A tag the paper already has as a keyword doesn't change how many papers carry it.
+                if not outcome.is_keyword:
+                    await tag_stats_store.adjust_tag(session, outcome.source, tag, 1)
+                await session.commit()
+                ranking_store.mark_changed(outcome.source)  # The next sync bumps the feeds' version
+                self._invalidate_feeds_for_tag(paper_id, tag)
+                if not outcome.is_keyword:
+                    tag_service.record_tag_added(tag)
+                return 'SUCCESS'
+            await session.commit()
+            if tag in outcome.previous_tags:
+                return 'EXISTS'
+            if len(outcome.previous_tags) >= USER_TAGS_MAX:
+                return 'FULL'
+            # A concurrent change committed between our snapshot and the update; classify against fresh data.
+        return 'CONFLICT'
 
-        if not paper:
-            return 'NOT_FOUND'
-
-        current_tags = paper.user_tags or []
-        if tag in current_tags:
-            return 'EXISTS'
-        
-        if len(current_tags) >= 3:
-            return 'FULL'
-
-        paper.user_tags = current_tags + [tag]
-        await session.commit()
-        return 'SUCCESS'
-
-    # --- ADDED: Method to remove a user tag atomically ---
     async def remove_user_tag(self, session: AsyncSession, paper_id: int, tag: str) -> str:
         """
         Removes a tag from a paper's user_tags list.
         Returns 'SUCCESS', 'NOT_FOUND', or 'TAG_NOT_FOUND'.
         """
-        stmt = select(Paper).where(Paper.id == paper_id).with_for_update()
-        result = await session.execute(stmt)
-        paper = result.scalars().first()
-
-        if not paper:
+        current_tags = func.coalesce(Paper.user_tags, func.jsonb_build_array(type_=JSONB))
+        remove = (
+            update(Paper)
+            .where(Paper.id == paper_id, current_tags.contains(func.jsonb_build_array(tag, type_=JSONB)))
+            .values(user_tags=current_tags.op('-')(tag), version=Paper.version + 1)
+            .returning(Paper.id)
+        )
+        outcome = await self._run_tag_update(session, paper_id, tag, remove)
+        if outcome is None:
             return 'NOT_FOUND'
-
-        current_tags = paper.user_tags or []
-        if tag not in current_tags:
+        if not outcome.updated:
+            await session.commit()
             return 'TAG_NOT_FOUND'
-        
-        paper.user_tags = [t for t in current_tags if t != tag]
+        if not outcome.is_keyword:
+            await tag_stats_store.adjust_tag(session, outcome.source, tag, -1)
         await session.commit()
+        ranking_store.mark_changed(outcome.source)
+        self._invalidate_feeds_for_tag(paper_id, tag)
+        if not outcome.is_keyword:
+            tag_service.record_tag_removed(tag)
         return 'SUCCESS'
 
+    async def _run_tag_update(self, session: AsyncSession, paper_id: int, tag: str, conditional_update) -> "_TagUpdateOutcome | None":
+        """
+        Runs a conditional user_tags UPDATE as a data-modifying CTE and, in the same statement,
+        reads the row as it was before it. Returns None if the paper doesn't exist. Does not commit,
+        so callers can adjust the tag counts in the same transaction.
+        """
+        updated = conditional_update.cte('tag_update')
+        stmt = select(
+            Paper.source,
+            Paper.user_tags,
+            Paper.keywords.contains(func.jsonb_build_array(tag, type_=JSONB)).label('is_keyword'),
+            select(func.count()).select_from(updated).scalar_subquery().label('updated'),
+        ).where(Paper.id == paper_id)
+        row = (await session.execute(stmt)).first()
+        if row is None:
+            return None
+        return _TagUpdateOutcome(bool(row.updated), row.source, list(row.user_tags or []), bool(row.is_keyword))
+
+    def _invalidate_feeds_for_tag(self, paper_id: int, tag: str):
+        """A tag change alters the paper's rendered tags and its membership in feeds filtered by that tag."""
+        feed_cache.invalidate_paper(paper_id)
+        feed_cache.invalidate_tag(tag)
+
     # --- (vote_on_paper and other methods are unchanged) ---
     async def vote_on_paper(self, session: AsyncSession, paper_id: int, direction: str) -> bool:
         if direction not in ['up', 'down']: raise ValueError("Direction must be 'up' or 'down'")
         column_to_increment = Paper.upvotes if direction == 'up' else Paper.downvotes
-        stmt = update(Paper).where(Paper.id == paper_id).values({column_to_increment: column_to_increment + 1}).execution_options(synchronize_session="fetch")
-        result = await session.execute(stmt); await session.commit(); return result.rowcount > 0
+        stmt = update(Paper).where(Paper.id == paper_id).values({column_to_increment: column_to_increment + 1, Paper.version: Paper.version + 1}).returning(Paper.source).execution_options(synchronize_session="fetch")
+        source = (await session.execute(stmt)).scalar_one_or_none()
+        if source is None:
+            return False
+        # With the precomputed backend the paper is re-scored in this transaction, so the feed never
+        # sees a vote without its ranking; otherwise the next ranking sync re-scores it.
+        await ranking_store.papers_changed(session, source, [paper_id])
+        await session.commit()
+        feed_cache.invalidate_paper(paper_id)
+        return True
+
+    async def get_paper_version(self, session: AsyncSession, paper_id: int) -> int | None:
+        """The paper's version counter alone, for answering conditional GETs without loading the row."""
+        result = await session.execute(select(Paper.version).where(Paper.id == paper_id))
+        return result.scalar_one_or_none()
+
+    async def apply_vote_deltas(self, session: AsyncSession, deltas: Dict[int, Tuple[int, int]]) -> Dict[str, List[int]]:
+        """
+        Applies accumulated (upvotes, downvotes) deltas for many papers in one UPDATE ... FROM (VALUES ...),
+        records them with the ranking store and commits. Returns the updated paper ids grouped by source.
+        """
+        if not deltas:
+            return {}
+        vote_deltas = values(
+            column('id', Integer), column('up', Integer), column('down', Integer), name='vote_deltas'
+        ).data([(paper_id, up, down) for paper_id, (up, down) in sorted(deltas.items())])
+        stmt = (
+            update(Paper)
+            .where(Paper.id == vote_deltas.c.id)
+            .values(
+                upvotes=Paper.upvotes + vote_deltas.c.up,
+                downvotes=Paper.downvotes + vote_deltas.c.down,
+                version=Paper.version + 1,
+            )
+            .returning(Paper.id, Paper.source)
+            .execution_options(synchronize_session=False)
+        )
+        updated_by_source: Dict[str, List[int]] = {}
+        for paper_id, source in (await session.execute(stmt)).all():
+            updated_by_source.setdefault(source, []).append(paper_id)
+        for source, paper_ids in updated_by_source.items():
+            await ranking_store.papers_changed(session, source, paper_ids)
+        await session.commit()
+        feed_cache.invalidate_papers(paper_id for paper_ids in updated_by_source.values() for paper_id in paper_ids)
+        return updated_by_source
+
     async def get_recent_openreview_papers(
         self,
         session: AsyncSession,
@@ -82,11 +185,12 @@ class PaperRepository:
         query = select(Paper).where(Paper.source == 'openreview')
 
         if tags:
-            query = query.where(Paper.keywords.contains(tags))
-        if venue:
-            query = query.where(Paper.venue_or_category.startswith(venue))
+            query = query.where(Paper.all_tags.contains(tags))
+        if venue and venue.strip():
+            query = query.where(Paper.venue_key == venue_key(venue.strip()))
         if year:
-            query = query.where(func.extract('year', Paper.year_or_date) == year)
+            year_start, next_year_start = year_range(year)
+            query = query.where(Paper.year_or_date >= year_start, Paper.year_or_date < next_year_start)
         if category:
             query = query.where(Paper.category == category)
 
@@ -97,7 +201,7 @@ class PaperRepository:
 
     async def get_arxiv_papers(self, session: AsyncSession, limit: int = 50, offset: int = 0, tags: List[str] | None = None) -> List[Paper]:
         query = select(Paper).where(Paper.source == 'arxiv')
-        if tags: query = query.where(Paper.keywords.contains(tags))
+        if tags: query = query.where(Paper.all_tags.contains(tags))
         query = query.order_by(Paper.year_or_date.desc()).offset(offset).limit(limit)
         result = await session.execute(query); return result.scalars().all()
 
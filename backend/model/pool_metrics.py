@@ -0,0 +1,74 @@
+# File: backend/model/pool_metrics.py
+
+"""
+Connection pool instrumentation for the async engine.
+
+`InstrumentedAsyncQueuePool` is SQLAlchemy's default asyncio queue pool with timing around
+checkouts, so the API can be sized by evidence: how often a request had to wait for a
+connection, how long it waited, and how often it gave up after `pool_timeout`. Together
+with the pool's own occupancy (checked out, idle, overflow) this shows whether more
+workers would exhaust the database's connections or leave them thrashing.
+"""
+
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# A checkout slower than this had to wait for a connection (or open a new one).
+WAIT_THRESHOLD_SECONDS = 0.001
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    waits: int = 0
+    timeouts: int = 0
+    connections_opened: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.metrics.checkouts += 1
+        if waited >= WAIT_THRESHOLD_SECONDS:
+            self.metrics.waits += 1
+            self.metrics.total_wait_seconds += waited
+            self.metrics.max_wait_seconds = max(self.metrics.max_wait_seconds, waited)
+        return record
+
+    def _create_connection(self):
+        self.metrics.connections_opened += 1
+        return super()._create_connection()
+
+    def recreate(self):
+        # Invalidation swaps in a fresh pool; the counters keep describing the same engine.
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def stats(self) -> Dict[str, Any]:
+        stats = asdict(self.metrics)
+        stats["mean_wait_ms"] = (self.metrics.total_wait_seconds / self.metrics.waits * 1000) if self.metrics.waits else 0.0
+        stats["max_wait_ms"] = self.metrics.max_wait_seconds * 1000
+        del stats["total_wait_seconds"], stats["max_wait_seconds"]
+        stats.update(
+            size=self.size(),
+            max_overflow=self._max_overflow,
+            checked_out=self.checkedout(),
+            idle=self.checkedin(),
+            overflow=self.overflow(),
+        )
+        return stats
@@ -0,0 +1,20 @@
+# File: backend/model/tag_stat.py
+
+from sqlalchemy import String, Text, Integer, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from .database import Base
+
+class TagStat(Base):
+    """
+    Number of papers per (source, tag), counting a paper once whether the tag is one of
+    its keywords, one of its user tags, or both. The row with the empty tag holds the
+    source's total paper count. Maintained incrementally by services.tag_stats.
+    """
+    __tablename__ = "tag_stats"
+
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    tag: Mapped[str] = mapped_column(Text, primary_key=True)
+    paper_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+
+# Facets are served most-popular first within a source.
+Index('ix_tag_stats_source_count', TagStat.source, TagStat.paper_count.desc())
@@ -1,9 +1,23 @@
 """
-This is a hardened version of the ArXiv fetcher, fetching up to 300 papers sequentially
+This is a hardened version of the ArXiv fetcher, fetching papers sequentially
 using a combined category query, ensuring consistent order for stack pointer processes.
 It uses a paranoid XML parser, respects the ArXiv API ToS with a 3-second delay between
 paginated requests, and includes diagnostic logging.
 
+Ingestion is a three-stage pipeline connected by bounded queues:
+  fetch  -> streams each page and parses entries incrementally as the bytes arrive,
+  enrich -> drops known papers and computes reputation scores, one commit batch at a time,
+  commit -> inserts each batch and refreshes its rankings.
+The stages run concurrently, so enrichment and commits proceed during the mandatory delay
+between pages, and at most about one page of entries is held in memory at a time.
+
+Each run catches up incrementally: it walks the listing newest-first until it reaches the
+high-water mark (the newest paper of the previous catch-up) or the shelf-life cutoff. The
+first page fixes the window's top; later pages bound the query by its submission time, so
+offsets stay stable while new papers arrive. If the gap exceeds ARXIV_MAX_FETCH_SIZE, the
+window's progress is stored as a checkpoint and the next run resumes from it, then moves
+on to whatever arrived above it.
+
 To run this script directly for testing:
 1. Ensure your .env file is populated with database credentials.
 2. From the `backend` directory, run: python -m services.arxiv_fetcher
@@ -11,30 +25,42 @@ To run this script directly for testing:
 
 import asyncio
 import httpx
+import json
 import logging
 import xml.etree.ElementTree as ET
 from urllib.parse import urlencode
 from datetime import datetime, date
+from dateutil.relativedelta import relativedelta
+import time
 from dataclasses import dataclass, field
-from sqlalchemy import select, update
-from typing import List, Dict, Set
+from sqlalchemy import select, update, delete
+from typing import Any, Awaitable, Callable, List, Dict, Set
 
 # --- Project Imports ---
 from model.database import SessionMaker
 from model.paper import Paper
 from model.job_tracker import JobTracker
 from services.semantic_scholar_service import semantic_scholar_service
+from services.paper_writer import paper_writer, sync_rankings
+from services.http_replay import http_client, courtesy_sleep
 from services.config import (
-    ARXIV_CATEGORIES, ARXIV_FETCHER_JOB_NAME, LOGGING_CONFIG, DB_COMMIT_BATCH_SIZE
+    ARXIV_CATEGORIES, ARXIV_FETCHER_JOB_NAME, LOGGING_CONFIG, DB_COMMIT_BATCH_SIZE,
+    ARXIV_API_PAGE_SIZE, ARXIV_MAX_FETCH_SIZE, ARXIV_MAX_FETCH_ATTEMPTS, PAPER_SHELF_LIFE_MONTHS,
 )
 
 # --- Setup and Constants ---
 logging.basicConfig(**LOGGING_CONFIG)
 ARXIV_API_BASE_URL = "http://export.arxiv.org/api/query?"
-API_PAGE_SIZE = 100
-TARGET_FETCH_SIZE = 50
 API_DELAY_SECONDS = 3.0
 DEBUG_FILE_NAME = "arxiv_debug.xml"
+CHECKPOINT_JOB_SUFFIX = ":checkpoint"
+SUBMITTED_DATE_FORMAT = '%Y%m%d%H%M'  # The arXiv query syntax for submittedDate ranges
+ATOM_NAMESPACE = {'atom': 'http://www.w3.org/2005/Atom'}
+ATOM_ENTRY_TAG = '{http://www.w3.org/2005/Atom}entry'
+# Bounded hand-offs between stages: about one page of parsed entries, and two enriched batches.
+PARSED_QUEUE_SIZE = ARXIV_API_PAGE_SIZE
+ENRICHED_QUEUE_SIZE = 2
+_END_OF_STREAM = None  # Sentinel passed down the queues once a stage has finished
 
 @dataclass
 class ArxivResult:
@@ -46,10 +72,91 @@ class ArxivResult:
     categories: List[str] = field(default_factory=list)
     pdf_url: str | None = None
 
+@dataclass
+class CatchUpWindow:
+    """The part of the listing one catch-up walks: from its top entry down to the high-water mark."""
+    top_id: str | None = None  # Newest entry of the window; becomes the high-water mark once complete
+    top_ts: str | None = None  # Its submission time, bounding the window's later pages
+    offset: int = 0            # Entries of the window already consumed
+    complete: bool = False
+
+    def to_checkpoint(self) -> str:
+        return json.dumps({'top': self.top_id, 'top_ts': self.top_ts, 'offset': self.offset}, separators=(',', ':'))
+
+    @classmethod
+    def from_checkpoint(cls, raw: str) -> "CatchUpWindow":
+        data = json.loads(raw)
+        return cls(top_id=data['top'], top_ts=data['top_ts'], offset=int(data['offset']))
+
+def clean_title(text: str) -> str:
+    return text.strip().replace('\n', ' ').replace('  ', ' ')
+
+def clean_summary(text: str) -> str:
+    return text.strip().replace('\n', ' ')
+
+def paper_values(result: ArxivResult, reputation_score: float) -> Dict[str, Any]:
+    """The `papers` column values for an arXiv result; shared with the snapshot importer."""
+    authors = [{'name': name} for name in result.authors] if result.authors else [{'name': 'Unknown Author'}]
+    # Convert keywords, venue_or_category, and category to lowercase
+    keywords = [cat.lower() for cat in result.categories] if result.categories else ['cs.lg']
+    return dict(
+        source='arxiv',
+        source_id=result.entry_id,
+        title=result.title,
+        authors=authors,
+        abstract=result.summary,
+        paper_url=f"http://arxiv.org/abs/{result.entry_id}",
+        pdf_url=result.pdf_url,
+        venue_or_category=result.categories[0].lower() if result.categories else 'cs.lg',
+        year_or_date=result.published.date(),
+        category=result.categories[0].lower() if result.categories else None,
+        keywords=keywords,
+        replies_data=None,
+        user_tags=[],
+        reputation_score=reputation_score,
+        upvotes=0,
+        downvotes=0
+    )
+
+def _base_id(entry_id: str) -> str:
+    """The arXiv id without its version suffix, since a revised paper comes back as v2, v3, ..."""
+    return entry_id.rsplit('v', 1)[0]
+
+@dataclass
+class StageStats:
+    items: int = 0             # Items the stage passed on (entries, enriched papers, committed papers)
+    dropped: int = 0           # Items it discarded (parse failures, duplicates, failed commits)
+    busy_seconds: float = 0.0  # Time spent working, excluding waits on the queues and the API delay
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.items / self.busy_seconds if self.busy_seconds else 0.0
+
+@dataclass
+class PipelineStats:
+    fetch: StageStats = field(default_factory=StageStats)
+    enrich: StageStats = field(default_factory=StageStats)
+    commit: StageStats = field(default_factory=StageStats)
+    pages: int = 0
+    bytes_received: int = 0
+    wall_seconds: float = 0.0
+
+    def summary(self) -> str:
+        stages = ", ".join(
+            f"{name}: {stage.items} ok/{stage.dropped} dropped in {stage.busy_seconds:.1f}s ({stage.items_per_sec:.1f}/s)"
+            for name, stage in (("fetch", self.fetch), ("enrich", self.enrich), ("commit", self.commit))
+        )
+        return f"{self.pages} pages, {self.bytes_received / 1024:.0f} KiB, wall {self.wall_seconds:.1f}s | {stages}"
+
 class ArxivFetcher:
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = http_client(timeout=30.0)
         self.job_name = ARXIV_FETCHER_JOB_NAME
+        self.stats = PipelineStats()
+        # Per pipeline run: a lower bound on each emitted entry's offset in the window, and the
+        # lowest offset of a batch the commit stage failed to store (the window can't complete past it).
+        self._positions: Dict[str, int] = {}
+        self._failed_position: int | None = None
         if not ARXIV_CATEGORIES:
             raise ValueError("ARXIV_CATEGORIES in config.py must not be empty.")
         if DB_COMMIT_BATCH_SIZE <= 0:
@@ -64,10 +171,10 @@ class ArxivFetcher:
                 return None
             
             entry_id = id_el.text.split('/')[-1]
-            title = title_el.text.strip().replace('\n', ' ').replace('  ', ' ')
+            title = clean_title(title_el.text)
 
             summary_el = entry.find('atom:summary', ns)
-            summary = summary_el.text.strip().replace('\n', ' ') if summary_el is not None and summary_el.text is not None else ""
+            summary = clean_summary(summary_el.text) if summary_el is not None and summary_el.text is not None else ""
 
             published_el = entry.find('atom:published', ns)
             published_str = published_el.text if published_el is not None and published_el.text is not None else datetime.utcnow().isoformat() + "Z"
@@ -105,39 +212,107 @@ class ArxivFetcher:
                 await asyncio.sleep(backoff * (2 ** attempt))
         raise Exception("Unexpected retry failure")
 
-    async def _fetch_paginated_results(self, search_query: str, total_to_fetch: int) -> List[ArxivResult]:
-        all_results = []
-        for start_index in range(0, total_to_fetch, API_PAGE_SIZE):
-            if start_index > 0:
-                await asyncio.sleep(API_DELAY_SECONDS)
-            chunk_size = min(API_PAGE_SIZE, total_to_fetch - len(all_results))
-            if chunk_size <= 0:
-                break
-            params = { 'search_query': search_query, 'start': start_index, 'max_results': chunk_size, 'sortBy': 'submittedDate', 'sortOrder': 'descending' }
-            url = ARXIV_API_BASE_URL + urlencode(params)
-            
+    async def _stream_page(
+        self, url: str, expected: int, emit: Callable[[ArxivResult], Awaitable[None]], retries: int = 3, backoff: float = 1.0
+    ) -> int:
+        """
+        Streams one result page, parsing each <entry> as soon as it is complete and handing it to
+        `emit`. A retry after a mid-page failure skips the entries already delivered.
+        Returns the number of entries on the page.
+        """
+        delivered = 0
+        for attempt in range(retries):
             try:
-                response = await self._fetch_with_retry(url)
-                namespace = {'atom': 'http://www.w3.org/2005/Atom'}
-                root = ET.fromstring(response.content)
-                all_entries = root.findall('atom:entry', namespace)
-                parsed_entries = [self._parse_xml_entry(entry, namespace) for entry in all_entries]
-                successful_parses = [p for p in parsed_entries if p is not None]
-                if len(successful_parses) < len(all_entries):
-                    logging.warning(f"Parsed {len(successful_parses)}/{len(all_entries)} entries successfully.")
-                all_results.extend(successful_parses)
-                if len(all_entries) == 0 and all_results:
-                    logging.info("No more entries returned by API. Stopping fetch.")
-                    break
-                if len(all_entries) < chunk_size:
-                    logging.warning(f"Received fewer entries ({len(all_entries)}) than requested ({chunk_size}).")
+                seen, raw_chunks = 0, []
+                async with self.client.stream('GET', url, follow_redirects=True) as response:
+                    response.raise_for_status()
+                    parser = ET.XMLPullParser(events=('end',))
+                    fetch_started = time.perf_counter()
+                    async for chunk in response.aiter_bytes():
+                        raw_chunks.append(chunk)
+                        self.stats.bytes_received += len(chunk)
+                        parser.feed(chunk)
+                        for _, element in parser.read_events():
+                            if element.tag != ATOM_ENTRY_TAG:
+                                continue
+                            seen += 1
+                            if seen > delivered:
+                                delivered += 1
+                                result = self._parse_xml_entry(element, ATOM_NAMESPACE)
+                                if result is None:
+                                    self.stats.fetch.dropped += 1
+                                else:
+                                    self.stats.fetch.items += 1
+                                    self.stats.fetch.busy_seconds += time.perf_counter() - fetch_started
+                                    await emit(result)
+                                    fetch_started = time.perf_counter()
+                            element.clear()  # Parsed entries don't accumulate in the tree
+                    parser.close()
+                    self.stats.fetch.busy_seconds += time.perf_counter() - fetch_started
+                if seen < expected:
+                    logging.warning(f"Received fewer entries ({seen}) than requested ({expected}).")
                     with open(DEBUG_FILE_NAME, 'wb') as f:
-                        f.write(response.content)
+                        f.write(b''.join(raw_chunks))
+                return seen
             except Exception as e:
-                logging.error(f"Failed to fetch for query {search_query}: {e}", exc_info=True)
-                break
-        
-        return all_results[:total_to_fetch]
+                if attempt == retries - 1:
+                    logging.error(f"Failed to fetch after {retries} attempts: {e}", exc_info=True)
+                    raise
+                await asyncio.sleep(backoff * (2 ** attempt))
+        raise Exception("Unexpected retry failure")
+
+    async def _fetch_stage(
+        self, base_query: str, window: CatchUpWindow, hwm: str | None, hwm_date: date | None, cutoff: date,
+        budget: int, out_queue: asyncio.Queue,
+    ) -> int:
+        """
+        Stage 1: walks the window newest-first, streaming entries to the enrichment stage, until it
+        reaches the high-water mark or the cutoff (window complete) or has fetched `budget` entries.
+        Returns the number of entries fetched.
+        """
+        start_offset = window.offset
+
+        async def emit(result: ArxivResult):
+            if window.complete:
+                return  # The rest of the page lies below the boundary
+            reached_mark = hwm is not None and _base_id(result.entry_id) == _base_id(hwm)
+            # The date test also stops the walk if the marked paper itself has left the listing.
+            if reached_mark or result.published.date() < (hwm_date or cutoff):
+                window.complete = True
+                return
+            if window.top_id is None:
+                window.top_id = result.entry_id
+                window.top_ts = result.published.strftime(SUBMITTED_DATE_FORMAT)
+            # Parse failures aren't emitted, so this never overshoots the entry's real offset.
+            self._positions[result.entry_id] = start_offset + len(self._positions)
+            await out_queue.put(result)  # Blocks while enrichment is a page behind
+
+        fetched = 0
+        try:
+            while fetched < budget and not window.complete:
+                if fetched > 0:
+                    # Downstream stages keep enriching and committing the previous page meanwhile.
+                    await courtesy_sleep(API_DELAY_SECONDS)
+                chunk_size = min(ARXIV_API_PAGE_SIZE, budget - fetched)
+                search_query = base_query
+                if window.top_ts is not None:
+                    search_query = f"({base_query}) AND submittedDate:[{cutoff.strftime(SUBMITTED_DATE_FORMAT)} TO {window.top_ts}]"
+                params = { 'search_query': search_query, 'start': window.offset, 'max_results': chunk_size, 'sortBy': 'submittedDate', 'sortOrder': 'descending' }
+                url = ARXIV_API_BASE_URL + urlencode(params)
+                try:
+                    received = await self._stream_page(url, chunk_size, emit, retries=ARXIV_MAX_FETCH_ATTEMPTS)
+                except Exception as e:
+                    logging.error(f"Failed to fetch for query {search_query}: {e}", exc_info=True)
+                    break
+                self.stats.pages += 1
+                fetched += received
+                window.offset += received
+                if received == 0:
+                    logging.info("No more entries returned by API. Stopping fetch.")
+                    window.complete = True
+        finally:
+            await out_queue.put(_END_OF_STREAM)
+        return fetched
 
     async def get_high_water_mark(self) -> str | None:
         async with SessionMaker() as session:
@@ -145,114 +320,194 @@ class ArxivFetcher:
             result = await session.execute(stmt)
             return result.scalars().first()
 
-    async def update_high_water_mark(self, new_marker_id: str):
+    async def get_checkpoint(self) -> CatchUpWindow | None:
+        """The unfinished catch-up window left by a previous run, if any."""
+        async with SessionMaker() as session:
+            stmt = select(JobTracker.last_processed_marker).where(JobTracker.job_name == self.job_name + CHECKPOINT_JOB_SUFFIX)
+            raw = (await session.execute(stmt)).scalars().first()
+        return CatchUpWindow.from_checkpoint(raw) if raw else None
+
+    async def _get_marker_date(self, marker_id: str) -> date | None:
+        async with SessionMaker() as session:
+            stmt = select(Paper.year_or_date).where(Paper.source_id == marker_id)
+            return (await session.execute(stmt)).scalars().first()
+
+    async def _set_marker(self, session, job_name: str, value: str):
+        result = await session.execute(select(JobTracker).where(JobTracker.job_name == job_name))
+        if result.scalars().first():
+            await session.execute(update(JobTracker).where(JobTracker.job_name == job_name).values(last_processed_marker=value))
+        else:
+            session.add(JobTracker(job_name=job_name, last_processed_marker=value))
+
+    async def save_progress(self, window: CatchUpWindow):
+        """
+        A complete window moves the high-water mark to its top and drops the checkpoint; an
+        incomplete one is stored as the checkpoint, leaving the mark where it was. One transaction.
+        """
+        if not window.complete and window.top_id is None:
+            return  # Failed before the first entry: nothing to resume
+        checkpoint_job = self.job_name + CHECKPOINT_JOB_SUFFIX
         async with SessionMaker() as session:
             try:
-                result = await session.execute(select(JobTracker).where(JobTracker.job_name == self.job_name))
-                if result.scalars().first():
-                    await session.execute(update(JobTracker).where(JobTracker.job_name == self.job_name).values(last_processed_marker=new_marker_id))
+                if not window.complete:
+                    await self._set_marker(session, checkpoint_job, window.to_checkpoint())
                 else:
-                    session.add(JobTracker(job_name=self.job_name, last_processed_marker=new_marker_id))
+                    if window.top_id is not None:
+                        await self._set_marker(session, self.job_name, window.top_id)
+                    await session.execute(delete(JobTracker).where(JobTracker.job_name == checkpoint_job))
                 await session.commit()
-                logging.info(f"Updated high-water mark to: {new_marker_id}")
             except Exception as e:
                 await session.rollback()
-                logging.error(f"Failed to update high-water mark: {e}", exc_info=True)
+                logging.error(f"Failed to save fetcher progress: {e}", exc_info=True)
                 raise
+        if not window.complete:
+            logging.info(f"Saved checkpoint: {window.offset} entries below {window.top_id} done; the next run resumes there.")
+        elif window.top_id is not None:
+            logging.info(f"Updated high-water mark to: {window.top_id}")
 
     async def _check_duplicates(self, session, ids: Set[str]) -> Set[str]:
-        batch_size = 100
-        existing = set()
-        for i in range(0, len(ids), batch_size):
-            batch_ids = list(ids)[i:i + batch_size]
-            res = await session.execute(select(Paper.source_id).where(Paper.source_id.in_(batch_ids)))
-            existing.update(row[0] for row in res.all())
-        return existing
-
-    async def _process_and_commit_in_batches(self, papers_to_process: List[ArxivResult]):
-        logging.info(f"Processing and committing {len(papers_to_process)} papers in batches of {DB_COMMIT_BATCH_SIZE}...")
-        total_success, total_failure = 0, 0
+        """
+        Known ids among a batch, so their authors aren't scored again. Only an optimization:
+        the insert itself skips already-stored papers (ON CONFLICT DO NOTHING).
+        """
+        if not ids:
+            return set()
+        res = await session.execute(select(Paper.source_id).where(Paper.source_id.in_(list(ids))))
+        return set(res.scalars().all())
+
+    async def _build_paper(self, result: ArxivResult) -> Paper:
+        try:
+            rep_score = await semantic_scholar_service.calculate_paper_score([{'name': name} for name in result.authors])
+        except Exception as e:
+            logging.warning(f"Failed to calculate reputation score for {result.entry_id}: {e}. Using fallback score 0.")
+            rep_score = 0
+        return Paper(**paper_values(result, rep_score))
+
+    async def _enrich_batch(self, batch: List[ArxivResult], seen_ids: Set[str]) -> List[Paper]:
+        started = time.perf_counter()
+        # A paper can show up twice in one run when new submissions shift the pages under us.
+        fresh = [p for p in batch if p.entry_id not in seen_ids]
+        seen_ids.update(p.entry_id for p in fresh)
+        # A short session per batch, so no transaction sits idle through scoring and the page delays.
         async with SessionMaker() as session:
-            for i in range(0, len(papers_to_process), DB_COMMIT_BATCH_SIZE):
-                batch = papers_to_process[i:i + DB_COMMIT_BATCH_SIZE]
-                logging.info(f"--- Processing batch #{i//DB_COMMIT_BATCH_SIZE + 1} ({len(batch)} papers) ---")
-                
-                ids = {p.entry_id for p in batch}
-                existing = await self._check_duplicates(session, ids)
-                batch = [p for p in batch if p.entry_id not in existing]
-                if not batch:
-                    logging.info("No new papers in batch after duplicate check.")
+            existing = await self._check_duplicates(session, {p.entry_id for p in fresh})
+        fresh = [p for p in fresh if p.entry_id not in existing]
+        papers = list(await asyncio.gather(*[self._build_paper(p) for p in fresh])) if fresh else []
+        self.stats.enrich.items += len(papers)
+        self.stats.enrich.dropped += len(batch) - len(papers)
+        self.stats.enrich.busy_seconds += time.perf_counter() - started
+        return papers
+
+    async def _enrich_stage(self, in_queue: asyncio.Queue, out_queue: asyncio.Queue):
+        """Stage 2: groups parsed entries into commit batches, skipping known papers, and scores authors."""
+        try:
+            batch: List[ArxivResult] = []
+            seen_ids: Set[str] = set()
+            while (result := await in_queue.get()) is not _END_OF_STREAM:
+                batch.append(result)
+                if len(batch) < DB_COMMIT_BATCH_SIZE:
                     continue
-                
-                async def process_single(result: ArxivResult):
-                    try:
-                        rep_score = await semantic_scholar_service.calculate_paper_score([{'name': name} for name in result.authors])
-                    except Exception as e:
-                        logging.warning(f"Failed to calculate reputation score for {result.entry_id}: {e}. Using fallback score 0.")
-                        rep_score = 0
-                    authors = [{'name': name} for name in result.authors] if result.authors else [{'name': 'Unknown Author'}]
-                    # Convert keywords, venue_or_category, and category to lowercase
-                    keywords = [cat.lower() for cat in result.categories] if result.categories else ['cs.lg']
-                    return Paper(
-                        source='arxiv',
-                        source_id=result.entry_id,
-                        title=result.title,
-                        authors=authors,
-                        abstract=result.summary,
-                        paper_url=f"http://arxiv.org/abs/{result.entry_id}",
-                        pdf_url=result.pdf_url,
-                        venue_or_category=result.categories[0].lower() if result.categories else 'cs.lg',
-                        year_or_date=result.published.date(),
-                        category=result.categories[0].lower() if result.categories else None,
-                        keywords=keywords,
-                        replies_data=None,
-                        user_tags=[],
-                        reputation_score=rep_score,
-                        upvotes=0,
-                        downvotes=0
-                    )
-
-                processed = await asyncio.gather(*[process_single(p) for p in batch])
-                to_commit = [p for p in processed if p]
-                
-                if to_commit:
-                    try:
-                        session.add_all(to_commit)
-                        await session.commit()
-                        total_success += len(to_commit)
-                    except Exception as e:
-                        await session.rollback()
-                        logging.error(f"DB commit failed for batch. Error: {e}", exc_info=True)
-                
-                total_failure += len(batch) - len(to_commit)
-        
-        logging.info(f"Processing Summary: Succeeded={total_success}, Failed={total_failure}")
-
-    async def run(self):
+                papers = await self._enrich_batch(batch, seen_ids)
+                batch = []
+                if papers:
+                    await out_queue.put(papers)
+            if batch:
+                papers = await self._enrich_batch(batch, seen_ids)
+                if papers:
+                    await out_queue.put(papers)
+        finally:
+            await out_queue.put(_END_OF_STREAM)
+
+    async def _commit_stage(self, in_queue: asyncio.Queue):
+        """Stage 3: bulk-inserts each enriched batch in its own transaction, then refreshes its rankings."""
+        batch_number = 0
+        async with SessionMaker() as session:
+            while (to_commit := await in_queue.get()) is not _END_OF_STREAM:
+                batch_number += 1
+                logging.info(f"--- Committing batch #{batch_number} ({len(to_commit)} papers) ---")
+                started = time.perf_counter()
+                try:
+                    result = await paper_writer.insert_papers(session, 'arxiv', to_commit)
+                    self.stats.commit.items += result.inserted
+                    self.stats.commit.dropped += result.skipped + result.failed
+                    if result.skipped or result.failed:
+                        logging.info(f"Batch #{batch_number}: inserted {result.inserted}, skipped {result.skipped} existing, {result.failed} failed.")
+                except Exception as e:
+                    self.stats.commit.dropped += len(to_commit)
+                    failed_from = min(self._positions.get(paper.source_id, 0) for paper in to_commit)
+                    if self._failed_position is None or failed_from < self._failed_position:
+                        self._failed_position = failed_from
+                    logging.error(f"DB commit failed for batch. Error: {e}", exc_info=True)
+                self.stats.commit.busy_seconds += time.perf_counter() - started
+
+    async def _run_pipeline(
+        self, base_query: str, window: CatchUpWindow, hwm: str | None, hwm_date: date | None, cutoff: date, budget: int
+    ) -> int:
+        parsed: asyncio.Queue = asyncio.Queue(maxsize=PARSED_QUEUE_SIZE)
+        enriched: asyncio.Queue = asyncio.Queue(maxsize=ENRICHED_QUEUE_SIZE)
+        self._positions, self._failed_position = {}, None
+        started = time.perf_counter()
+        tasks = [
+            asyncio.create_task(self._fetch_stage(base_query, window, hwm, hwm_date, cutoff, budget, parsed)),
+            asyncio.create_task(self._enrich_stage(parsed, enriched)),
+            asyncio.create_task(self._commit_stage(enriched)),
+        ]
+        try:
+            fetched, _, _ = await asyncio.gather(*tasks)
+            if self._failed_position is not None:
+                # Hold the window open at the first unstored batch; the next run resumes there, and
+                # entries after it that did go in are skipped by the insert.
+                logging.warning(f"A commit batch failed; keeping the catch-up open from offset {self._failed_position}.")
+                window.complete = False
+                window.offset = min(window.offset, self._failed_position)
+            return fetched
+        except BaseException:
+            # A failed stage would leave its neighbours blocked on a queue forever.
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            self.stats.wall_seconds += time.perf_counter() - started
+            logging.info(f"Pipeline Summary: {self.stats.summary()}")
+
+    async def run(self, as_of: date | None = None):
+        """`as_of` pins the date the shelf-life cutoff is counted from, so a replayed run sends the recorded queries."""
         logging.info("--- Starting ArXiv Fetcher Run ---")
         try:
             hwm = await self.get_high_water_mark()
-            papers_found, query = [], " OR ".join([f"cat:{cat}" for cat in ARXIV_CATEGORIES])
-            
-            logging.info(f"Fetching up to {TARGET_FETCH_SIZE} papers with query: {query}")
-            papers_found = await self._fetch_paginated_results(query, total_to_fetch=TARGET_FETCH_SIZE)
-            if hwm:
-                papers_found = [p for p in papers_found if p.entry_id != hwm]
-            
-            if not papers_found:
-                logging.info("No new papers to process.")
-                return
-            
-            logging.info(f"Fetched {len(papers_found)} papers from API.")
-            await self._process_and_commit_in_batches(papers_found)
-            
-            if papers_found:
-                await self.update_high_water_mark(papers_found[0].entry_id)
+            hwm_date = await self._get_marker_date(hwm) if hwm else None
+            cutoff = (as_of or date.today()) - relativedelta(months=PAPER_SHELF_LIFE_MONTHS)
+            query = " OR ".join([f"cat:{cat}" for cat in ARXIV_CATEGORIES])
+            budget = ARXIV_MAX_FETCH_SIZE
+
+            window = await self.get_checkpoint()
+            resuming = window is not None
+            if resuming:
+                logging.info(f"Resuming catch-up below {window.top_id} at offset {window.offset}.")
+            else:
+                window = CatchUpWindow()
+
+            while True:
+                logging.info(f"Walking back to high-water mark {hwm} (cutoff {cutoff}), up to {budget} papers, with query: {query}")
+                budget -= await self._run_pipeline(query, window, hwm, hwm_date, cutoff, budget)
+                await self.save_progress(window)
+                if not window.complete:
+                    logging.warning("Catch-up incomplete (fetch budget reached or a batch failed); the next run continues from the checkpoint.")
+                    break
+                if window.top_id is None:
+                    logging.info("No new papers to process.")
+                if not resuming or budget <= 0:
+                    break
+                # The resumed window is done; catch up on what was submitted above it since.
+                if window.top_id is not None:
+                    hwm, hwm_date = window.top_id, await self._get_marker_date(window.top_id)
+                window, resuming = CatchUpWindow(), False
 
         except Exception as e:
             logging.critical(f"Critical error during fetcher run: {e}", exc_info=True)
         finally:
             await self.client.aclose()
+            await sync_rankings()
             logging.info("--- ArXiv Fetcher Run Complete ---")
 
 if __name__ == "__main__":
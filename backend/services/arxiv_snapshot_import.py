@@ -0,0 +1,226 @@
+"""
+Offline backfill of arXiv papers from a metadata snapshot, instead of trickling them in
+through the rate-limited API.
+
+Reads the JSON-lines dump distributed in public arXiv metadata snapshots (one object per
+paper with `id`, `title`, `abstract`, `categories`, `versions`, `authors_parsed`, ...;
+plain or gzipped), keeps papers in ARXIV_CATEGORIES submitted inside the date range, and
+maps them with the same normalization as ArxivFetcher (`paper_values`). Rows are streamed
+in batches: each batch is COPY'd into a temporary staging table and merged into `papers`
+in one transaction, skipping papers already stored under any version of their id, so
+memory stays constant and an interrupted import can simply be re-run.
+
+Afterwards the arXiv rankings and the tag counts are rebuilt, and if the fetcher has no
+high-water mark yet, it is set to the newest imported paper so the next API run only
+catches up on what the snapshot is missing.
+
+Reputation scores are not computed (that would mean one Semantic Scholar lookup per
+author); imported papers start at 0 like any paper whose lookup failed.
+
+Usage (from the `backend` directory):
+    python -m services.arxiv_snapshot_import arxiv-metadata-oai-snapshot.json --since 2025-01-01
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import time
+from datetime import date, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import select
+
+from model.database import SessionMaker, engine
+from model.job_tracker import JobTracker
+from model.paper import ARXIV_VERSION_SUFFIX_PATTERN
+from services.arxiv_fetcher import ArxivResult, clean_title, clean_summary, paper_values
+from services.config import ARXIV_CATEGORIES, ARXIV_FETCHER_JOB_NAME, LOGGING_CONFIG, PAPER_SHELF_LIFE_MONTHS
+from services.ranking_store import ranking_store
+from services.tag_stats import rebuild_tag_stats
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+STAGING_TABLE = "arxiv_snapshot_staging"
+DEFAULT_BATCH_SIZE = 50_000
+# Staged as text where `papers` has JSONB; the merge casts them.
+STAGING_COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("source_id", "text"), ("title", "text"), ("authors", "text"), ("abstract", "text"),
+    ("paper_url", "text"), ("pdf_url", "text"), ("venue_or_category", "text"),
+    ("year_or_date", "date"), ("category", "text"), ("keywords", "text"),
+)
+# The id without its version suffix, like `_base_id` in the fetcher: the snapshot gives the latest
+# version, while the fetcher stored whichever version it saw, so the ids themselves can differ.
+# Written exactly as the ix_papers_arxiv_base_id index expression, so the anti-join can use it.
+BASE_ID_SQL = f"regexp_replace({{column}}, '{ARXIV_VERSION_SUFFIX_PATTERN}', '')"
+MERGE_SQL = f"""
+WITH inserted AS (
+    INSERT INTO papers (
+        source, source_id, title, authors, abstract, paper_url, pdf_url, venue_or_category,
+        year_or_date, category, keywords, replies_data, user_tags, reputation_score, upvotes, downvotes
+    )
+    SELECT DISTINCT ON ({BASE_ID_SQL.format(column='s.source_id')})
+        'arxiv', s.source_id, left(s.title, 500), s.authors::jsonb, s.abstract, s.paper_url, s.pdf_url,
+        s.venue_or_category, s.year_or_date, s.category, s.keywords::jsonb, NULL, '[]'::jsonb, 0, 0, 0
+    FROM {STAGING_TABLE} s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM papers p
+        WHERE p.source = 'arxiv'
+          AND {BASE_ID_SQL.format(column='p.source_id')} = {BASE_ID_SQL.format(column='s.source_id')}
+    )
+    ORDER BY {BASE_ID_SQL.format(column='s.source_id')}
+    ON CONFLICT (source_id) DO NOTHING
+    RETURNING 1
+)
+SELECT count(*) FROM inserted
+"""
+
+def _strip_nul(text: str) -> str:
+    # Postgres text can't hold NUL characters, which turn up in a few snapshot abstracts.
+    return text.replace('\0', '')
+
+def result_from_snapshot(record: Dict[str, Any]) -> ArxivResult | None:
+    """Maps one snapshot record onto the fields the API parser produces for the same paper."""
+    versions = record.get('versions') or []
+    try:
+        # The API's `published` is the v1 submission time, and its entry ids carry the latest version.
+        published = parsedate_to_datetime(versions[0]['created']).replace(tzinfo=None) if versions \
+            else datetime.strptime(record['update_date'], '%Y-%m-%d')
+    except (KeyError, TypeError, ValueError):
+        return None
+    latest_version = versions[-1].get('version', 'v1') if versions else 'v1'
+    entry_id = f"{record['id']}{latest_version}"
+    authors = [
+        " ".join(part for part in (parts[1], parts[0], *parts[2:]) if part)
+        for parts in (record.get('authors_parsed') or []) if len(parts) >= 2
+    ]
+    return ArxivResult(
+        entry_id=entry_id,
+        title=_strip_nul(clean_title(record.get('title') or '')),
+        summary=_strip_nul(clean_summary(record.get('abstract') or '')),
+        published=published,
+        authors=authors,
+        categories=(record.get('categories') or '').split(),
+        pdf_url=f"http://arxiv.org/pdf/{entry_id}",
+    )
+
+def _staging_row(values: Dict[str, Any]) -> tuple:
+    return (
+        values['source_id'], values['title'], json.dumps(values['authors']), values['abstract'],
+        values['paper_url'], values['pdf_url'], values['venue_or_category'],
+        values['year_or_date'], values['category'], json.dumps(values['keywords']),
+    )
+
+class SnapshotImport:
+    def __init__(self, path: str, since: date, until: date | None, batch_size: int):
+        self.path = path
+        self.since = since
+        self.until = until
+        self.batch_size = batch_size
+        self.categories = set(ARXIV_CATEGORIES)
+        self.lines_read = 0
+        self.matched = 0
+        self.inserted = 0
+        self.newest: Tuple[datetime, str] | None = None  # (published, entry id) of the newest match
+
+    def _open(self):
+        if self.path.endswith('.gz'):
+            return gzip.open(self.path, 'rt', encoding='utf-8')
+        return open(self.path, 'r', encoding='utf-8')
+
+    def _matching_rows(self) -> Iterator[tuple]:
+        with self._open() as f:
+            for line in f:
+                self.lines_read += 1
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping malformed line {self.lines_read}.")
+                    continue
+                # Cheap category test before any date parsing; most of the snapshot is filtered out here.
+                if self.categories.isdisjoint((record.get('categories') or '').split()):
+                    continue
+                result = result_from_snapshot(record)
+                if result is None or not result.title:
+                    continue
+                published_on = result.published.date()
+                if published_on < self.since or (self.until is not None and published_on > self.until):
+                    continue
+                self.matched += 1
+                if self.newest is None or result.published > self.newest[0]:
+                    self.newest = (result.published, result.entry_id)
+                yield _staging_row(paper_values(result, 0.0))
+
+    def _batches(self) -> Iterator[List[tuple]]:
+        batch: List[tuple] = []
+        for row in self._matching_rows():
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _load(self, connection) -> None:
+        """
+        COPY + merge, one transaction per batch, over a raw asyncpg connection. The staging table is
+        created inside each transaction and dropped at its commit, so it never outlives the server
+        connection the transaction ran on (under PgBouncer's transaction pooling, consecutive batches
+        may run on different ones).
+        """
+        column_defs = ", ".join(f"{name} {sql_type}" for name, sql_type in STAGING_COLUMNS)
+        started = time.perf_counter()
+        for batch in self._batches():
+            async with connection.transaction():
+                await connection.execute(f"CREATE TEMP TABLE {STAGING_TABLE} ({column_defs}) ON COMMIT DROP")
+                await connection.copy_records_to_table(
+                    STAGING_TABLE, records=batch, columns=[name for name, _ in STAGING_COLUMNS]
+                )
+                self.inserted += await connection.fetchval(MERGE_SQL)
+            elapsed = time.perf_counter() - started
+            logging.info(
+                f"Read {self.lines_read:,} lines, matched {self.matched:,}, inserted {self.inserted:,} "
+                f"({self.matched / elapsed * 60:,.0f} matched rows/min)."
+            )
+
+    async def _set_initial_high_water_mark(self) -> None:
+        if self.newest is None:
+            return
+        async with SessionMaker() as session:
+            existing = await session.execute(select(JobTracker).where(JobTracker.job_name == ARXIV_FETCHER_JOB_NAME))
+            if existing.scalars().first() is not None:
+                return  # The fetcher already tracks its own position; don't move it backwards.
+            session.add(JobTracker(job_name=ARXIV_FETCHER_JOB_NAME, last_processed_marker=self.newest[1]))
+            await session.commit()
+        logging.info(f"Set the arXiv fetcher's high-water mark to {self.newest[1]}.")
+
+    async def run(self) -> None:
+        logging.info(f"Importing arXiv papers submitted {self.since} to {self.until or 'now'} from {self.path}...")
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await self._load(raw.driver_connection)
+
+        logging.info("Rebuilding arXiv rankings and tag counts...")
+        async with SessionMaker() as session:
+            await ranking_store.refresh_source(session, 'arxiv')
+            await session.commit()
+        await rebuild_tag_stats()
+        await self._set_initial_high_water_mark()
+        logging.info(
+            f"✅ Snapshot import complete: {self.lines_read:,} lines read, {self.matched:,} matched, "
+            f"{self.inserted:,} inserted, {self.matched - self.inserted:,} already present."
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill arXiv papers from a JSON-lines metadata snapshot.")
+    parser.add_argument("path", help="Snapshot file (.json lines, optionally .gz).")
+    parser.add_argument("--since", type=date.fromisoformat, help="First submission date to import (default: the shelf-life cutoff).")
+    parser.add_argument("--until", type=date.fromisoformat, help="Last submission date to import (default: no limit).")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    since = args.since or date.today() - relativedelta(months=PAPER_SHELF_LIFE_MONTHS)
+    asyncio.run(SnapshotImport(args.path, since, args.until, args.batch_size).run())
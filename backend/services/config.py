@@ -89,11 +89,11 @@ BASE_VENUE_CONFIGS = [
 
 # --- NEW: Centralized ArXiv Fetcher Internals ---
 # These parameters control the behavior of the arxiv_fetcher script.
-# Initial number of papers to fetch on the first run or in each exponential search step.
+# Number of papers requested per API page while walking back to the high-water mark. MUST be <= 2000.
 ARXIV_API_PAGE_SIZE = 200
-# The absolute maximum number of papers to fetch in a single API call. MUST be <= 2000.
+# The maximum number of papers a single run fetches. A larger gap is checkpointed and resumed by the next run.
 ARXIV_MAX_FETCH_SIZE = 2000
-# The maximum number of exponential search attempts to find the high-water mark.
+# Attempts per API page before the run stops and leaves a checkpoint.
 ARXIV_MAX_FETCH_ATTEMPTS = 5
 # The maximum number of concurrent calls to the Semantic Scholar API.
 ARXIV_MAX_CONCURRENT_SEMANTIC_CALLS = 10
@@ -106,6 +106,58 @@ OPENREVIEW_MAX_FETCH_ATTEMPTS = 5  # For exponential search
 # The number of papers to process before committing to the database.
 DB_COMMIT_BATCH_SIZE = 20
 
+# --- Ranking Configuration ---
+# Which engine serves the ranked feeds:
+# - 'precomputed': reads scores from the persisted ranking store (paper_rankings), refreshed incrementally.
+# - 'live': recomputes every score with window functions over the filtered set on each request.
+# - 'vectorized': scores the filtered set in NumPy over an in-memory column snapshot (requires numpy).
+RANKING_BACKEND = "precomputed"
+# How often the API folds its votes/ingests into the per-source bounds and bumps the ranking
+# version (invalidating feed caches and ETags), and rolls the recency epoch over after midnight.
+RANKING_MAINTENANCE_INTERVAL_SECONDS = 5
+# Minimum age of a vectorized snapshot before a ranking version change triggers a reload.
+VECTOR_SNAPSHOT_MIN_RELOAD_SECONDS = 5
+
+# --- Feed Projection Configuration ---
+# Length of the abstract preview returned by `view=compact` feed requests.
+FEED_ABSTRACT_PREVIEW_CHARS = 300
+
+# --- Feed Cache Configuration ---
+# Ranked feed pages are cached in-process, keyed by their normalized filters.
+FEED_CACHE_ENABLED = True
+FEED_CACHE_MAX_ENTRIES = 256
+FEED_CACHE_TTL_SECONDS = 30
+
+# --- Vote Buffer Configuration ---
+# When enabled, votes are acknowledged immediately and accumulated in memory as per-paper
+# deltas, then written in one batched UPDATE every interval or once enough votes are pending.
+VOTE_BUFFER_ENABLED = False
+VOTE_BUFFER_FLUSH_INTERVAL_MS = 500
+VOTE_BUFFER_MAX_PENDING_VOTES = 200
+# A flush that fails because the database is unreachable keeps its votes and is retried with
+# exponential backoff, starting at the flush interval and capped at this delay.
+VOTE_BUFFER_MAX_RETRY_DELAY_MS = 30_000
+# While flushes keep failing, at most this many votes are held; further votes are refused (503).
+VOTE_BUFFER_MAX_BUFFERED_VOTES = 100_000
+
+# --- HTTP Response Configuration ---
+# Responses at least this large are compressed (brotli when the `brotli` package is installed,
+# otherwise gzip), negotiated through Accept-Encoding.
+COMPRESSION_MINIMUM_SIZE_BYTES = 1024
+
+# --- Database Routing ---
+# With REPLICA_DATABASE_URL set, read-only requests are served from the replica. After a client's
+# own successful write (vote, tag, comment) its reads go to the primary for this long, which must
+# exceed the replica's typical lag so the client sees its write.
+READ_YOUR_WRITES_WINDOW_SECONDS = 10
+
+# --- HTTP Record/Replay ---
+# FRONTIER_HTTP_MODE=record saves every arXiv, Semantic Scholar and OpenReview response under
+# this directory; FRONTIER_HTTP_MODE=replay serves them back without touching the network,
+# after the simulated latency (overridable with FRONTIER_HTTP_REPLAY_LATENCY_MS).
+HTTP_RECORDINGS_DIR = "http_recordings"
+HTTP_REPLAY_LATENCY_MS = 0
+
 # --- Logging Configuration ---
 LOGGING_CONFIG = {
     "level": logging.INFO,
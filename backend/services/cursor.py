@@ -0,0 +1,34 @@
+"""
+Opaque keyset-pagination cursors.
+
+A cursor is the sort key of the last row a client has seen, e.g. (score, id) for the
+ranked feeds, prefixed there with the ranking version it is valid for. It is serialized as URL-safe base64 JSON so clients treat it as an
+opaque token and never construct one themselves.
+"""
+
+import base64
+import json
+from typing import Any, Tuple
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values: Any) -> str:
+    payload = json.dumps(list(values), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(token: str, *types: type) -> Tuple[Any, ...]:
+    """
+    Decodes a cursor and coerces each value to the expected type.
+    Raises ValueError for anything that isn't a well-formed cursor of that shape.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Malformed cursor: {e}") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Malformed cursor: unexpected shape")
+    try:
+        return tuple(expected(value) for expected, value in zip(types, values))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Malformed cursor: {e}") from e
@@ -0,0 +1,22 @@
+"""
+Entity tags for conditional GETs.
+
+ETags are derived from cheap version signals (ranking_state.version per source, the
+per-paper `version` column) rather than from hashing response bodies, so a matching
+If-None-Match can be answered with 304 Not Modified before any ranking or loading work.
+"""
+
+import hashlib
+from typing import Any
+
+def make_etag(*parts: Any) -> str:
+    """A quoted strong ETag for the given version signal and request parameters."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluates an If-None-Match header (weak comparison, as RFC 9110 prescribes for it)."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,174 @@
+"""
+An in-process LRU + TTL cache for ranked feed pages.
+
+Entries are keyed by the normalized filter tuple of a feed request and stamped with the
+ranking-store version of their source at fill time. A lookup only hits when the entry is
+fresh *and* the source's version is unchanged, so writes made by other processes (e.g. the
+fetcher cron jobs bumping `ranking_state.version`) invalidate this cache as well.
+
+In-process writes invalidate explicitly and as narrowly as possible:
+- a vote or comment only drops the pages that contain the paper (its counts and score
+  changed); where else it now ranks shows once the next ranking sync bumps the version;
+- a tag change affects the pages that contain the paper or filter on that tag.
+
+A page is computed between a `token()` and its `put`; if an invalidation that covers it
+ran in between, or another request already saw a newer version of the source, the
+page is stale and is not stored.
+"""
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Deque, Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Tuple
+
+from services.config import FEED_CACHE_MAX_ENTRIES, FEED_CACHE_TTL_SECONDS
+
+class FeedKey(NamedTuple):
+    source: str
+    tags: Tuple[str, ...]
+    venue: str | None
+    year: int | None
+    category: str | None
+    page: Tuple[Hashable, ...]
+
+@dataclass
+class FeedCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    stale_puts: int = 0
+
+@dataclass
+class _Entry:
+    value: List[Any]
+    version: int
+    expires_at: float
+    paper_ids: FrozenSet[int] = field(default_factory=frozenset)
+
+_Predicate = Callable[[FeedKey, _Entry], bool]
+# Invalidations remembered for checking puts; a page computed across more of them is not stored.
+_RECENT_INVALIDATIONS = 1024
+
+class FeedCache:
+    def __init__(self, max_entries: int = FEED_CACHE_MAX_ENTRIES, ttl_seconds: float = FEED_CACHE_TTL_SECONDS):
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive.")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[FeedKey, _Entry]" = OrderedDict()
+        self._stats = FeedCacheStats()
+        self._latest_versions: Dict[str, int] = {}  # Newest version seen per source
+        self._invalidation_seq = 0
+        self._recent_invalidations: Deque[Tuple[int, _Predicate]] = deque(maxlen=_RECENT_INVALIDATIONS)
+
+    @staticmethod
+    def make_key(
+        source: str,
+        tags: List[str] | None = None,
+        venue: str | None = None,
+        year: int | None = None,
+        category: str | None = None,
+        page: Tuple[Hashable, ...] = (),
+    ) -> FeedKey:
+        """Normalizes a filter combination so equivalent requests share an entry."""
+        normalized_tags = tuple(sorted({tag.strip() for tag in (tags or []) if tag.strip()}))
+        normalized_venue = venue.strip().lower() if venue and venue.strip() else None
+        return FeedKey(source, normalized_tags, normalized_venue, year or None, category or None, page)
+
+    def get(self, key: FeedKey, version: int) -> List[Any] | None:
+        self._see_version(key.source, version)
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats.misses += 1
+            return None
+        if entry.version != version:
+            self._drop(key)
+            self._stats.invalidations += 1
+            self._stats.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._drop(key)
+            self._stats.expirations += 1
+            self._stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats.hits += 1
+        return entry.value
+
+    def token(self) -> int:
+        """Taken before computing a page and passed to `put`, which then skips it if it went stale meanwhile."""
+        return self._invalidation_seq
+
+    def put(
+        self, key: FeedKey, version: int, value: List[Any], paper_ids: FrozenSet[int] = frozenset(), token: int | None = None
+    ) -> None:
+        entry = _Entry(value, version, time.monotonic() + self.ttl_seconds, paper_ids)
+        outdated = version < self._latest_versions.get(key.source, version)
+        if outdated or (token is not None and self._invalidated_since(token, key, entry)):
+            self._stats.stale_puts += 1
+            return
+        self._see_version(key.source, version)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.evictions += 1
+
+    def invalidate_source(self, source: str) -> None:
+        self._invalidate_where(lambda key, entry: key.source == source)
+
+    def invalidate_paper(self, paper_id: int) -> None:
+        self._invalidate_where(lambda key, entry: paper_id in entry.paper_ids)
+
+    def invalidate_papers(self, paper_ids: Iterable[int]) -> None:
+        paper_ids = frozenset(paper_ids)
+        self._invalidate_where(lambda key, entry: not paper_ids.isdisjoint(entry.paper_ids))
+
+    def invalidate_tag(self, tag: str) -> None:
+        tag = tag.strip()
+        self._invalidate_where(lambda key, entry: tag in key.tags)
+
+    def clear(self) -> None:
+        self._record_invalidation(lambda key, entry: True)
+        self._stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats.hits + self._stats.misses
+        return {
+            **asdict(self._stats),
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_ratio": self._stats.hits / lookups if lookups else 0.0,
+        }
+
+    def _invalidate_where(self, predicate: _Predicate) -> None:
+        self._record_invalidation(predicate)
+        stale = [key for key, entry in self._entries.items() if predicate(key, entry)]
+        for key in stale:
+            self._drop(key)
+        self._stats.invalidations += len(stale)
+
+    def _record_invalidation(self, predicate: _Predicate) -> None:
+        self._invalidation_seq += 1
+        self._recent_invalidations.append((self._invalidation_seq, predicate))
+
+    def _invalidated_since(self, token: int, key: FeedKey, entry: _Entry) -> bool:
+        if self._invalidation_seq == token:
+            return False
+        if not self._recent_invalidations or self._recent_invalidations[0][0] > token + 1:
+            return True  # Too many invalidations ago to tell; assume it was covered
+        return any(seq > token and predicate(key, entry) for seq, predicate in self._recent_invalidations)
+
+    def _see_version(self, source: str, version: int) -> None:
+        if version > self._latest_versions.get(source, version - 1):
+            self._latest_versions[source] = version
+
+    def _drop(self, key: FeedKey) -> None:
+        self._entries.pop(key, None)
+
+# Create a single, reusable instance
+feed_cache = FeedCache()
@@ -0,0 +1,217 @@
+# File: backend/services/http_replay.py
+
+"""
+Record/replay for the fetchers' outbound API calls.
+
+Every HTTP client the fetchers use (arXiv, Semantic Scholar) is built on
+`RecordReplayTransport`, and the OpenReview client is wrapped in
+`RecordReplayOpenReviewClient`. The mode comes from FRONTIER_HTTP_MODE:
+  live:   requests go to the network as usual (the default).
+  record: requests go to the network, and each response is saved as one JSON file,
+          named by a hash of the request (method, URL with sorted query, body).
+  replay: responses are served from those files; nothing touches the network, and a
+          request that was never recorded fails with `ReplayMissError`. Each response
+          arrives after the configured latency, and bodies are streamed in chunks, so
+          the streaming parsers run exactly as they do against the live API.
+
+Replay also skips the politeness delays between API calls (`courtesy_sleep`), so an
+offline run measures the ingestion pipeline instead of the rate limits. Request
+headers (API keys included) are never part of a recording's key or contents.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from services.config import HTTP_RECORDINGS_DIR, HTTP_REPLAY_LATENCY_MS, LOGGING_CONFIG
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+HTTP_MODES = ("live", "record", "replay")
+REPLAY_CHUNK_SIZE = 64 * 1024
+OPENREVIEW_RECORDINGS_SUBDIR = "openreview"
+
+@dataclass
+class ReplaySettings:
+    mode: str = "live"
+    directory: str = HTTP_RECORDINGS_DIR
+    latency_ms: float = HTTP_REPLAY_LATENCY_MS
+
+@dataclass
+class ReplayStats:
+    live: int = 0      # Requests sent to the network without recording
+    recorded: int = 0  # Requests sent to the network and saved
+    replayed: int = 0  # Requests served from a recording
+    misses: int = 0    # Replayed requests with no recording
+
+class ReplayMissError(httpx.TransportError):
+    """A request made in replay mode that was never recorded."""
+
+def _settings_from_env() -> ReplaySettings:
+    mode = os.getenv("FRONTIER_HTTP_MODE", "live").strip().lower() or "live"
+    if mode not in HTTP_MODES:
+        raise ValueError(f"Unknown FRONTIER_HTTP_MODE '{mode}'. Expected one of {HTTP_MODES}.")
+    latency = os.getenv("FRONTIER_HTTP_REPLAY_LATENCY_MS")
+    return ReplaySettings(
+        mode=mode,
+        directory=os.getenv("FRONTIER_HTTP_RECORDINGS_DIR") or HTTP_RECORDINGS_DIR,
+        latency_ms=float(latency) if latency else HTTP_REPLAY_LATENCY_MS,
+    )
+
+# Read on every request, so a benchmark can switch modes after the clients were created.
+settings = _settings_from_env()
+stats = ReplayStats()
+
+def configure(mode: str | None = None, directory: str | None = None, latency_ms: float | None = None) -> ReplaySettings:
+    if mode is not None:
+        if mode not in HTTP_MODES:
+            raise ValueError(f"Unknown HTTP mode '{mode}'. Expected one of {HTTP_MODES}.")
+        settings.mode = mode
+    if directory is not None:
+        settings.directory = directory
+    if latency_ms is not None:
+        settings.latency_ms = latency_ms
+    return settings
+
+def replay_stats() -> Dict[str, Any]:
+    return {**asdict(settings), **asdict(stats)}
+
+async def courtesy_sleep(seconds: float) -> None:
+    """A politeness delay towards a live API; skipped when nothing is sent to it."""
+    if settings.mode != "replay":
+        await asyncio.sleep(seconds)
+
+def _request_key(*parts: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+def _canonical_url(url: str) -> str:
+    """The URL with its query parameters sorted, so parameter order doesn't change the key."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+def recording_path(request: httpx.Request, body: bytes) -> Path:
+    url = _canonical_url(str(request.url))
+    key = _request_key(request.method.encode(), url.encode(), body)
+    return Path(settings.directory) / request.url.host / f"{request.method.lower()}-{key}.json"
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written whole, then renamed, so an interrupted recording never leaves a truncated file.
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")  # Concurrent identical requests each write their own
+    tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    tmp.replace(path)
+
+class _ChunkedReplayStream(httpx.AsyncByteStream):
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.body), REPLAY_CHUNK_SIZE):
+            yield self.body[start:start + REPLAY_CHUNK_SIZE]
+
+class RecordReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if settings.mode == "live":
+            stats.live += 1
+            return await self.transport.handle_async_request(request)
+
+        body = await request.aread()
+        path = recording_path(request, body)
+        if settings.mode == "replay":
+            return await self._replay(request, path)
+
+        response = await self.transport.handle_async_request(request)
+        try:
+            # Raw bytes as sent (possibly gzip), with the headers that let the client decode them.
+            raw = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        _write_json(path, {
+            "method": request.method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "headers": response.headers.multi_items(),
+            "body": base64.b64encode(raw).decode("ascii"),
+        })
+        stats.recorded += 1
+        return httpx.Response(
+            response.status_code, headers=response.headers, stream=httpx.ByteStream(raw), extensions=response.extensions
+        )
+
+    async def _replay(self, request: httpx.Request, path: Path) -> httpx.Response:
+        if not path.exists():
+            stats.misses += 1
+            raise ReplayMissError(f"No recording of {request.method} {request.url} (expected {path}).", request=request)
+        recording = json.loads(path.read_text(encoding="utf-8"))
+        if settings.latency_ms:
+            await asyncio.sleep(settings.latency_ms / 1000)
+        stats.replayed += 1
+        return httpx.Response(
+            recording["status_code"],
+            headers=recording["headers"],
+            stream=_ChunkedReplayStream(base64.b64decode(recording["body"])),
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+def http_client(**kwargs) -> httpx.AsyncClient:
+    """An AsyncClient whose requests are recorded or replayed according to FRONTIER_HTTP_MODE."""
+    return httpx.AsyncClient(transport=RecordReplayTransport(), **kwargs)
+
+class RecordReplayOpenReviewClient:
+    """
+    Stands in for `openreview.api.OpenReviewClient.get_notes`, the only call the fetcher makes.
+    Notes are recorded as their JSON form and rebuilt with `Note.from_json` on replay. The
+    real client (which logs in over the network when created) is only built outside replay.
+    """
+    def __init__(self, **client_kwargs):
+        self.client = None
+        if settings.mode != "replay":
+            import openreview.api
+            self.client = openreview.api.OpenReviewClient(**client_kwargs)
+
+    def _path(self, query: Dict[str, Any]) -> Path:
+        key = _request_key(b"get_notes", json.dumps(query, sort_keys=True, default=str).encode())
+        return Path(settings.directory) / OPENREVIEW_RECORDINGS_SUBDIR / f"get_notes-{key}.json"
+
+    def get_notes(self, **query) -> List[Any]:
+        if settings.mode == "live":
+            stats.live += 1
+            return self.client.get_notes(**query)
+
+        path = self._path(query)
+        if settings.mode == "replay":
+            if not path.exists():
+                stats.misses += 1
+                raise ReplayMissError(f"No recording of get_notes({query}) (expected {path}).")
+            import openreview.api
+            recording = json.loads(path.read_text(encoding="utf-8"))
+            if settings.latency_ms:
+                time.sleep(settings.latency_ms / 1000)  # get_notes is synchronous; callers run it in a thread
+            stats.replayed += 1
+            return [openreview.api.Note.from_json(note) for note in recording["notes"]]
+
+        notes = self.client.get_notes(**query)
+        _write_json(path, {"query": query, "notes": [note.to_json() for note in notes]})
+        stats.recorded += 1
+        return notes
@@ -26,6 +26,9 @@ from sqlalchemy.exc import DBAPIError
 from model.database import SessionMaker
 from model.paper import Paper
 from model.job_tracker import JobTracker
+from services.paper_writer import paper_writer, sync_rankings
+from services import http_replay
+from services.http_replay import RecordReplayOpenReviewClient
 from services.config import (
     LOGGING_CONFIG, DB_COMMIT_BATCH_SIZE, BASE_VENUE_CONFIGS,
     OPENREVIEW_API_PAGE_SIZE, OPENREVIEW_MAX_FETCH_ATTEMPTS
@@ -38,9 +41,10 @@ class OpenReviewFetcher:
     def __init__(self):
         or_user = os.getenv("OPENREVIEW_USER")
         or_pass = os.getenv("OPENREVIEW_PASS")
-        if not or_user or not or_pass:
+        # Replaying recorded responses needs no account.
+        if (not or_user or not or_pass) and http_replay.settings.mode != "replay":
             raise ValueError("OPENREVIEW_USER and OPENREVIEW_PASS must be set in .env file.")
-        self.client = openreview.api.OpenReviewClient(baseurl='https://api2.openreview.net', username=or_user, password=or_pass)
+        self.client = RecordReplayOpenReviewClient(baseurl='https://api2.openreview.net', username=or_user, password=or_pass)
         logging.info("Initialized OpenReview API V2 client.")
 
     def _generate_full_venue_list(self) -> list:
@@ -160,30 +164,26 @@ class OpenReviewFetcher:
         return all_notes
 
     async def _process_and_commit_notes(self, new_notes: list, config: dict):
-        logging.info(f"Processing and committing {len(new_notes)} new papers for '{config['name']}'...")
+        logging.info(f"Processing and committing {len(new_notes)} papers for '{config['name']}'...")
         papers_to_commit = [p for p in [self._parse_note_to_paper(note, config) for note in new_notes] if p is not None]
-        for i in range(0, len(papers_to_commit), DB_COMMIT_BATCH_SIZE):
-            batch = papers_to_commit[i:i + DB_COMMIT_BATCH_SIZE]
-            logging.info(f"Committing batch of {len(batch)} papers for {config['name']}...")
-            async with SessionMaker() as commit_session:
+        inserted, skipped, failed = 0, 0, 0
+        async with SessionMaker() as commit_session:
+            for i in range(0, len(papers_to_commit), DB_COMMIT_BATCH_SIZE):
+                batch = papers_to_commit[i:i + DB_COMMIT_BATCH_SIZE]
                 try:
-                    commit_session.add_all(batch)
-                    await commit_session.commit()
+                    result = await paper_writer.insert_papers(commit_session, 'openreview', batch)
                 except Exception as e:
-                    await commit_session.rollback()
                     logging.error(f"Database commit failed for batch. Error: {e}", exc_info=True)
-        logging.info(f"Finished committing all papers for '{config['name']}'.")
+                    failed += len(batch)
+                    continue
+                inserted, skipped, failed = inserted + result.inserted, skipped + result.skipped, failed + result.failed
+        logging.info(f"Finished committing papers for '{config['name']}': inserted={inserted}, skipped_existing={skipped}, failed={failed}.")
     
     async def _handle_new_notes(self, notes: list, config: dict):
-        logging.info(f"Found {len(notes)} potential papers for '{config['name']}'. Checking for duplicates...")
-        or_ids = {note.id for note in notes if not note.replyto}
-        if not or_ids: logging.info("No top-level notes found in the fetched batch."); return
-        async with SessionMaker() as session:
-            stmt = select(Paper.source_id).where(Paper.source_id.in_(or_ids))
-            result = await session.execute(stmt)
-            existing_ids = {row[0] for row in result.all()}
-        new_notes = [note for note in notes if note.id in or_ids and note.id not in existing_ids]
-        if not new_notes: logging.info(f"No new papers to add for '{config['name']}'."); return
+        # Already-stored papers are skipped by the insert itself (ON CONFLICT DO NOTHING).
+        logging.info(f"Found {len(notes)} potential papers for '{config['name']}'.")
+        new_notes = [note for note in notes if not note.replyto]
+        if not new_notes: logging.info("No top-level notes found in the fetched batch."); return
         await self._process_and_commit_notes(new_notes, config)
 
     async def _full_sync_venue(self, config):
@@ -234,8 +234,11 @@ class OpenReviewFetcher:
     async def run(self):
         logging.info("--- Starting OpenReview Hybrid Sync Run ---")
         venues_to_process = self._generate_full_venue_list()
-        for config in venues_to_process:
-            await self._sync_venue(config)
+        try:
+            for config in venues_to_process:
+                await self._sync_venue(config)
+        finally:
+            await sync_rankings()
         logging.info("--- ✅ All venue syncs complete. ---")
 
 
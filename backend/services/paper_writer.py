@@ -0,0 +1,105 @@
+"""
+Set-based inserts of freshly fetched papers, shared by both fetchers.
+
+A batch is written with one multi-row `INSERT ... ON CONFLICT (source_id) DO NOTHING
+RETURNING id`, so already-stored papers are skipped by the database instead of being
+looked up first, and no ORM unit of work is involved. Only the returned ids, i.e. the
+papers actually inserted, are counted in `tag_stats` and re-ranked. The source's bounds and version are synced once, at the end of the fetch
+run (`ranking_store.run_maintenance`), not after every batch; its version bump is what
+invalidates the feed caches.
+
+If the statement fails (a row violating a constraint, say), the batch is bisected: each
+half is retried in its own savepoint until the offending rows are isolated, logged and
+skipped, and every other row of the batch still goes in.
+
+Rows are taken from `Paper` objects the fetchers build, so the model's validators and
+Python-side defaults have already been applied; the insert itself bypasses them.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from model.paper import Paper
+from services.config import LOGGING_CONFIG
+from services.ranking_store import ranking_store
+from services.tag_stats import tag_stats_store
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+_INSERT_STATEMENT = (
+    pg_insert(Paper)
+    .on_conflict_do_nothing(index_elements=[Paper.source_id])
+    .returning(Paper.id)
+)
+_PAPER_COLUMNS = tuple(column.key for column in Paper.__table__.columns if column.computed is None)
+
+@dataclass
+class BulkInsertResult:
+    inserted_ids: List[int] = field(default_factory=list)
+    skipped: int = 0  # Already stored (source_id conflict)
+    failed: int = 0   # Rejected by the database, isolated by bisection
+
+    @property
+    def inserted(self) -> int:
+        return len(self.inserted_ids)
+
+def paper_row(paper: Paper) -> Dict[str, Any]:
+    """The column values set on a (transient) Paper, as an insert parameter set."""
+    return {key: paper.__dict__[key] for key in _PAPER_COLUMNS if key in paper.__dict__}
+
+class PaperWriter:
+    async def insert_papers(self, session: AsyncSession, source: str, papers: List[Paper]) -> BulkInsertResult:
+        """
+        Inserts a batch, counts its tags and commits, then refreshes the inserted papers' rankings
+        in a second transaction. A failed ranking refresh is logged; the papers stay inserted.
+        """
+        result = BulkInsertResult()
+        if not papers:
+            return result
+        rows = [paper_row(paper) for paper in papers]
+        try:
+            await self._insert_rows(session, rows, result)
+            result.skipped = len(rows) - result.inserted - result.failed
+            await tag_stats_store.add_papers(session, result.inserted_ids)
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+        if result.inserted_ids:
+            try:
+                await ranking_store.refresh_papers(session, source, result.inserted_ids)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logging.error(f"Ranking refresh failed for {result.inserted} new {source} papers. Error: {e}", exc_info=True)
+        return result
+
+    async def _insert_rows(self, session: AsyncSession, rows: List[Dict[str, Any]], result: BulkInsertResult) -> None:
+        try:
+            async with session.begin_nested():
+                inserted = await session.execute(_INSERT_STATEMENT, rows)
+                result.inserted_ids.extend(inserted.scalars().all())
+        except SQLAlchemyError as e:
+            if len(rows) == 1:
+                result.failed += 1
+                logging.error(f"Skipping paper {rows[0].get('source_id')}: insert failed. Error: {e}", exc_info=False)
+                return
+            middle = len(rows) // 2
+            await self._insert_rows(session, rows[:middle], result)
+            await self._insert_rows(session, rows[middle:], result)
+
+# Create a single, reusable instance
+paper_writer = PaperWriter()
+
+async def sync_rankings() -> None:
+    """Folds a fetch run's inserts into the ranking bounds and bumps the versions, once per run."""
+    try:
+        await ranking_store.run_maintenance()
+    except Exception as e:
+        logging.error(f"Ranking sync after the fetch run failed; the next sync of the source catches up. Error: {e}", exc_info=True)
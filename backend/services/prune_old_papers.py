@@ -9,6 +9,8 @@ from sqlalchemy import delete
 from model.database import SessionMaker
 from model.paper import Paper
 from services.config import PAPER_SHELF_LIFE_MONTHS, LOGGING_CONFIG
+from services.ranking_store import ranking_store
+from services.tag_stats import tag_stats_store
 
 logging.basicConfig(**LOGGING_CONFIG)
 
@@ -23,14 +25,15 @@ async def prune_papers():
     
     async with SessionMaker() as session:
         try:
-            stmt = (
-                delete(Paper)
-                .where(Paper.source == 'arxiv')
-                # This direct date comparison is clean and efficient.
-                .where(Paper.year_or_date < cutoff_date)
-            )
+            # This direct date comparison is clean and efficient.
+            expired = (Paper.source == 'arxiv') & (Paper.year_or_date < cutoff_date)
+            # Un-count the papers' tags in the same transaction that deletes them.
+            await tag_stats_store.remove_papers(session, expired)
+            stmt = delete(Paper).where(expired)
             
             result = await session.execute(stmt)
+            # Ranking rows go with their papers (ON DELETE CASCADE), but the bounds may have shrunk.
+            await ranking_store.refresh_source(session, 'arxiv')
             await session.commit()
             
             logging.info(f"✅ Pruning complete. Deleted {result.rowcount} old papers.")
@@ -0,0 +1,60 @@
+"""
+The bleeding-edge ranking formula, expressed as reusable SQL expression builders.
+
+Both the live ranking query and the persisted ranking store compose these helpers,
+so the two code paths can never drift apart on weights or constants.
+"""
+
+from sqlalchemy import func, cast, case, literal, Float
+from datetime import date
+
+WEIGHT_RECENCY = 0.3
+WEIGHT_REPUTATION = 0.5
+WEIGHT_POPULARITY = 0.2
+RECENCY_DECAY_CONSTANT = 0.1
+WILSON_Z = 1.96 # 95% confidence
+NORMALIZATION_EPSILON = 1e-9
+
+def days_old_since_now(date_column):
+    """Fractional days between `now()` and the paper date; future dates count as 0."""
+    return case(
+        (date_column > date.today(), 0),
+        else_=func.extract('epoch', func.now() - date_column) / (60*60*24)
+    )
+
+def days_old_since_epoch(date_column, epoch: date):
+    """Whole days between a fixed epoch date and the paper date; future dates count as 0."""
+    return func.greatest(literal(epoch) - date_column, 0)
+
+def recency_expr(days_old):
+    return func.exp(-RECENCY_DECAY_CONSTANT * days_old)
+
+def popularity_expr(upvotes, downvotes):
+    """Lower bound of the Wilson score interval for the upvote ratio."""
+    total_votes = (upvotes + downvotes)
+    upvotes_float = cast(upvotes, Float)
+    total_votes_float = cast(total_votes, Float)
+    safe_total_votes = func.greatest(total_votes_float, 1.0)
+    p_hat = upvotes_float / safe_total_votes
+    z = WILSON_Z
+    sqrt_part = func.sqrt((p_hat * (1 - p_hat) + z * z / (4 * safe_total_votes)) / safe_total_votes)
+    return (p_hat + z * z / (2 * safe_total_votes) - z * sqrt_part) / (1 + z * z / safe_total_votes)
+
+def log_reputation_expr(reputation):
+    return func.log(reputation + 1)
+
+def normalize_expr(value, min_value, max_value):
+    """Min-max normalization; a degenerate range (all values equal) maps to 1.0."""
+    if isinstance(min_value, float) or isinstance(max_value, float):
+        min_value, max_value = literal(min_value, Float), literal(max_value, Float)
+    return case(
+        (max_value == min_value, 1.0),
+        else_=((value - min_value) / (max_value - min_value + NORMALIZATION_EPSILON))
+    )
+
+def bleeding_edge_expr(norm_recency, norm_reputation, norm_popularity):
+    return (
+        (WEIGHT_RECENCY * norm_recency) +
+        (WEIGHT_REPUTATION * norm_reputation) +
+        (WEIGHT_POPULARITY * norm_popularity)
+    )
@@ -1,56 +1,83 @@
-from sqlalchemy import select, func, cast, Float, or_, case, literal_column
+from sqlalchemy import select, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.selectable import Select
-from typing import List
+from sqlalchemy.sql.elements import ColumnElement
+from typing import Any, List, NamedTuple, Tuple
 from dataclasses import dataclass
-from datetime import date
 
-from model.paper import Paper
+from model.paper import Paper, venue_key, year_range
+from model.paper_ranking import PaperRanking
+from services.config import RANKING_BACKEND, FEED_CACHE_ENABLED
+from services.ranking_store import ranking_store
+from services.feed_cache import feed_cache, FeedKey
+from services.ranking_formula import (
+    days_old_since_now, recency_expr, popularity_expr, log_reputation_expr,
+    normalize_expr, bleeding_edge_expr,
+)
 
 @dataclass
 class RankedPaper:
-    paper: Paper
+    # A full `Paper`, or a lightweight row carrying only the columns of a FeedProjection.
+    paper: Paper | Any
     bleeding_edge_score: float
     recency_component: float
     reputation_component: float
     popularity_component: float
 
-WEIGHT_RECENCY = 0.3
-WEIGHT_REPUTATION = 0.5
-WEIGHT_POPULARITY = 0.2
-RECENCY_DECAY_CONSTANT = 0.1
+RANKING_BACKENDS = ('precomputed', 'live', 'vectorized')
+
+# A keyset position in a ranked feed: the (bleeding_edge_score, id) of the last row seen.
+FeedCursor = Tuple[float, int]
+
+# Columns the live scorer needs regardless of what the caller asked to see.
+SCORING_COLUMNS = ('year_or_date', 'upvotes', 'downvotes', 'reputation_score')
+# The stored columns a full `Paper` is built from. The generated ones (all_tags, search_vector,
+# venue_key) are only filtered on and would otherwise be carried through the window query.
+PAPER_MODEL_COLUMNS = tuple(column.key for column in Paper.__table__.columns if column.computed is None)
+
+class FeedProjection(NamedTuple):
+    """
+    A slim column selection for feed pages. Rows come back as plain result rows
+    instead of ORM objects, optionally with the abstract truncated in SQL.
+    """
+    columns: Tuple[str, ...]
+    abstract_chars: int | None = None
+
+    def sql_columns(self, extra: Tuple[str, ...] = ()) -> List[ColumnElement]:
+        names = dict.fromkeys(('id', *self.columns, *extra))
+        return [
+            func.left(Paper.abstract, self.abstract_chars).label('abstract')
+            if name == 'abstract' and self.abstract_chars else getattr(Paper, name)
+            for name in names
+        ]
 
 class RankingService:
-    # --- THIS IS THE REFACTOR ---
-    # The core ranking logic is now in a private method that accepts any pre-filtered query.
+    def __init__(self, backend: str = RANKING_BACKEND, use_cache: bool = FEED_CACHE_ENABLED):
+        if backend not in RANKING_BACKENDS:
+            raise ValueError(f"Unknown ranking backend '{backend}'. Expected one of {RANKING_BACKENDS}.")
+        self.backend = backend
+        self.use_cache = use_cache
+        if backend == 'vectorized':
+            # NumPy is only required when this backend is selected.
+            from services.vector_ranking import vector_ranking_engine
+            self._vector_engine = vector_ranking_engine
+
+    # Live scoring: window functions over any pre-filtered query, normalizing within the filtered set.
     async def _get_ranked_papers(
-        self, session: AsyncSession, base_query: Select, limit: int, offset: int
+        self, session: AsyncSession, base_query: Select, limit: int, offset: int, after: FeedCursor | None = None,
+        build_models: bool = True
     ) -> List[RankedPaper]:
         
         filtered_subquery = base_query.subquery('filtered_papers')
 
         # Recency Score Calculation
-        days_old = case(
-            (filtered_subquery.c.year_or_date > date.today(), 0),
-            else_=func.extract('epoch', func.now() - filtered_subquery.c.year_or_date) / (60*60*24)
-        )
-        recency_score = func.exp(-RECENCY_DECAY_CONSTANT * days_old).label("recency_score")
+        recency_score = recency_expr(days_old_since_now(filtered_subquery.c.year_or_date)).label("recency_score")
         
         # Popularity Score Calculation (Wilson Score Interval)
-        upvotes = filtered_subquery.c.upvotes
-        downvotes = filtered_subquery.c.downvotes
-        total_votes = (upvotes + downvotes)
-        upvotes_float = cast(upvotes, Float)
-        total_votes_float = cast(total_votes, Float)
-        safe_total_votes = func.greatest(total_votes_float, 1.0)
-        p_hat = upvotes_float / safe_total_votes
-        z = 1.96 # 95% confidence
-        sqrt_part = func.sqrt((p_hat * (1 - p_hat) + z * z / (4 * safe_total_votes)) / safe_total_votes)
-        popularity_score = ((p_hat + z * z / (2 * safe_total_votes) - z * sqrt_part) / (1 + z * z / safe_total_votes)).label("popularity_score")
+        popularity_score = popularity_expr(filtered_subquery.c.upvotes, filtered_subquery.c.downvotes).label("popularity_score")
         
         # Reputation Score (Log-transformed)
-        reputation = filtered_subquery.c.reputation_score
-        log_reputation = func.log(reputation + 1).label("log_reputation")
+        log_reputation = log_reputation_expr(filtered_subquery.c.reputation_score).label("log_reputation")
         
         # Min-Max Normalization using Window Functions
         max_rep = func.max(log_reputation).over()
@@ -61,16 +88,12 @@ class RankingService:
         min_pop = func.min(popularity_score).over()
 
         # Handle division by zero if all values in a window are the same
-        norm_log_reputation = case((max_rep == min_rep, 1.0), else_=((log_reputation - min_rep) / (max_rep - min_rep + 1e-9))).label("norm_log_reputation")
-        norm_recency = case((max_rec == min_rec, 1.0), else_=((recency_score - min_rec) / (max_rec - min_rec + 1e-9))).label("norm_recency")
-        norm_popularity = case((max_pop == min_pop, 1.0), else_=((popularity_score - min_pop) / (max_pop - min_pop + 1e-9))).label("norm_popularity")
+        norm_log_reputation = normalize_expr(log_reputation, min_rep, max_rep).label("norm_log_reputation")
+        norm_recency = normalize_expr(recency_score, min_rec, max_rec).label("norm_recency")
+        norm_popularity = normalize_expr(popularity_score, min_pop, max_pop).label("norm_popularity")
 
         # Final Weighted Score
-        bleeding_edge_score = (
-            (WEIGHT_RECENCY * norm_recency) + 
-            (WEIGHT_REPUTATION * norm_log_reputation) + 
-            (WEIGHT_POPULARITY * norm_popularity)
-        ).label("bleeding_edge_score")
+        bleeding_edge_score = bleeding_edge_expr(norm_recency, norm_log_reputation, norm_popularity).label("bleeding_edge_score")
         
         # The final query selects all original paper columns plus the calculated scores
         final_query = select(
@@ -79,18 +102,30 @@ class RankingService:
             norm_recency,
             norm_log_reputation,
             norm_popularity
-        ).order_by(bleeding_edge_score.desc()).offset(offset).limit(limit)
+        )
+        if after is None:
+            final_query = final_query.order_by(bleeding_edge_score.desc(), filtered_subquery.c.id.desc()).offset(offset).limit(limit)
+        else:
+            # Scores are only known after the window pass, so the keyset filter wraps the scored set.
+            scored = final_query.subquery('scored_papers')
+            final_query = (
+                select(scored)
+                .where(tuple_(scored.c.bleeding_edge_score, scored.c.id) < tuple_(*after))
+                .order_by(scored.c.bleeding_edge_score.desc(), scored.c.id.desc())
+                .limit(limit)
+            )
         
         result = await session.execute(final_query)
         
         # Manually construct the Paper objects from the flat row data to avoid ORM issues with complex queries
         ranked_papers = []
         for row in result.all():
-            paper_data = {c.name: getattr(row, c.name) for c in filtered_subquery.c}
+            if build_models:
+                paper_data = {c.name: getattr(row, c.name) for c in filtered_subquery.c}
             
             ranked_papers.append(
                 RankedPaper(
-                    paper=Paper(**paper_data),
+                    paper=Paper(**paper_data) if build_models else row,
                     bleeding_edge_score=row.bleeding_edge_score,
                     recency_component=row.norm_recency,
                     reputation_component=row.norm_log_reputation,
@@ -99,20 +134,147 @@ class RankingService:
             )
         return ranked_papers
 
+    # Reads pre-scored rows from the ranking store: an index-ordered top-N scan instead of a full recompute.
+    async def _get_precomputed_ranked_papers(
+        self, session: AsyncSession, source: str, conditions: List[ColumnElement], limit: int, offset: int,
+        after: FeedCursor | None = None, projection: FeedProjection | None = None
+    ) -> List[RankedPaper]:
+        await ranking_store.ensure_current(session, source)
+
+        if after is not None:
+            # Seeks straight into the (source, score, id) index, so page N costs the same as page 1.
+            conditions = [*conditions, tuple_(PaperRanking.bleeding_edge_score, PaperRanking.paper_id) < tuple_(*after)]
+            offset = 0
+
+        query = (
+            select(
+                *(projection.sql_columns() if projection else [Paper]),
+                PaperRanking.bleeding_edge_score,
+                PaperRanking.norm_recency,
+                PaperRanking.norm_log_reputation,
+                PaperRanking.norm_popularity,
+            )
+            .join(PaperRanking, PaperRanking.paper_id == Paper.id)
+            .where(PaperRanking.source == source, *conditions)
+            .order_by(PaperRanking.bleeding_edge_score.desc(), PaperRanking.paper_id.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await session.execute(query)
+        return [
+            RankedPaper(
+                paper=row if projection else row.Paper,
+                bleeding_edge_score=row.bleeding_edge_score,
+                recency_component=row.norm_recency,
+                reputation_component=row.norm_log_reputation,
+                popularity_component=row.norm_popularity
+            )
+            for row in result.all()
+        ]
+
+    # Scores the filtered set in NumPy over an in-memory column snapshot, then loads only the page's rows.
+    async def _get_vectorized_ranked_papers(
+        self, session: AsyncSession, key: FeedKey, version: int | None, limit: int, offset: int,
+        after: FeedCursor | None = None, projection: FeedProjection | None = None
+    ) -> List[RankedPaper]:
+        snapshot = await self._vector_engine.get_snapshot(session, key.source, version)
+        scored_page = snapshot.rank(key, limit, offset, after)
+        if not scored_page:
+            return []
+
+        page_ids = [row.paper_id for row in scored_page]
+        if projection:
+            result = await session.execute(select(*projection.sql_columns()).where(Paper.id.in_(page_ids)))
+            papers_by_id = {paper.id: paper for paper in result.all()}
+        else:
+            result = await session.execute(select(Paper).where(Paper.id.in_(page_ids)))
+            papers_by_id = {paper.id: paper for paper in result.scalars().all()}
+        return [
+            RankedPaper(
+                paper=papers_by_id[row.paper_id],
+                bleeding_edge_score=row.bleeding_edge_score,
+                recency_component=row.norm_recency,
+                reputation_component=row.norm_log_reputation,
+                popularity_component=row.norm_popularity
+            )
+            for row in scored_page if row.paper_id in papers_by_id
+        ]
+
+    async def _rank(
+        self, session: AsyncSession, key: FeedKey, conditions: List[ColumnElement], limit: int, offset: int,
+        after: FeedCursor | None = None, projection: FeedProjection | None = None, version: int | None = None
+    ) -> List[RankedPaper]:
+        """`version` is the source's current ranking version, which the vectorized snapshot is keyed by."""
+        if self.backend == 'precomputed':
+            return await self._get_precomputed_ranked_papers(session, key.source, conditions, limit, offset, after, projection)
+        if self.backend == 'vectorized':
+            return await self._get_vectorized_ranked_papers(session, key, version, limit, offset, after, projection)
+        if projection:
+            base_query = select(*projection.sql_columns(extra=SCORING_COLUMNS))
+        else:
+            base_query = select(*(getattr(Paper, name) for name in PAPER_MODEL_COLUMNS))
+        base_query = base_query.where(Paper.source == key.source, *conditions)
+        return await self._get_ranked_papers(session, base_query, limit, offset, after, build_models=projection is None)
+
+    async def _rank_cached(
+        self, session: AsyncSession, key: FeedKey, conditions: List[ColumnElement], limit: int, offset: int,
+        after: FeedCursor | None = None, projection: FeedProjection | None = None
+    ) -> List[RankedPaper]:
+        version = None
+        if self.backend != 'live':
+            # Rolls a stale epoch over first; until then get_version is None and nothing could be cached.
+            await ranking_store.ensure_current(session, key.source)
+        if self.use_cache or self.backend == 'vectorized':
+            version = await ranking_store.get_version(session, key.source)
+        if self.use_cache and version is not None:
+            cached = feed_cache.get(key, version)
+            if cached is not None:
+                return cached
+
+        token = feed_cache.token()
+        ranked_papers = await self._rank(session, key, conditions, limit, offset, after, projection, version)
+        if self.use_cache and version is not None:
+            feed_cache.put(key, version, ranked_papers, frozenset(rp.paper.id for rp in ranked_papers), token)
+        return ranked_papers
+
+    async def rank_filtered(
+        self, session: AsyncSession, key: FeedKey, conditions: List[ColumnElement], limit: int, offset: int
+    ) -> List[RankedPaper]:
+        """
+        Ranks the papers of `key.source` matching arbitrary SQL `conditions` (e.g. a text search), uncached.
+        The vectorized engine can't evaluate SQL filters; its scores equal the precomputed store's up to
+        per-source normalization, so it ranks from the store instead.
+        """
+        if self.backend == 'live':
+            return await self._rank(session, key, conditions, limit, offset)
+        return await self._get_precomputed_ranked_papers(session, key.source, conditions, limit, offset)
+
+    @staticmethod
+    def filter_conditions(key: FeedKey) -> List[ColumnElement]:
+        """The SQL filter for a normalized key; all backends filter on the key so they agree on which papers match."""
+        conditions = []
+        if key.tags:
+            conditions.append(Paper.all_tags.contains(list(key.tags)))
+        if key.venue:
+            conditions.append(Paper.venue_key == venue_key(key.venue))
+        if key.year:
+            year_start, next_year_start = year_range(key.year)
+            conditions.append(Paper.year_or_date >= year_start)
+            conditions.append(Paper.year_or_date < next_year_start)
+        if key.category:
+            conditions.append(Paper.category == key.category)
+        return conditions
+
     # Public method for arXiv papers
     async def get_ranked_arxiv_papers(
-        self, session: AsyncSession, limit: int = 50, offset: int = 0, tags: List[str] | None = None
+        self, session: AsyncSession, limit: int = 50, offset: int = 0, tags: List[str] | None = None,
+        after: FeedCursor | None = None, projection: FeedProjection | None = None
     ) -> List[RankedPaper]:
         
-        base_query = select(Paper).where(Paper.source == 'arxiv')
-        if tags:
-            base_query = base_query.where(
-                or_(Paper.keywords.contains(tags), Paper.user_tags.contains(tags))
-            )
-        
-        return await self._get_ranked_papers(session, base_query, limit, offset)
+        key = feed_cache.make_key('arxiv', tags=tags, page=(limit, offset, after, projection))
+        return await self._rank_cached(session, key, self.filter_conditions(key), limit, offset, after, projection)
 
-    # --- NEW: Public method for OpenReview papers ---
+    # Public method for OpenReview papers
     async def get_ranked_openreview_papers(
         self,
         session: AsyncSession,
@@ -122,24 +284,13 @@ class RankingService:
         venue: str | None = None,
         year: int | None = None,
         category: str | None = None,
+        after: FeedCursor | None = None,
+        projection: FeedProjection | None = None,
     ) -> List[RankedPaper]:
         
-        base_query = select(Paper).where(Paper.source == 'openreview')
-
-        if tags:
-            # Note: OpenReview filtering doesn't use user_tags yet, just keywords
-            base_query = base_query.where(Paper.keywords.contains(tags))
-        if venue:
-            base_query = base_query.where(Paper.venue_or_category.ilike(f"%{venue}%"))
-        if year:
-            base_query = base_query.where(func.extract('year', Paper.year_or_date) == year)
-        if category:
-            base_query = base_query.where(Paper.category == category)
-        
-        # Since OpenReview papers have no votes, their popularity and reputation are 0.
-        # We order by date to ensure a stable, sensible default ranking.
-        base_query = base_query.order_by(Paper.year_or_date.desc(), Paper.id.desc())
-        
-        return await self._get_ranked_papers(session, base_query, limit, offset)
+        key = feed_cache.make_key(
+            'openreview', tags=tags, venue=venue, year=year, category=category, page=(limit, offset, after, projection)
+        )
+        return await self._rank_cached(session, key, self.filter_conditions(key), limit, offset, after, projection)
 
 ranking_service = RankingService()
\ No newline at end of file
@@ -0,0 +1,322 @@
+"""
+Maintains the persisted ranking store (`paper_rankings` + `ranking_state`).
+
+Instead of recomputing every score with window functions on each feed request, the
+components of the bleeding-edge score are stored per paper and kept fresh here:
+
+- `refresh_papers`: called after papers are ingested. Only the touched rows are
+  re-scored, against the bounds already stored in `ranking_state`; the shared
+  per-source state row is not read for update or written. The source is only marked
+  as changed.
+- `papers_changed`: called by votes. With the precomputed backend, which serves feeds
+  from this store, it is `refresh_papers` inside the vote's transaction; the other
+  backends don't read the store on the vote path, so the papers are only marked dirty
+  and re-scored by the next sync, keeping `paper_rankings` writes off hot writes.
+- `sync_source`: re-scores the dirty papers, recomputes the source's min/max bounds,
+  renormalizes the whole source if they moved, and bumps its version (which
+  invalidates feed caches and ETags). The API runs it for changed sources every
+  RANKING_MAINTENANCE_INTERVAL_SECONDS from a background task; the fetchers run the
+  same pass once at the end of each run.
+- `ensure_current`: when the recency epoch (the calendar day) ticks over, the source is
+  rebuilt once. The maintenance task normally does this right after midnight; the read
+  path only falls back to it if no pass has run yet.
+
+Everything that writes `ranking_state` first takes a per-source transaction-level advisory
+lock, so API workers and fetchers never rebuild or bump the same source concurrently.
+Normalization happens per source (not per filtered subset as in the live query).
+
+To rebuild the store from scratch for all sources:
+    python -m services.ranking_store
+"""
+
+import asyncio
+import logging
+import math
+from datetime import date
+from typing import Dict, Iterable, NamedTuple, Set
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from model.database import SessionMaker
+from model.paper import Paper
+from model.paper_ranking import PaperRanking, RankingState
+from services.config import LOGGING_CONFIG, RANKING_BACKEND, RANKING_MAINTENANCE_INTERVAL_SECONDS
+from services.ranking_formula import (
+    days_old_since_epoch, recency_expr, popularity_expr, log_reputation_expr,
+    normalize_expr, bleeding_edge_expr,
+)
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+RANKED_SOURCES = ('arxiv', 'openreview')
+
+class RankingBounds(NamedTuple):
+    min_recency: float
+    max_recency: float
+    min_popularity: float
+    max_popularity: float
+    min_log_reputation: float
+    max_log_reputation: float
+
+    def matches(self, other: "RankingBounds") -> bool:
+        return all(math.isclose(a, b, rel_tol=1e-12, abs_tol=1e-12) for a, b in zip(self, other))
+
+class RankingStore:
+    def __init__(
+        self,
+        maintenance_interval_seconds: float = RANKING_MAINTENANCE_INTERVAL_SECONDS,
+        rescore_votes_inline: bool = RANKING_BACKEND == 'precomputed',
+    ):
+        if maintenance_interval_seconds <= 0:
+            raise ValueError("maintenance_interval_seconds must be positive.")
+        self.maintenance_interval_seconds = maintenance_interval_seconds
+        self.rescore_votes_inline = rescore_votes_inline
+        self._rebuild_lock = asyncio.Lock() # Collapses concurrent epoch rebuilds within this process
+        self._current_epochs: Dict[str, date] = {}  # Sources known to be ranked for the given day
+        self._changed_sources: Set[str] = set()  # Sources written by this process since the last sync
+        self._dirty_papers: Dict[str, Set[int]] = {}  # Papers whose re-scoring was left to the next sync
+        self._task: asyncio.Task | None = None
+
+    async def get_state(self, session: AsyncSession, source: str) -> RankingState | None:
+        stmt = select(RankingState).where(RankingState.source == source).execution_options(populate_existing=True)
+        result = await session.execute(stmt)
+        return result.scalars().first()
+
+    async def get_version(self, session: AsyncSession, source: str) -> int | None:
+        """
+        The source's ranking version, bumped by every sync. Returns None when the source
+        has never been ranked or its recency epoch has ticked, i.e. a rebuild is pending.
+        """
+        stmt = select(RankingState.version, RankingState.epoch).where(RankingState.source == source)
+        row = (await session.execute(stmt)).first()
+        if row is None or row.epoch != date.today():
+            return None
+        return row.version
+
+    def mark_changed(self, source: str) -> None:
+        """
+        Records a write that feeds must eventually reflect (votes, but also tags and comment counts,
+        which change what a feed shows without re-scoring). The next maintenance pass syncs the
+        source and bumps its version once, however many writes there were.
+        """
+        self._changed_sources.add(source)
+
+    async def _lock_source(self, session: AsyncSession, source: str) -> None:
+        """Serializes writers of a source's ranking state across processes until the transaction ends."""
+        await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"ranking_state:{source}"))))
+
+    async def ensure_current(self, session: AsyncSession, source: str) -> None:
+        """
+        Rebuilds the source if it has never been ranked or the recency epoch has ticked.
+        The rebuild runs in its own primary session, since `session` may be a read-only
+        replica session; a replica that hasn't replayed it yet doesn't trigger another one.
+        Other workers reaching the same stale epoch wait on the advisory lock and then
+        find the rebuild done.
+        """
+        today = date.today()
+        if self._current_epochs.get(source) == today:
+            return
+        state = await self.get_state(session, source)
+        if state is not None and state.epoch == today:
+            self._current_epochs[source] = today
+            return
+        async with self._rebuild_lock:
+            if self._current_epochs.get(source) == today:
+                return
+            async with SessionMaker() as primary:
+                await self._lock_source(primary, source)
+                state = await self.get_state(primary, source)
+                if state is None or state.epoch != today:
+                    await self.refresh_source(primary, source)
+                await primary.commit()
+            self._current_epochs[source] = today
+
+    async def refresh_source(self, session: AsyncSession, source: str) -> None:
+        """Recomputes every ranking row of a source against today's epoch. Does not commit."""
+        epoch = date.today()
+        await self._lock_source(session, source)
+        logging.info(f"Rebuilding ranking store for '{source}' (epoch {epoch})...")
+        await self._upsert_raw_components(session, source, epoch, paper_ids=None)
+        bounds = await self._compute_bounds(session, source)
+        await self._renormalize(session, source, bounds, paper_ids=None)
+        await self._save_state(session, source, epoch, bounds)
+
+    async def refresh_papers(self, session: AsyncSession, source: str, paper_ids: Iterable[int]) -> None:
+        """
+        Re-scores the given papers against the stored bounds and epoch, touching only their
+        own rows, and marks the source changed. Does not commit, so callers can fold it into
+        the same transaction as the write that caused it. Scores of papers that moved past the
+        stored bounds are corrected by the next `sync_source`.
+        """
+        paper_ids = list(paper_ids)
+        if not paper_ids:
+            return
+
+        state = await self.get_state(session, source)
+        await self._upsert_raw_components(session, source, state.epoch if state else date.today(), paper_ids=paper_ids)
+        if state is not None:
+            await self._renormalize(session, source, self._bounds_from_state(state), paper_ids=paper_ids)
+        self.mark_changed(source)
+
+    async def papers_changed(self, session: AsyncSession, source: str, paper_ids: Iterable[int]) -> None:
+        """
+        Records votes on the given papers: re-scores them in the caller's transaction when feeds are
+        served from this store, and otherwise leaves them to the next `sync_source`. Does not commit.
+        """
+        if self.rescore_votes_inline:
+            await self.refresh_papers(session, source, paper_ids)
+            return
+        self._dirty_papers.setdefault(source, set()).update(paper_ids)
+        self.mark_changed(source)
+
+    async def sync_source(self, session: AsyncSession, source: str, paper_ids: Iterable[int] = ()) -> None:
+        """
+        Folds the writes since the last sync into the source's state: rebuilds it if the epoch
+        ticked, otherwise re-scores `paper_ids` (papers marked dirty), recomputes the bounds,
+        renormalizes the source if they moved, and bumps the version. Does not commit; the
+        advisory lock is held until the caller does.
+        """
+        paper_ids = list(paper_ids)
+        await self._lock_source(session, source)
+        state = await self.get_state(session, source)
+        if state is None or state.epoch != date.today():
+            await self.refresh_source(session, source)
+            return
+        if paper_ids:
+            await self._upsert_raw_components(session, source, state.epoch, paper_ids=paper_ids)
+        bounds = await self._compute_bounds(session, source)
+        if not bounds.matches(self._bounds_from_state(state)):
+            await self._renormalize(session, source, bounds, paper_ids=None)
+        elif paper_ids:
+            await self._renormalize(session, source, bounds, paper_ids=paper_ids)
+        await self._save_state(session, source, state.epoch, bounds)
+
+    async def run_maintenance(self) -> None:
+        """
+        One maintenance pass: syncs the sources this process changed and rolls over stale epochs.
+        The fetchers, which have no background task, run one pass at the end of each run.
+        """
+        for source in RANKED_SOURCES:
+            if source not in self._changed_sources:
+                async with SessionMaker() as session:
+                    await self.ensure_current(session, source)
+                continue
+            self._changed_sources.discard(source)
+            dirty = self._dirty_papers.pop(source, set())
+            try:
+                async with SessionMaker() as session:
+                    await self.sync_source(session, source, dirty)
+                    await session.commit()
+                self._current_epochs[source] = date.today()
+            except Exception:
+                # Retried by the next pass
+                self._changed_sources.add(source)
+                self._dirty_papers.setdefault(source, set()).update(dirty)
+                raise
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"Ranking maintenance started (every {self.maintenance_interval_seconds}s).")
+
+    async def stop(self) -> None:
+        """Stops the background task and syncs whatever this process changed since the last pass."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.run_maintenance()
+        except Exception as e:
+            logging.error(f"Ranking maintenance: final pass failed: {e}", exc_info=True)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval_seconds)
+            try:
+                await self.run_maintenance()
+            except Exception as e:
+                logging.error(f"Ranking maintenance pass failed, will retry: {e}", exc_info=True)
+
+    async def _upsert_raw_components(self, session: AsyncSession, source: str, epoch: date, paper_ids: list[int] | None):
+        raw_query = select(
+            Paper.id,
+            Paper.source,
+            recency_expr(days_old_since_epoch(Paper.year_or_date, epoch)),
+            popularity_expr(Paper.upvotes, Paper.downvotes),
+            log_reputation_expr(Paper.reputation_score),
+        ).where(Paper.source == source)
+        if paper_ids is not None:
+            raw_query = raw_query.where(Paper.id.in_(paper_ids))
+
+        stmt = pg_insert(PaperRanking).from_select(
+            ['paper_id', 'source', 'recency_score', 'popularity_score', 'log_reputation'], raw_query
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PaperRanking.paper_id],
+            set_={
+                'recency_score': stmt.excluded.recency_score,
+                'popularity_score': stmt.excluded.popularity_score,
+                'log_reputation': stmt.excluded.log_reputation,
+            },
+        )
+        await session.execute(stmt)
+
+    async def _compute_bounds(self, session: AsyncSession, source: str) -> RankingBounds:
+        stmt = select(
+            func.min(PaperRanking.recency_score), func.max(PaperRanking.recency_score),
+            func.min(PaperRanking.popularity_score), func.max(PaperRanking.popularity_score),
+            func.min(PaperRanking.log_reputation), func.max(PaperRanking.log_reputation),
+        ).where(PaperRanking.source == source)
+        row = (await session.execute(stmt)).one()
+        return RankingBounds(*[value if value is not None else 0.0 for value in row])
+
+    async def _renormalize(self, session: AsyncSession, source: str, bounds: RankingBounds, paper_ids: list[int] | None):
+        norm_recency = normalize_expr(PaperRanking.recency_score, bounds.min_recency, bounds.max_recency)
+        norm_popularity = normalize_expr(PaperRanking.popularity_score, bounds.min_popularity, bounds.max_popularity)
+        norm_log_reputation = normalize_expr(PaperRanking.log_reputation, bounds.min_log_reputation, bounds.max_log_reputation)
+
+        stmt = update(PaperRanking).where(PaperRanking.source == source)
+        if paper_ids is not None:
+            stmt = stmt.where(PaperRanking.paper_id.in_(paper_ids))
+        stmt = stmt.values(
+            norm_recency=norm_recency,
+            norm_popularity=norm_popularity,
+            norm_log_reputation=norm_log_reputation,
+            bleeding_edge_score=bleeding_edge_expr(norm_recency, norm_log_reputation, norm_popularity),
+        ).execution_options(synchronize_session=False)
+        await session.execute(stmt)
+
+    async def _save_state(self, session: AsyncSession, source: str, epoch: date, bounds: RankingBounds):
+        values = {'epoch': epoch, **bounds._asdict()}
+        stmt = pg_insert(RankingState).values(source=source, version=1, **values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RankingState.source],
+            set_={**values, 'version': RankingState.version + 1, 'refreshed_at': func.now()},
+        )
+        await session.execute(stmt)
+
+    def _bounds_from_state(self, state: RankingState) -> RankingBounds:
+        return RankingBounds(
+            state.min_recency, state.max_recency,
+            state.min_popularity, state.max_popularity,
+            state.min_log_reputation, state.max_log_reputation,
+        )
+
+# Create a single, reusable instance
+ranking_store = RankingStore()
+
+async def rebuild_all_sources():
+    async with SessionMaker() as session:
+        for source in RANKED_SOURCES:
+            await ranking_store.refresh_source(session, source)
+        await session.commit()
+    logging.info("✅ Ranking store rebuilt for all sources.")
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_all_sources())
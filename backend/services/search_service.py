@@ -0,0 +1,105 @@
+"""
+Full-text search over papers.
+
+Matching uses the stored, weighted `papers.search_vector` column (title A, abstract B)
+through its GIN index, with `websearch_to_tsquery` so users can type quoted phrases,
+`or` and `-exclusions`. Search composes with the feed filters (tags, venue, year,
+category) and can order either by text relevance or by the bleeding-edge ranking.
+
+Snippets are produced with ts_headline for the returned page only, since it re-parses
+the document text. They are HTML-escaped, with matches wrapped in <mark>…</mark>.
+"""
+
+import html
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select, func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from model.paper import Paper, SEARCH_TEXT_CONFIG
+from services.feed_cache import feed_cache
+from services.ranking_service import RankingService, ranking_service, RankedPaper
+
+SEARCH_SORTS = ('relevance', 'ranking')
+
+# ts_headline wraps matches in these control characters; they are swapped for <mark> tags after escaping.
+_MATCH_START, _MATCH_STOP = '\x02', '\x03'
+_ABSTRACT_HEADLINE_OPTIONS = f"StartSel={_MATCH_START}, StopSel={_MATCH_STOP}, MaxFragments=2, MaxWords=30, MinWords=12, FragmentDelimiter= … "
+_TITLE_HEADLINE_OPTIONS = f"StartSel={_MATCH_START}, StopSel={_MATCH_STOP}, HighlightAll=true"
+
+@dataclass
+class SearchHit:
+    paper: Paper
+    relevance: float
+    title_snippet: str
+    abstract_snippet: str | None
+    ranked: RankedPaper | None = None  # Set when results are ordered by the bleeding-edge ranking
+
+def _to_html(headline: str | None) -> str | None:
+    if headline is None:
+        return None
+    return html.escape(headline).replace(_MATCH_START, '<mark>').replace(_MATCH_STOP, '</mark>')
+
+class SearchService:
+    def __init__(self, ranking: RankingService = ranking_service):
+        self.ranking = ranking
+
+    async def search(
+        self,
+        session: AsyncSession,
+        query: str,
+        source: str,
+        tags: List[str] | None = None,
+        venue: str | None = None,
+        year: int | None = None,
+        category: str | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = 'relevance',
+    ) -> List[SearchHit]:
+        if sort not in SEARCH_SORTS:
+            raise ValueError(f"Unknown sort '{sort}'. Expected one of {SEARCH_SORTS}.")
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_TEXT_CONFIG}'"), query)
+        relevance = func.ts_rank_cd(Paper.search_vector, tsquery)
+
+        key = feed_cache.make_key(source, tags=tags, venue=venue, year=year, category=category)
+        conditions = [*RankingService.filter_conditions(key), Paper.search_vector.op('@@')(tsquery)]
+
+        if sort == 'ranking':
+            ranked_papers = await self.ranking.rank_filtered(session, key, conditions, limit, offset)
+            page: List[Tuple[Paper, RankedPaper | None]] = [(rp.paper, rp) for rp in ranked_papers]
+        else:
+            stmt = (
+                select(Paper)
+                .where(Paper.source == source, *conditions)
+                .order_by(relevance.desc(), Paper.id.desc())
+                .offset(offset)
+                .limit(limit)
+            )
+            page = [(paper, None) for paper in (await session.execute(stmt)).scalars().all()]
+        if not page:
+            return []
+
+        snippets = await self._snippets(session, [paper.id for paper, _ in page], tsquery, relevance)
+        return [
+            SearchHit(paper, *snippets[paper.id], ranked=ranked)
+            for paper, ranked in page if paper.id in snippets
+        ]
+
+    async def _snippets(self, session: AsyncSession, paper_ids: List[int], tsquery, relevance) -> Dict[int, tuple]:
+        """(relevance, title snippet, abstract snippet) for the page's papers only."""
+        config = literal_column(f"'{SEARCH_TEXT_CONFIG}'")
+        stmt = select(
+            Paper.id,
+            relevance.label('relevance'),
+            func.ts_headline(config, Paper.title, tsquery, _TITLE_HEADLINE_OPTIONS).label('title_snippet'),
+            func.ts_headline(config, Paper.abstract, tsquery, _ABSTRACT_HEADLINE_OPTIONS).label('abstract_snippet'),
+        ).where(Paper.id.in_(paper_ids))
+        return {
+            row.id: (row.relevance, _to_html(row.title_snippet), _to_html(row.abstract_snippet))
+            for row in (await session.execute(stmt)).all()
+        }
+
+# Create a single, reusable instance
+search_service = SearchService()
@@ -6,6 +6,7 @@ from typing import Dict, List
 
 # Import from the single, unified config file
 from .config import ALL_VENUE_VARIATIONS, LOGGING_CONFIG
+from .http_replay import http_client, courtesy_sleep
 
 # --- Setup ---
 logging.basicConfig(**LOGGING_CONFIG)
@@ -22,7 +23,7 @@ INITIAL_BACKOFF_SECONDS = 5
 
 class SemanticScholarService:
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=20.0, headers=HEADERS)
+        self.client = http_client(timeout=20.0, headers=HEADERS)
         self.semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
         logging.info(f"Initializing Semantic Scholar Service with concurrency limit of {CONCURRENCY_LIMIT}.")
 
@@ -89,7 +90,7 @@ class SemanticScholarService:
         This ensures that we never exceed our concurrency limit.
         """
         async with self.semaphore:
-            await asyncio.sleep(0.5) 
+            await courtesy_sleep(0.5)
             return await self.get_author_publication_score(author_name)
 
     async def calculate_paper_score(self, authors: List[Dict]) -> float:
@@ -0,0 +1,73 @@
+"""
+Routes each request's database session to the primary or the read replica.
+
+Safe (read-only) requests get a replica session, everything else gets the primary. A
+successful mutating request stamps the client with a short-lived cookie, and while it is
+fresh the client's reads also go to the primary, so a user who just voted, tagged or
+commented sees their change even if the replica hasn't replayed it yet.
+
+Without a configured replica both session makers point at the primary and this is a no-op.
+"""
+
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict
+
+from litestar import Request
+from litestar.datastructures import Cookie, MutableScopeHeaders
+from litestar.types import Message, Scope
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from model.database import SessionMaker, ReplicaSessionMaker, replica_engine
+from services.config import READ_YOUR_WRITES_WINDOW_SECONDS
+
+READ_YOUR_WRITES_COOKIE = "frontier_last_write"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+@dataclass
+class RoutingStats:
+    primary_sessions: int = 0
+    replica_sessions: int = 0
+    read_your_writes_reads: int = 0  # Safe requests sent to the primary because of a recent write
+
+class SessionRouter:
+    def __init__(self, window_seconds: float = READ_YOUR_WRITES_WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.replica_enabled = replica_engine is not None
+        self._stats = RoutingStats()
+
+    def _wrote_recently(self, request: Request) -> bool:
+        stamp = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+        if not stamp:
+            return False
+        try:
+            return time.time() - float(stamp) < self.window_seconds
+        except ValueError:
+            return False
+
+    def session_maker_for(self, request: Request) -> async_sessionmaker:
+        if request.method in SAFE_METHODS:
+            if not self._wrote_recently(request):
+                self._stats.replica_sessions += 1
+                return ReplicaSessionMaker
+            self._stats.read_your_writes_reads += 1
+        self._stats.primary_sessions += 1
+        return SessionMaker
+
+    async def mark_write(self, message: Message, scope: Scope) -> None:
+        """`before_send` hook: stamps the client after every successful mutating request."""
+        if message["type"] != "http.response.start" or scope.get("method") in SAFE_METHODS:
+            return
+        if message["status"] >= 400:
+            return
+        cookie = Cookie(
+            key=READ_YOUR_WRITES_COOKIE, value=f"{time.time():.3f}", max_age=int(self.window_seconds),
+            path="/", httponly=True, samesite="lax",
+        )
+        MutableScopeHeaders.from_message(message).add("set-cookie", cookie.to_header(header=""))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"replica_enabled": self.replica_enabled, "window_seconds": self.window_seconds, **asdict(self._stats)}
+
+# Create a single, reusable instance
+session_router = SessionRouter()
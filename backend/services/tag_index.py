@@ -0,0 +1,77 @@
+"""
+An in-memory prefix index over all tags, for typeahead suggestions.
+
+Tags are kept in one sorted array of (casefolded tag, tag) pairs, so every tag starting
+with a prefix is a contiguous slice found with two bisections. Each tag carries its
+popularity (the number of papers using it as a keyword or user tag), and a query returns
+the top-k of its slice by popularity. Query results are memoized (typeahead traffic
+repeats the same few prefixes) until the next change to the index, so a repeated
+prefix costs a dict lookup even when its slice holds thousands of tags.
+"""
+
+import heapq
+from collections import OrderedDict
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+# The largest character, used as the exclusive upper bound of a prefix range.
+_PREFIX_END = "\U0010ffff"
+MEMO_MAX_ENTRIES = 4096
+
+class TagSuggestion(NamedTuple):
+    name: str
+    count: int
+
+class TagPrefixIndex:
+    def __init__(self, tag_counts: Iterable[Tuple[str, int]] = ()):
+        self._counts: Dict[str, int] = {}
+        for tag, count in tag_counts:
+            if tag and count > 0:
+                self._counts[tag] = self._counts.get(tag, 0) + count
+        self._entries: List[Tuple[str, str]] = sorted((tag.casefold(), tag) for tag in self._counts)
+        self._memo: "OrderedDict[Tuple[str, int], List[TagSuggestion]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def suggest(self, prefix: str, limit: int) -> List[TagSuggestion]:
+        """The `limit` most popular tags starting with `prefix` (case-insensitive), ties broken alphabetically."""
+        key = prefix.strip().casefold()
+        memo_key = (key, limit)
+        cached = self._memo.get(memo_key)
+        if cached is not None:
+            self._memo.move_to_end(memo_key)
+            return cached
+
+        start = bisect_left(self._entries, (key,))
+        end = bisect_left(self._entries, (key + _PREFIX_END,), start)
+        top = heapq.nsmallest(
+            limit, (self._entries[i][1] for i in range(start, end)),
+            key=lambda tag: (-self._counts[tag], tag),
+        )
+        suggestions = [TagSuggestion(tag, self._counts[tag]) for tag in top]
+        self._memo[memo_key] = suggestions
+        if len(self._memo) > MEMO_MAX_ENTRIES:
+            self._memo.popitem(last=False)
+        return suggestions
+
+    def increment(self, tag: str) -> None:
+        if tag not in self._counts:
+            self._counts[tag] = 0
+            insort(self._entries, (tag.casefold(), tag))
+        self._counts[tag] += 1
+        self._memo.clear()
+
+    def decrement(self, tag: str) -> None:
+        count = self._counts.get(tag)
+        if count is None:
+            return
+        if count > 1:
+            self._counts[tag] = count - 1
+        else:
+            del self._counts[tag]
+            entry = (tag.casefold(), tag)
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+        self._memo.clear()
@@ -1,59 +1,115 @@
 import asyncio
+import hashlib
+import logging
 import time
-from sqlalchemy import select, text
-from typing import List, Set
+from email.utils import formatdate
+from sqlalchemy import select
+from typing import List, NamedTuple, Set
 
-from model.database import SessionMaker
+from model.database import ReplicaSessionMaker
+from services.config import LOGGING_CONFIG
+from services.tag_index import TagPrefixIndex, TagSuggestion
+from services.tag_stats import tag_stats_store
+
+logging.basicConfig(**LOGGING_CONFIG)
 
 # --- Caching Configuration ---
 CACHE_TTL_SECONDS = 600  # Cache the tag list for 10 minutes
 
+class TagListSnapshot(NamedTuple):
+    tags: List[str]
+    etag: str             # Quoted strong ETag derived from the list's content
+    last_modified: float  # Unix time at which the content last changed
+
+    @property
+    def last_modified_http(self) -> str:
+        return formatdate(self.last_modified, usegmt=True)
+
 class TagService:
+    """
+    Serves the tag list stale-while-revalidate: once loaded, readers never wait on the
+    database. When the list is older than CACHE_TTL_SECONDS, the first reader schedules
+    a single background refresh and everyone keeps getting the previous list until it lands.
+    """
     def __init__(self):
-        self._cache: List[str] = []
+        self._snapshot: TagListSnapshot | None = None
         self._cache_expiry: float = 0
-        self._lock = asyncio.Lock() # Prevents race conditions during cache refresh
+        self._lock = asyncio.Lock() # Serializes refreshes; never held while serving reads
+        self._refresh_task: asyncio.Task | None = None
+        self._index = TagPrefixIndex()
 
     async def get_all_tags(self) -> List[str]:
-        """
-        Returns a cached list of all unique, sorted tags.
-        If the cache is stale, it triggers a database refresh.
-        """
-        async with self._lock:
-            if time.time() > self._cache_expiry:
+        """Returns a cached list of all unique, sorted tags."""
+        return (await self.get_snapshot()).tags
+
+    async def get_snapshot(self) -> TagListSnapshot:
+        """Returns the cached tag list with its validators, scheduling a refresh if it is stale."""
+        if self._snapshot is None:
+            # Nothing to serve yet (e.g. warm-up failed): the first readers wait for one load.
+            async with self._lock:
+                if self._snapshot is None:
+                    await self._refresh_cache()
+        elif time.time() > self._cache_expiry:
+            self._schedule_refresh()
+        return self._snapshot
+
+    async def suggest(self, prefix: str, limit: int) -> List[TagSuggestion]:
+        """Typeahead: the most popular tags starting with `prefix`, from the in-memory prefix index."""
+        await self.get_snapshot()
+        return self._index.suggest(prefix, limit)
+
+    def record_tag_added(self, tag: str):
+        """Keeps the prefix index current between refreshes when a user tag is added."""
+        self._index.increment(tag)
+
+    def record_tag_removed(self, tag: str):
+        self._index.decrement(tag)
+
+    async def warm(self):
+        """Loads the cache at application startup. Failures are logged; the first request retries."""
+        try:
+            async with self._lock:
                 await self._refresh_cache()
-            return self._cache
+        except Exception as e:
+            logging.error(f"Failed to warm the tag cache: {e}", exc_info=True)
+
+    def _schedule_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self):
+        try:
+            async with self._lock:
+                if time.time() > self._cache_expiry:
+                    await self._refresh_cache()
+        except Exception as e:
+            # Keep serving the stale list; the next reader after the expiry schedules another attempt.
+            logging.error(f"Background tag cache refresh failed: {e}", exc_info=True)
 
     async def _refresh_cache(self):
         """
-        Performs an efficient database query to get all unique tags,
-        then updates the in-memory cache.
+        Reads all unique tags with their paper counts, then swaps in a new snapshot and prefix index.
+        The counts come from the incrementally maintained `tag_stats` table, so this reads
+        one row per (source, tag) instead of un-nesting the tags of every paper.
         """
-        print("Refreshing tag cache from database...")
-        
-        # --- THIS IS THE FIX ---
-        # This single query is vastly more efficient than fetching all rows.
-        # It uses jsonb_array_elements_text to un-nest all tags from both JSONB columns,
-        # then gets the distinct, non-empty, sorted list directly from the DB.
-        query = text("""
-            SELECT DISTINCT tag
-            FROM (
-                SELECT jsonb_array_elements_text(keywords) AS tag FROM papers WHERE jsonb_typeof(keywords) = 'array'
-                UNION ALL
-                SELECT jsonb_array_elements_text(user_tags) AS tag FROM papers WHERE jsonb_typeof(user_tags) = 'array'
-            ) AS all_tags
-            WHERE tag IS NOT NULL AND tag != ''
-            ORDER BY tag;
-        """)
-
-        async with SessionMaker() as session:
-            result = await session.execute(query)
-            # The result is a list of tuples, so we extract the first element of each.
-            all_tags = [row[0] for row in result.all()]
-
-        self._cache = all_tags
+        logging.info("Refreshing tag cache from database...")
+
+        async with ReplicaSessionMaker() as session:
+            tag_counts = await tag_stats_store.get_all_tag_counts(session)
+
+        all_tags = [tag for tag, _ in tag_counts]
+        self._set_tags(all_tags)
+        self._index = TagPrefixIndex(tag_counts)
         self._cache_expiry = time.time() + CACHE_TTL_SECONDS
-        print(f"Cache refreshed. Found {len(self._cache)} unique tags. Next refresh in {CACHE_TTL_SECONDS / 60} minutes.")
+        logging.info(f"Tag cache refreshed. Found {len(all_tags)} unique tags. Next refresh in {CACHE_TTL_SECONDS / 60} minutes.")
+
+    def _set_tags(self, all_tags: List[str]):
+        digest = hashlib.sha1("\n".join(all_tags).encode("utf-8")).hexdigest()
+        etag = f'"{digest}"'
+        if self._snapshot is not None and self._snapshot.etag == etag:
+            return  # Unchanged content keeps its validators, so clients keep getting 304s.
+        # Last-Modified has one-second resolution; drop the fraction so If-Modified-Since compares cleanly.
+        self._snapshot = TagListSnapshot(all_tags, etag, float(int(time.time())))
 
 # Create a single, reusable instance
-tag_service = TagService()
\ No newline at end of file
+tag_service = TagService()
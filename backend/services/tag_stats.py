@@ -0,0 +1,129 @@
+"""
+Maintains `tag_stats`, the per-(source, tag) paper counts behind /api/tags/facets.
+
+Counting papers per tag on demand means unnesting `keywords` and `user_tags` across the
+whole `papers` table. Instead, every write path adjusts the affected counts inside its
+own transaction:
+
+- `add_papers`: after papers are ingested (both fetchers), +1 for each of their tags;
+- `remove_papers`: before papers are deleted (prune_papers), -1 for each of their tags;
+- `adjust_tag`: when a user tag is added to or removed from a paper that doesn't
+  already carry it as a keyword.
+
+The empty tag (SOURCE_TOTAL_TAG) holds each source's total paper count.
+
+To rebuild the counts from scratch (e.g. after creating the table on an existing database):
+    python -m services.tag_stats
+"""
+
+import asyncio
+import logging
+from typing import Dict, List
+from sqlalchemy import select, delete, func, literal, union, union_all, true
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from model.database import SessionMaker
+from model.paper import Paper
+from model.tag_stat import TagStat
+from services.config import LOGGING_CONFIG
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+SOURCE_TOTAL_TAG = ''
+
+def _tag_counts_query(condition, sign: int = 1):
+    """(source, tag, ±paper count) for the papers matching `condition`, plus one total row per source."""
+    unnested = [
+        select(Paper.source, Paper.id, func.jsonb_array_elements_text(column).label('tag'))
+        .where(condition, func.jsonb_typeof(column) == 'array')
+        for column in (Paper.keywords, Paper.user_tags)
+    ]
+    # UNION (not UNION ALL) so a tag that is both a keyword and a user tag counts its paper once.
+    paper_tags = union(*unnested).subquery('paper_tags')
+    tag_counts = (
+        select(paper_tags.c.source, paper_tags.c.tag, (func.count() * sign).label('paper_count'))
+        .where(paper_tags.c.tag != SOURCE_TOTAL_TAG)
+        .group_by(paper_tags.c.source, paper_tags.c.tag)
+    )
+    source_totals = (
+        select(Paper.source, literal(SOURCE_TOTAL_TAG).label('tag'), (func.count() * sign).label('paper_count'))
+        .where(condition)
+        .group_by(Paper.source)
+    )
+    return union_all(tag_counts, source_totals)
+
+class TagStatsStore:
+    async def _apply(self, session: AsyncSession, condition, sign: int):
+        counts = _tag_counts_query(condition, sign).subquery('counts')
+        stmt = pg_insert(TagStat).from_select(
+            ['source', 'tag', 'paper_count'],
+            select(counts.c.source, counts.c.tag, counts.c.paper_count),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TagStat.source, TagStat.tag],
+            set_={'paper_count': TagStat.paper_count + stmt.excluded.paper_count},
+        )
+        await session.execute(stmt)
+        if sign < 0:
+            await session.execute(delete(TagStat).where(TagStat.paper_count <= 0, TagStat.tag != SOURCE_TOTAL_TAG))
+
+    async def add_papers(self, session: AsyncSession, paper_ids: List[int]):
+        """Counts newly inserted papers. Does not commit."""
+        if paper_ids:
+            await self._apply(session, Paper.id.in_(paper_ids), 1)
+
+    async def remove_papers(self, session: AsyncSession, condition):
+        """Un-counts the papers matching `condition`; call before deleting them. Does not commit."""
+        await self._apply(session, condition, -1)
+
+    async def adjust_tag(self, session: AsyncSession, source: str, tag: str, delta: int):
+        """Adds `delta` papers to a single (source, tag) count. Does not commit."""
+        stmt = pg_insert(TagStat).values(source=source, tag=tag, paper_count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TagStat.source, TagStat.tag],
+            set_={'paper_count': TagStat.paper_count + stmt.excluded.paper_count},
+        )
+        await session.execute(stmt)
+        if delta < 0:
+            await session.execute(delete(TagStat).where(TagStat.source == source, TagStat.tag == tag, TagStat.paper_count <= 0))
+
+    async def rebuild(self, session: AsyncSession):
+        """Recomputes every count from `papers`. Does not commit."""
+        await session.execute(delete(TagStat))
+        await self._apply(session, true(), 1)
+
+    async def get_facets(self, session: AsyncSession, source: str, tags: List[str] | None = None, limit: int = 100) -> Dict:
+        """The source's total and its tags' paper counts: the given `tags`, or the `limit` most used."""
+        total = (await session.execute(
+            select(TagStat.paper_count).where(TagStat.source == source, TagStat.tag == SOURCE_TOTAL_TAG)
+        )).scalar_one_or_none() or 0
+
+        stmt = select(TagStat.tag, TagStat.paper_count).where(TagStat.source == source, TagStat.tag != SOURCE_TOTAL_TAG)
+        if tags:
+            stmt = stmt.where(TagStat.tag.in_(tags))
+        stmt = stmt.order_by(TagStat.paper_count.desc(), TagStat.tag).limit(limit)
+        rows = (await session.execute(stmt)).all()
+        return {"source": source, "total": total, "tags": [{"name": row.tag, "count": row.paper_count} for row in rows]}
+
+    async def get_all_tag_counts(self, session: AsyncSession) -> List[tuple]:
+        """(tag, papers across all sources), alphabetically; the input of TagService's list and prefix index."""
+        stmt = (
+            select(TagStat.tag, func.sum(TagStat.paper_count).label('uses'))
+            .where(TagStat.tag != SOURCE_TOTAL_TAG)
+            .group_by(TagStat.tag)
+            .order_by(TagStat.tag)
+        )
+        return [(row.tag, int(row.uses)) for row in (await session.execute(stmt)).all()]
+
+# Create a single, reusable instance
+tag_stats_store = TagStatsStore()
+
+async def rebuild_tag_stats():
+    async with SessionMaker() as session:
+        await tag_stats_store.rebuild(session)
+        await session.commit()
+    logging.info("✅ Rebuilt tag_stats from the papers table.")
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_tag_stats())
@@ -0,0 +1,247 @@
+"""
+A NumPy implementation of the bleeding-edge ranking, selectable as the 'vectorized'
+ranking backend (see RANKING_BACKEND in config.py).
+
+Each source is held in memory as compact column arrays (ids, dates, votes, reputation,
+categorical venue/category codes and per-tag postings). A request filters with boolean
+masks and computes recency decay, the Wilson lower bound, log reputation and min-max
+normalization over the filtered set in one vectorized pass, mirroring the window-function
+query of the 'live' backend. Only the rows of the requested page are then loaded from
+the database.
+
+Snapshots are reloaded when the source's ranking version changes (votes, ingestion),
+at most once every VECTOR_SNAPSHOT_MIN_RELOAD_SECONDS.
+
+To compare this engine against the SQL scorer on the current database:
+    python -m services.vector_ranking
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, NamedTuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from model.database import SessionMaker
+from model.paper import Paper, venue_key
+from services.config import LOGGING_CONFIG, VECTOR_SNAPSHOT_MIN_RELOAD_SECONDS
+from services.feed_cache import FeedKey
+from services.ranking_formula import (
+    WEIGHT_RECENCY, WEIGHT_REPUTATION, WEIGHT_POPULARITY, RECENCY_DECAY_CONSTANT,
+    WILSON_Z, NORMALIZATION_EPSILON,
+)
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+class ScoredRow(NamedTuple):
+    paper_id: int
+    bleeding_edge_score: float
+    norm_recency: float
+    norm_log_reputation: float
+    norm_popularity: float
+
+def wilson_lower_bound(upvotes: np.ndarray, downvotes: np.ndarray) -> np.ndarray:
+    total = np.maximum((upvotes + downvotes).astype(np.float64), 1.0)
+    p_hat = upvotes / total
+    z = WILSON_Z
+    sqrt_part = np.sqrt((p_hat * (1 - p_hat) + z * z / (4 * total)) / total)
+    return (p_hat + z * z / (2 * total) - z * sqrt_part) / (1 + z * z / total)
+
+def min_max_normalize(values: np.ndarray) -> np.ndarray:
+    low, high = values.min(), values.max()
+    if low == high:
+        return np.ones_like(values)
+    return (values - low) / (high - low + NORMALIZATION_EPSILON)
+
+@dataclass
+class RankingSnapshot:
+    source: str
+    version: int | None
+    loaded_at: float
+    paper_ids: np.ndarray        # int64
+    date_days: np.ndarray        # int32, days since 1970-01-01
+    upvotes: np.ndarray          # int32
+    downvotes: np.ndarray        # int32
+    reputation: np.ndarray       # float64
+    years: np.ndarray            # int16
+    venue_codes: np.ndarray      # int32, index into `venues`
+    category_codes: np.ndarray   # int32, index into `categories`, -1 for None
+    venues: List[str]
+    categories: List[str]
+    tag_postings: Dict[str, np.ndarray]       # tag (keyword or user tag) -> int32 row indices
+
+    def __len__(self) -> int:
+        return len(self.paper_ids)
+
+    @classmethod
+    def from_rows(cls, source: str, version: int | None, rows) -> "RankingSnapshot":
+        count = len(rows)
+        epoch = date(1970, 1, 1)
+        paper_ids = np.empty(count, dtype=np.int64)
+        date_days = np.empty(count, dtype=np.int32)
+        upvotes = np.empty(count, dtype=np.int32)
+        downvotes = np.empty(count, dtype=np.int32)
+        reputation = np.empty(count, dtype=np.float64)
+        years = np.empty(count, dtype=np.int16)
+        venue_codes = np.empty(count, dtype=np.int32)
+        category_codes = np.empty(count, dtype=np.int32)
+        venue_index: Dict[str, int] = {}
+        category_index: Dict[str, int] = {}
+        tag_rows: Dict[str, List[int]] = {}
+
+        for i, row in enumerate(rows):
+            paper_date = row.year_or_date or epoch
+            paper_ids[i] = row.id
+            date_days[i] = (paper_date - epoch).days
+            upvotes[i] = row.upvotes or 0
+            downvotes[i] = row.downvotes or 0
+            reputation[i] = row.reputation_score or 0.0
+            years[i] = paper_date.year
+            venue_codes[i] = venue_index.setdefault(row.venue_or_category or '', len(venue_index))
+            category_codes[i] = category_index.setdefault(row.category, len(category_index)) if row.category is not None else -1
+            for tag in set(row.all_tags or []):
+                tag_rows.setdefault(tag, []).append(i)
+
+        return cls(
+            source=source, version=version, loaded_at=time.monotonic(),
+            paper_ids=paper_ids, date_days=date_days, upvotes=upvotes, downvotes=downvotes,
+            reputation=reputation, years=years, venue_codes=venue_codes, category_codes=category_codes,
+            venues=list(venue_index), categories=list(category_index),
+            tag_postings={tag: np.asarray(idx, dtype=np.int32) for tag, idx in tag_rows.items()},
+        )
+
+    def _tags_mask(self, tags) -> np.ndarray:
+        """Rows carrying every one of `tags`, as keywords or user tags."""
+        mask = np.ones(len(self), dtype=bool)
+        for tag in tags:
+            tag_mask = np.zeros(len(self), dtype=bool)
+            rows = self.tag_postings.get(tag)
+            if rows is not None:
+                tag_mask[rows] = True
+            mask &= tag_mask
+        return mask
+
+    def filter_mask(self, key: FeedKey) -> np.ndarray:
+        """Mirrors the SQL conditions built by RankingService for the same key."""
+        mask = np.ones(len(self), dtype=bool)
+        if key.tags:
+            mask &= self._tags_mask(key.tags)
+        if key.venue:
+            # The venue key only has to be computed once per distinct venue.
+            wanted = venue_key(key.venue)
+            matching = [code for code, venue in enumerate(self.venues) if venue_key(venue) == wanted]
+            mask &= np.isin(self.venue_codes, matching)
+        if key.year:
+            mask &= self.years == key.year
+        if key.category:
+            code = self.categories.index(key.category) if key.category in self.categories else -2
+            mask &= self.category_codes == code
+        return mask
+
+    def score(self, mask: np.ndarray):
+        """Returns (row indices, score, norm_recency, norm_log_reputation, norm_popularity) for the masked rows."""
+        rows = np.flatnonzero(mask)
+        # Ages are measured from the start of today rather than `now()`. Min-max normalization cancels
+        # the constant shift, and scores stay stable within a day so keyset cursors remain exact.
+        today_days = (date.today() - date(1970, 1, 1)).days
+        days_old = np.maximum(today_days - self.date_days[rows], 0).astype(np.float64)
+
+        norm_recency = min_max_normalize(np.exp(-RECENCY_DECAY_CONSTANT * days_old))
+        norm_popularity = min_max_normalize(wilson_lower_bound(self.upvotes[rows], self.downvotes[rows]))
+        # Postgres' log() is base 10.
+        norm_log_reputation = min_max_normalize(np.log10(self.reputation[rows] + 1))
+
+        score = (
+            WEIGHT_RECENCY * norm_recency +
+            WEIGHT_REPUTATION * norm_log_reputation +
+            WEIGHT_POPULARITY * norm_popularity
+        )
+        return rows, score, norm_recency, norm_log_reputation, norm_popularity
+
+    def rank(self, key: FeedKey, limit: int, offset: int = 0, after=None) -> List[ScoredRow]:
+        mask = self.filter_mask(key)
+        if not mask.any():
+            return []
+        rows, score, norm_recency, norm_log_reputation, norm_popularity = self.score(mask)
+        ids = self.paper_ids[rows]
+
+        # Order by (score desc, id desc), exactly like the SQL backends.
+        candidates = np.arange(len(rows))
+        if after is not None:
+            after_score, after_id = after
+            candidates = np.flatnonzero((score < after_score) | ((score == after_score) & (ids < after_id)))
+            offset = 0
+        wanted = offset + limit
+        if wanted < len(candidates):
+            # Partial selection; everything tied with the cut-off score is kept so the id tie-break stays exact.
+            threshold = -np.partition(-score[candidates], wanted - 1)[wanted - 1]
+            candidates = candidates[score[candidates] >= threshold]
+        ordered = candidates[np.lexsort((-ids[candidates], -score[candidates]))][offset:wanted]
+
+        return [
+            ScoredRow(int(ids[i]), float(score[i]), float(norm_recency[i]), float(norm_log_reputation[i]), float(norm_popularity[i]))
+            for i in ordered
+        ]
+
+class VectorRankingEngine:
+    def __init__(self, min_reload_seconds: float = VECTOR_SNAPSHOT_MIN_RELOAD_SECONDS):
+        self.min_reload_seconds = min_reload_seconds
+        self._snapshots: Dict[str, RankingSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_snapshot(self, session: AsyncSession, source: str, version: int | None) -> RankingSnapshot:
+        snapshot = self._snapshots.get(source)
+        if snapshot is not None and not self._needs_reload(snapshot, version):
+            return snapshot
+        async with self._locks.setdefault(source, asyncio.Lock()):
+            snapshot = self._snapshots.get(source)
+            if snapshot is None or self._needs_reload(snapshot, version):
+                snapshot = await self.load_snapshot(session, source, version)
+                self._snapshots[source] = snapshot
+            return snapshot
+
+    def _needs_reload(self, snapshot: RankingSnapshot, version: int | None) -> bool:
+        if version is not None and version == snapshot.version:
+            return False
+        return time.monotonic() - snapshot.loaded_at >= self.min_reload_seconds
+
+    async def load_snapshot(self, session: AsyncSession, source: str, version: int | None) -> RankingSnapshot:
+        started = time.perf_counter()
+        stmt = select(
+            Paper.id, Paper.year_or_date, Paper.upvotes, Paper.downvotes, Paper.reputation_score,
+            Paper.venue_or_category, Paper.category, Paper.all_tags,
+        ).where(Paper.source == source)
+        rows = (await session.execute(stmt)).all()
+        snapshot = RankingSnapshot.from_rows(source, version, rows)
+        logging.info(f"Loaded vectorized ranking snapshot for '{source}': {len(snapshot)} papers in {time.perf_counter() - started:.2f}s.")
+        return snapshot
+
+# Create a single, reusable instance
+vector_ranking_engine = VectorRankingEngine()
+
+async def compare_with_sql(limit: int = 200, tolerance: float = 1e-6):
+    """Ranks each source's unfiltered feed with both the live SQL scorer and this engine and reports drift."""
+    from services.ranking_service import RankingService
+    from services.feed_cache import feed_cache
+
+    sql_service = RankingService(backend='live', use_cache=False)
+    async with SessionMaker() as session:
+        for source in ('arxiv', 'openreview'):
+            key = feed_cache.make_key(source, page=(limit, 0, None))
+            snapshot = await vector_ranking_engine.load_snapshot(session, source, version=None)
+            vector_rows = snapshot.rank(key, limit)
+            sql_rows = await sql_service.rank_filtered(session, key, [], limit, 0)
+            sql_scores = {rp.paper.id: rp.bleeding_edge_score for rp in sql_rows}
+            diffs = [abs(row.bleeding_edge_score - sql_scores[row.paper_id]) for row in vector_rows if row.paper_id in sql_scores]
+            missing = sum(1 for row in vector_rows if row.paper_id not in sql_scores)
+            max_diff = max(diffs, default=0.0)
+            status = "OK" if max_diff <= tolerance and missing == 0 else "MISMATCH"
+            logging.info(f"[{status}] {source}: compared {len(diffs)} rows, max |Δscore|={max_diff:.2e}, rows missing from SQL top-{limit}: {missing}")
+
+if __name__ == "__main__":
+    asyncio.run(compare_with_sql())
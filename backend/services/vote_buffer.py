@@ -0,0 +1,223 @@
+"""
+A write-behind buffer for votes (enabled with VOTE_BUFFER_ENABLED in config.py).
+
+Instead of one UPDATE + re-score + commit per vote, the vote endpoint records the vote as a
+per-paper (upvotes, downvotes) delta in memory and responds immediately. A background task
+writes all pending deltas as a single batched UPDATE every VOTE_BUFFER_FLUSH_INTERVAL_MS, or
+sooner once VOTE_BUFFER_MAX_PENDING_VOTES votes are waiting. Popular papers voted on many
+times between flushes cost a single row update.
+
+The vote endpoint doesn't check that the paper exists; the batched UPDATE skips unknown ids.
+
+The buffer is flushed one last time on application shutdown. A failed flush puts its
+deltas back, and how it is retried depends on the error:
+  - connection trouble (the database or the pool unreachable, timeouts, an invalidated
+    connection) and anything unrecognized: the whole batch is retried with exponential
+    backoff, up to VOTE_BUFFER_MAX_RETRY_DELAY_MS between attempts, until it goes in.
+    Meanwhile at most VOTE_BUFFER_MAX_BUFFERED_VOTES are held; further votes are refused.
+  - row-level data errors (DataError, IntegrityError): the batch is applied in halves,
+    recursively, so the papers whose update is rejected are isolated, logged and dropped
+    while every other vote goes in.
+Votes are only lost if they are still pending when the final flush fails (or the process
+is killed).
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Tuple
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from model.database import SessionMaker
+from model.paper_repository import paper_repository
+from services.config import (
+    LOGGING_CONFIG, VOTE_BUFFER_ENABLED, VOTE_BUFFER_FLUSH_INTERVAL_MS, VOTE_BUFFER_MAX_PENDING_VOTES,
+    VOTE_BUFFER_MAX_RETRY_DELAY_MS, VOTE_BUFFER_MAX_BUFFERED_VOTES,
+)
+
+logging.basicConfig(**LOGGING_CONFIG)
+
+@dataclass
+class VoteBufferStats:
+    votes_received: int = 0
+    votes_flushed: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    dropped_votes: int = 0
+    rejected_votes: int = 0
+    max_pending_votes: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    total_flush_ms: float = 0.0
+
+class VoteBuffer:
+    def __init__(
+        self,
+        enabled: bool = VOTE_BUFFER_ENABLED,
+        flush_interval_ms: int = VOTE_BUFFER_FLUSH_INTERVAL_MS,
+        max_pending_votes: int = VOTE_BUFFER_MAX_PENDING_VOTES,
+        max_retry_delay_ms: int = VOTE_BUFFER_MAX_RETRY_DELAY_MS,
+        max_buffered_votes: int = VOTE_BUFFER_MAX_BUFFERED_VOTES,
+    ):
+        if flush_interval_ms <= 0 or max_pending_votes <= 0 or max_buffered_votes < max_pending_votes:
+            raise ValueError("flush_interval_ms and max_pending_votes must be positive, and max_buffered_votes at least max_pending_votes.")
+        self.enabled = enabled
+        self.flush_interval_ms = flush_interval_ms
+        self.max_pending_votes = max_pending_votes
+        self.max_retry_delay_ms = max(max_retry_delay_ms, flush_interval_ms)
+        self.max_buffered_votes = max_buffered_votes
+        self._consecutive_failures = 0
+        self._pending: Dict[int, Tuple[int, int]] = {}
+        self._pending_votes = 0
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stats = VoteBufferStats()
+
+    def add(self, paper_id: int, direction: str) -> bool:
+        """Records one vote; never touches the database. Returns False if the buffer is full (flushes are failing)."""
+        if self._pending_votes >= self.max_buffered_votes:
+            self._stats.rejected_votes += 1
+            return False
+        up, down = self._pending.get(paper_id, (0, 0))
+        self._pending[paper_id] = (up + 1, down) if direction == 'up' else (up, down + 1)
+        self._pending_votes += 1
+        self._stats.votes_received += 1
+        self._stats.max_pending_votes = max(self._stats.max_pending_votes, self._pending_votes)
+        if self._pending_votes >= self.max_pending_votes:
+            self._flush_requested.set()
+        return True
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logging.info(f"Vote buffer started (flush every {self.flush_interval_ms}ms or {self.max_pending_votes} votes).")
+
+    async def stop(self) -> None:
+        """Stops the background task and durably flushes whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not await self.flush() and self._pending:
+            logging.error(f"Vote buffer: final flush failed, {self._pending_votes} votes on {len(self._pending)} papers were not persisted.")
+
+    async def _run(self) -> None:
+        while True:
+            if self._consecutive_failures:
+                # Backing off: a full buffer doesn't make a struggling database recover any sooner.
+                await asyncio.sleep(self._retry_delay_ms() / 1000)
+            else:
+                try:
+                    await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    def _retry_delay_ms(self) -> float:
+        return min(self.flush_interval_ms * 2 ** (self._consecutive_failures - 1), self.max_retry_delay_ms)
+
+    def _restore(self, deltas: Dict[int, Tuple[int, int]]) -> int:
+        """Merges unapplied deltas back into the pending ones, so the next flush retries them. Returns their votes."""
+        votes = 0
+        for paper_id, (up, down) in deltas.items():
+            pending_up, pending_down = self._pending.get(paper_id, (0, 0))
+            self._pending[paper_id] = (pending_up + up, pending_down + down)
+            votes += up + down
+        self._pending_votes += votes
+        return votes
+
+    async def flush(self) -> bool:
+        """Writes all pending deltas in one batch. Returns False if votes were left pending or dropped."""
+        async with self._flush_lock:
+            if not self._pending:
+                return True
+            deltas, vote_count = self._pending, self._pending_votes
+            self._pending, self._pending_votes = {}, 0
+
+            started = time.perf_counter()
+            dropped, unapplied = 0, {}
+            try:
+                await self._apply(deltas)
+            except (DataError, IntegrityError) as e:
+                logging.error(f"Vote buffer: flush of {vote_count} votes rejected by the database; isolating the failing papers: {e}")
+                dropped, unapplied = await self._apply_isolating(deltas)
+                self._stats.dropped_votes += dropped
+                if unapplied:
+                    # The database became unreachable part way; the rest waits for the next flush.
+                    vote_count -= self._restore(unapplied)
+            except Exception as e:
+                # Connection/pool failures (OperationalError, InterfaceError, timeouts, invalidated
+                # connections) and anything unrecognized: the votes are kept and retried with backoff.
+                self._stats.failed_flushes += 1
+                self._consecutive_failures += 1
+                self._restore(deltas)
+                logging.error(
+                    f"Vote buffer: flush of {vote_count} votes failed ({self._consecutive_failures} in a row), "
+                    f"retrying in {self._retry_delay_ms():.0f}ms: {e}"
+                )
+                return False
+            if unapplied:
+                self._stats.failed_flushes += 1
+                self._consecutive_failures += 1
+            else:
+                self._consecutive_failures = 0
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._stats.flushes += 1
+            self._stats.votes_flushed += vote_count - dropped
+            self._stats.last_flush_ms = elapsed_ms
+            self._stats.max_flush_ms = max(self._stats.max_flush_ms, elapsed_ms)
+            self._stats.total_flush_ms += elapsed_ms
+            return dropped == 0 and not unapplied
+
+    async def _apply(self, deltas: Dict[int, Tuple[int, int]]) -> None:
+        async with SessionMaker() as session:
+            await paper_repository.apply_vote_deltas(session, deltas)
+
+    async def _apply_isolating(self, deltas: Dict[int, Tuple[int, int]]) -> Tuple[int, Dict[int, Tuple[int, int]]]:
+        """
+        Applies deltas in ever smaller halves until the papers with rejected updates are isolated.
+        Returns the votes dropped, and the deltas left unapplied because a non-data error stopped it.
+        """
+        try:
+            await self._apply(deltas)
+            return 0, {}
+        except (DataError, IntegrityError) as e:
+            if len(deltas) == 1:
+                [(paper_id, (up, down))] = deltas.items()
+                logging.error(f"Vote buffer: dropping {up + down} votes on paper {paper_id}: {e}")
+                return up + down, {}
+        except Exception as e:
+            logging.error(f"Vote buffer: stopped isolating failing papers, {len(deltas)} papers left pending: {e}")
+            return 0, deltas
+        items = list(deltas.items())
+        middle = len(items) // 2
+        dropped, unapplied = await self._apply_isolating(dict(items[:middle]))
+        if unapplied:
+            return dropped, {**unapplied, **dict(items[middle:])}
+        more_dropped, unapplied = await self._apply_isolating(dict(items[middle:]))
+        return dropped + more_dropped, unapplied
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **asdict(self._stats),
+            "enabled": self.enabled,
+            "pending_votes": self._pending_votes,
+            "pending_papers": len(self._pending),
+            "avg_flush_ms": self._stats.total_flush_ms / self._stats.flushes if self._stats.flushes else 0.0,
+            "flush_interval_ms": self.flush_interval_ms,
+            "flush_threshold_votes": self.max_pending_votes,
+            "max_buffered_votes": self.max_buffered_votes,
+            "consecutive_failures": self._consecutive_failures,
+        }
+
+# Create a single, reusable instance
+vote_buffer = VoteBuffer()
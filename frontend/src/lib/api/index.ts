@@ -1,9 +1,20 @@
-import type { Paper, PaperDTO, Comment, CommentReadDTO } from '$lib/types';
+import type { Paper, PaperDTO, Comment, CommentReadDTO, TagSuggestion } from '$lib/types';
 
 const BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
-async function apiFetch<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+export class ApiError extends Error {
+  status: number;
+
+  constructor(message: string, status: number) {
+    super(message);
+    this.status = status;
+  }
+}
+
+async function apiRequest(endpoint: string, options: RequestInit = {}): Promise<Response> {
   const response = await fetch(`${BASE_URL}${endpoint}`, {
+    // Sends the API's read-your-writes cookie, so reads right after a vote or tag see it.
+    credentials: 'include',
     ...options,
     headers: {
       'Content-Type': 'application/json',
@@ -12,8 +23,13 @@ async function apiFetch<T>(endpoint: string, options: RequestInit = {}): Promise
   });
   if (!response.ok) {
     const errorBody = await response.json().catch(() => ({ message: 'An unknown error occurred' }));
-    throw new Error(errorBody.detail || `API request failed: ${response.statusText}`);
+    throw new ApiError(errorBody.detail || errorBody.error || `API request failed: ${response.statusText}`, response.status);
   }
+  return response;
+}
+
+async function apiFetch<T>(endpoint: string, options: RequestInit = {}): Promise<T> {
+  const response = await apiRequest(endpoint, options);
   if (response.status === 204) {
       return null as T;
   }
@@ -44,11 +60,18 @@ export interface FetchPapersParams {
   venue?: string;
   year?: number;
   category?: string;
+  // The previous page's cursor; `offset` is then only used if the cursor has expired.
+  after?: string | null;
+}
+
+export interface PaperPage {
+  papers: Paper[];
+  nextCursor: string | null;
 }
 
 export async function fetchPapers({
-  source, limit = 20, offset = 0, tags = [], venue, year, category
-}: FetchPapersParams): Promise<Paper[]> {
+  source, limit = 20, offset = 0, tags = [], venue, year, category, after
+}: FetchPapersParams): Promise<PaperPage> {
   const params = new URLSearchParams();
   params.set('limit', String(limit));
   params.set('offset', String(offset));
@@ -56,9 +79,18 @@ export async function fetchPapers({
   if (venue) params.set('venue', venue);
   if (year) params.set('year', String(year));
   if (category) params.set('category', category);
+  if (after) params.set('after', after);
 
-  const rawPapers = await apiFetch<PaperDTO[]>(`/api/papers/${source}?${params.toString()}`);
-  return rawPapers.map(transformPaper);
+  let response: Response;
+  try {
+    response = await apiRequest(`/api/papers/${source}?${params.toString()}`);
+  } catch (error) {
+    // 410: the ranking changed since the cursor was issued; continue by offset instead.
+    if (!(after && error instanceof ApiError && error.status === 410)) throw error;
+    return fetchPapers({ source, limit, offset, tags, venue, year, category });
+  }
+  const rawPapers = await response.json() as PaperDTO[];
+  return { papers: rawPapers.map(transformPaper), nextCursor: response.headers.get('X-Next-Cursor') };
 }
 
 export async function fetchPaperById(id: number): Promise<Paper> {
@@ -70,6 +102,11 @@ export async function fetchAllTags(): Promise<string[]> {
   return apiFetch<string[]>('/api/tags/all');
 }
 
+export async function suggestTags(prefix: string, limit = 10): Promise<TagSuggestion[]> {
+  const params = new URLSearchParams({ prefix, limit: String(limit) });
+  return apiFetch<TagSuggestion[]>(`/api/tags/suggest?${params.toString()}`);
+}
+
 export async function voteOnPaper(paperId: number, direction: 'up' | 'down'): Promise<void> {
   await apiFetch<void>(`/api/papers/${paperId}/vote`, {
     method: 'POST',
@@ -77,8 +114,19 @@ export async function voteOnPaper(paperId: number, direction: 'up' | 'down'): Pr
   });
 }
 
+// The endpoint pages comments; a full page carries X-Next-Cursor, passed back as `after`.
+const COMMENTS_PAGE_SIZE = 200;
+
 export async function fetchComments(paperId: number): Promise<Comment[]> {
-  const rawComments = await apiFetch<CommentReadDTO[]>(`/api/papers/${paperId}/comments`);
+  const rawComments: CommentReadDTO[] = [];
+  let after: string | null = null;
+  do {
+    const params = new URLSearchParams({ limit: String(COMMENTS_PAGE_SIZE) });
+    if (after) params.set('after', after);
+    const response = await apiRequest(`/api/papers/${paperId}/comments?${params.toString()}`);
+    rawComments.push(...(await response.json() as CommentReadDTO[]));
+    after = response.headers.get('X-Next-Cursor');
+  } while (after);
   return rawComments.map(transformComment);
 }
 
@@ -22,6 +22,7 @@ function createPapersStore() {
   const { subscribe, set, update } = store;
 
   let offset = 0;
+  let cursor: string | null = null;  // From the last page's X-Next-Cursor; offset is the fallback
   const limit = 20;
 
   const currentFilters = derived(feed, $feed => {
@@ -63,6 +64,7 @@ function createPapersStore() {
           tags: currentFilterState.tags,
           limit,
           offset,
+          after: cursor,
         };
       } else {
         apiParams = {
@@ -73,10 +75,11 @@ function createPapersStore() {
           category: currentFilterState.category,
           limit,
           offset,
+          after: cursor,
         };
       }
       
-      const newPapers = await fetchPapers(apiParams);
+      const { papers: newPapers, nextCursor } = await fetchPapers(apiParams);
 
       update(s => ({
         papers: [...s.papers, ...newPapers],
@@ -86,6 +89,7 @@ function createPapersStore() {
       }));
 
       offset += newPapers.length;
+      cursor = nextCursor;
     } catch (error: any) {
       console.error("Failed to load more papers:", error);
       update(s => ({ ...s, loading: false, error: error.message || "Failed to load papers." }));
@@ -94,6 +98,7 @@ function createPapersStore() {
   
   function reset() {
     offset = 0;
+    cursor = null;
     set({ papers: [], loading: false, hasMore: true, error: null });
   }
 
@@ -4,6 +4,12 @@ export interface TagDTO {
   isRemovable: boolean;
 }
 
+// A typeahead suggestion from /api/tags/suggest
+export interface TagSuggestion {
+  name: string;
+  count: number;
+}
+
 // The clean, internal model for a Paper
 export interface Paper {
   id: number;
@@ -19,6 +25,7 @@ export interface Paper {
   tags: TagDTO[];
   upvotes: number;
   downvotes: number;
+  comment_count: number;
   category: string | null;
   bleeding_edge_score: number | null;
   recency_component: number | null;